@@ -0,0 +1,90 @@
+import json
+import pathlib
+import random
+import sys
+import time
+
+from monitor.codec import BACKEND, decode_mark_prices
+from monitor.recorder import read_segments
+
+
+def synthesize_frames(
+    n: int,
+    *,
+    m: int = 600,
+) -> list[str]:
+    rng = random.Random(0)
+    symbols = [f"S{i:03d}USDT" for i in range(m)]
+    frames = []
+    for t in range(n):
+        frames.append(
+            json.dumps(
+                [
+                    {
+                        "e": "markPriceUpdate",
+                        "E": 1_700_000_000_000 + 1000 * t,
+                        "s": symbol,
+                        "p": f"{rng.uniform(0.01, 50000.0):.8f}",
+                        "P": f"{rng.uniform(0.01, 50000.0):.8f}",
+                        "i": f"{rng.uniform(0.01, 50000.0):.8f}",
+                        "r": f"{rng.uniform(-0.001, 0.001):.8f}",
+                        "T": 1_700_006_400_000,
+                    }
+                    for symbol in symbols
+                ],
+                separators=(",", ":"),
+            )
+        )
+    return frames
+
+
+def load_frames(
+    paths: list[str],
+) -> list[str]:
+    frames = []
+    for _, data in read_segments(map(pathlib.Path, paths)):
+        if data.startswith('{"stream"'):
+            data = json.dumps(json.loads(data)["data"], separators=(",", ":"))
+        if "[" == data[:1]:
+            frames.append(data)
+    return frames
+
+
+def bench(
+    name: str,
+    func,
+    frames: list[str],
+) -> None:
+    t0 = time.perf_counter()
+    for frame in frames:
+        func(frame)
+    t1 = time.perf_counter()
+    print(f"{name:>16}: {len(frames) / (t1 - t0):10.1f} frames/s")
+
+
+def baseline(
+    frame: str,
+) -> None:
+    data = json.loads(frame)
+    mps = {x["s"]: x for x in data}
+    for x in mps.values():
+        float(x["p"])
+
+
+def codec(
+    frame: str,
+) -> None:
+    data = decode_mark_prices(frame)
+    mps = {x.symbol: x for x in data}
+    for x in mps.values():
+        x.mark_price
+
+
+def main() -> None:
+    frames = load_frames(sys.argv[1:]) if 1 < len(sys.argv) else synthesize_frames(200)
+    bench("json+float", baseline, frames)
+    bench(f"codec[{BACKEND}]", codec, frames)
+
+
+if __name__ == "__main__":
+    main()
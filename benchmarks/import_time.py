@@ -0,0 +1,60 @@
+import argparse
+import statistics
+import subprocess
+import sys
+
+TARGETS = {
+    "package": "import monitor",
+    "monitors": (
+        "from monitor import PositionMonitor, MarketMonitor, FundingMonitor, LiquidationMonitor,"
+        " SpreadMonitor, OrderMonitor, ExchangeMonitor"
+    ),
+    "everything": "from monitor import *",
+}
+
+
+def import_time(
+    stmt: str,
+) -> tuple[float, list[tuple[float, str]]]:
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", stmt],
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+    total = 0.0
+    modules = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        if not name.startswith("  "):
+            total += int(cumulative) / 1000
+            modules.append((int(cumulative) / 1000, name.strip()))
+    return total, sorted(modules, reverse=True)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=5)
+    parser.add_argument("--budget", type=float, default=None, help="fail if the monitors import median exceeds this (ms)")
+    args = parser.parse_args()
+    failed = False
+    startup = [import_time("pass") for _ in range(args.repeat)]
+    base = statistics.median(total for total, _ in startup)
+    skip = {name for _, modules in startup for _, name in modules}
+    for target, stmt in TARGETS.items():
+        runs = [import_time(stmt) for _ in range(args.repeat)]
+        median = statistics.median(total for total, _ in runs) - base
+        print(f"{target:>12}: {median:8.1f} ms  ({stmt})")
+        for cumulative, name in [x for x in runs[-1][1] if x[1] not in skip][: args.top]:
+            print(f"{"":>14}{cumulative:8.1f} ms  {name}")
+        if "monitors" == target and args.budget is not None and args.budget < median:
+            print(f"{target:>12}: over budget {args.budget:.1f} ms")
+            failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
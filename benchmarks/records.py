@@ -0,0 +1,205 @@
+import argparse
+import json
+import random
+import time
+import tracemalloc
+
+from monitor.codec import BACKEND, decode_mark_prices, decode_positions, decode_user_event
+
+
+def synthesize_positions(
+    m: int,
+) -> list[dict[str, str]]:
+    rng = random.Random(0)
+    positions = []
+    for i in range(m):
+        price = rng.uniform(0.01, 50000.0)
+        amt = rng.uniform(-100.0, 100.0)
+        positions.append(
+            {
+                "symbol": f"S{i:03d}USDT",
+                "positionSide": "BOTH",
+                "positionAmt": f"{amt:.3f}",
+                "entryPrice": f"{price:.8f}",
+                "breakEvenPrice": f"{price:.8f}",
+                "markPrice": f"{price * rng.uniform(0.9, 1.1):.8f}",
+                "unRealizedProfit": f"{rng.uniform(-100.0, 100.0):.8f}",
+                "liquidationPrice": "0",
+                "isolatedMargin": "0.00000000",
+                "notional": f"{amt * price:.8f}",
+                "marginAsset": "USDT",
+                "isolatedWallet": "0",
+                "initialMargin": f"{abs(amt * price) / 10:.8f}",
+                "maintMargin": f"{abs(amt * price) / 100:.8f}",
+                "positionInitialMargin": f"{abs(amt * price) / 10:.8f}",
+                "openOrderInitialMargin": "0",
+                "adl": 0,
+                "bidNotional": "0",
+                "askNotional": "0",
+                "updateTime": 1_700_000_000_000 + i,
+            }
+        )
+    return positions
+
+
+def synthesize_orders(
+    m: int,
+) -> list[str]:
+    rng = random.Random(0)
+    return [
+        json.dumps(
+            {
+                "e": "ORDER_TRADE_UPDATE",
+                "E": 1_700_000_000_000 + i,
+                "T": 1_700_000_000_000 + i,
+                "o": {
+                    "s": f"S{i % 600:03d}USDT",
+                    "c": f"client{i}",
+                    "S": rng.choice(("BUY", "SELL")),
+                    "o": "LIMIT",
+                    "f": "GTC",
+                    "q": f"{rng.uniform(1.0, 100.0):.3f}",
+                    "p": f"{rng.uniform(0.01, 50000.0):.8f}",
+                    "ap": "0",
+                    "sp": "0",
+                    "x": "TRADE",
+                    "X": "FILLED",
+                    "i": 8_000_000_000 + i,
+                    "l": f"{rng.uniform(1.0, 100.0):.3f}",
+                    "z": f"{rng.uniform(1.0, 100.0):.3f}",
+                    "L": f"{rng.uniform(0.01, 50000.0):.8f}",
+                    "N": "USDT",
+                    "n": f"{rng.uniform(0.0, 1.0):.8f}",
+                    "T": 1_700_000_000_000 + i,
+                    "t": i,
+                    "b": "0",
+                    "a": "0",
+                    "m": rng.random() < 0.5,
+                    "R": False,
+                    "wt": "CONTRACT_PRICE",
+                    "ot": "LIMIT",
+                    "ps": "BOTH",
+                    "cp": False,
+                    "rp": f"{rng.uniform(-10.0, 10.0):.8f}",
+                },
+            },
+            separators=(",", ":"),
+        )
+        for i in range(m)
+    ]
+
+
+def synthesize_marks(
+    m: int,
+) -> str:
+    rng = random.Random(0)
+    return json.dumps(
+        [
+            {
+                "e": "markPriceUpdate",
+                "E": 1_700_000_000_000,
+                "s": f"S{i:03d}USDT",
+                "p": f"{rng.uniform(0.01, 50000.0):.8f}",
+                "P": f"{rng.uniform(0.01, 50000.0):.8f}",
+                "i": f"{rng.uniform(0.01, 50000.0):.8f}",
+                "r": f"{rng.uniform(-0.001, 0.001):.8f}",
+                "T": 1_700_006_400_000,
+            }
+            for i in range(m)
+        ],
+        separators=(",", ":"),
+    )
+
+
+def footprint(
+    build,
+) -> tuple[int, object]:
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    obj = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return after - before, obj
+
+
+def throughput(
+    func,
+    repeat: int,
+) -> float:
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return repeat / (time.perf_counter() - t0)
+
+
+def report(
+    name: str,
+    n: int,
+    repeat: int,
+    dicts,
+    records,
+) -> None:
+    size0, _ = footprint(dicts)
+    size1, _ = footprint(records)
+    rate0 = throughput(dicts, repeat)
+    rate1 = throughput(records, repeat)
+    print(f"{name:>10}: dict {size0 / n:7.1f} B/item {rate0 * n:12.1f} items/s")
+    print(f"{"":>10}  {BACKEND:>4} {size1 / n:7.1f} B/item {rate1 * n:12.1f} items/s  ({size0 / size1:.2f}x smaller)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--items", type=int, default=600)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+    n = args.items
+
+    positions = json.dumps(synthesize_positions(n))
+
+    def position_dicts() -> list:
+        data = json.loads(positions)
+        for x in data:
+            float(x["notional"]), float(x["unRealizedProfit"]), float(x["markPrice"])
+        return data
+
+    def position_records() -> list:
+        data = decode_positions(json.loads(positions))
+        for x in data:
+            x.notional, x.unrealized_profit, x.mark_price
+        return data
+
+    orders = synthesize_orders(n)
+
+    def order_dicts() -> list:
+        data = [json.loads(x) for x in orders]
+        for x in data:
+            float(x["o"]["L"]), float(x["o"]["l"]), float(x["o"]["rp"])
+        return data
+
+    def order_records() -> list:
+        data = [decode_user_event(x) for x in orders]
+        for x in data:
+            x.order.last_price, x.order.last_quantity, x.order.realized_profit
+        return data
+
+    marks = synthesize_marks(n)
+
+    def mark_dicts() -> list:
+        data = json.loads(marks)
+        for x in data:
+            float(x["p"])
+        return data
+
+    def mark_records() -> list:
+        data = decode_mark_prices(marks)
+        for x in data:
+            x.mark_price
+        return data
+
+    report("positions", n, args.repeat, position_dicts, position_records)
+    report("orders", n, args.repeat, order_dicts, order_records)
+    report("marks", n, args.repeat, mark_dicts, mark_records)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+import asyncio
+import json
+import pathlib
+import sys
+from loguru import logger
+
+from monitor import CaptureBot, Job, MarketMonitor, Replayer, Scheduler, StreamHub, VirtualClock, decode_mark_prices
+
+STREAM = "!markPrice@arr@1s"
+PARAMS = {
+    "5m": 3.0,
+    "15m": 5.0,
+    "1h": 8.0,
+}
+
+
+async def replay(
+    paths: list[pathlib.Path],
+    params: dict[str, float],
+    coalesce: float = 0.0,
+) -> None:
+    clock = VirtualClock()
+    bot = CaptureBot()
+    hub = StreamHub(clock=clock)
+    monitor = MarketMonitor(bot, hub=hub, params=params, coalesce=coalesce, clock=clock)
+    hub.subscribe(STREAM, decode_mark_prices, monitor.on_mark_prices)
+
+    async def evaluate() -> None:
+        async with Scheduler(clock=clock) as scheduler:
+            scheduler.add(Job("MarketMonitor.monitor_market", monitor.monitor_market, 2.0))
+            await asyncio.Event().wait()
+
+    replayer = Replayer(paths, clock=clock, tail=10_000, stream=STREAM)
+    await replayer.run(hub.on_message, evaluate())
+    rows = sum(len(card["body"]["elements"][1]["rows"]) for card in bot.cards)
+    print(f"{replayer.frames} frames in {replayer.elapsed:.3f}s ({replayer.frames / replayer.elapsed:.1f} frames/s)")
+    print(f"{len(bot.cards)} cards, {rows} rows")
+
+
+def main() -> None:
+    if len(sys.argv) < 2:
+        print(f"usage: python -m benchmarks.replay SEGMENT... [--params JSON] [--coalesce SECONDS]")
+        return
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")
+    args = sys.argv[1:]
+    params = PARAMS
+    if "--params" in args:
+        i = args.index("--params")
+        params = json.loads(args[i + 1])
+        del args[i : i + 2]
+    coalesce = 0.0
+    if "--coalesce" in args:
+        i = args.index("--coalesce")
+        coalesce = float(args[i + 1])
+        del args[i : i + 2]
+    asyncio.run(replay(list(map(pathlib.Path, args)), params, coalesce))
+
+
+if __name__ == "__main__":
+    main()
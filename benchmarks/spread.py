@@ -0,0 +1,86 @@
+import argparse
+import json
+import random
+import time
+from loguru import logger
+
+from monitor import CaptureBot, SpreadMonitor, StreamHub, VirtualClock, decode_book_ticker
+from monitor.codec import BACKEND
+
+STREAM = "!bookTicker"
+
+
+def synthesize_frames(
+    n: int,
+    *,
+    m: int = 600,
+    rate: int = 5000,
+) -> list[tuple[int, str]]:
+    rng = random.Random(0)
+    mids = [rng.uniform(0.01, 50000.0) for _ in range(m)]
+    frames = []
+    for k in range(n):
+        t = 1_700_000_000_000 + 1000 * k // rate
+        i = rng.randrange(m)
+        mid = mids[i] = mids[i] * (1 + rng.gauss(0.0, 1e-4))
+        half = mid * rng.uniform(0.5e-4, 2e-4)
+        frames.append(
+            (
+                t,
+                json.dumps(
+                    {
+                        "stream": STREAM,
+                        "data": {
+                            "e": "bookTicker",
+                            "u": k,
+                            "E": t,
+                            "T": t,
+                            "s": f"S{i:03d}USDT",
+                            "b": f"{mid - half:.8f}",
+                            "B": f"{rng.uniform(0.1, 100.0):.3f}",
+                            "a": f"{mid + half:.8f}",
+                            "A": f"{rng.uniform(0.1, 100.0):.3f}",
+                        },
+                    },
+                    separators=(",", ":"),
+                ),
+            )
+        )
+    return frames
+
+
+def bench(
+    frames: list[tuple[int, str]],
+    sample: float,
+) -> None:
+    clock = VirtualClock()
+    hub = StreamHub(clock=clock)
+    monitor = SpreadMonitor(CaptureBot(), hub=hub, sample=sample, clock=clock)
+    hub.subscribe(STREAM, decode_book_ticker, monitor.on_book_ticker)
+    t0 = time.perf_counter()
+    for t, frame in frames:
+        clock.set(t)
+        hub.on_message(None, frame)
+    t1 = time.perf_counter()
+    book = monitor.book
+    print(
+        f"{f"sample={sample}s":>14}: {len(frames) / (t1 - t0):10.1f} msgs/s"
+        f"  ({book.sampled} sampled, {book.dropped} dropped)"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--frames", type=int, default=100_000)
+    parser.add_argument("--symbols", type=int, default=600)
+    parser.add_argument("--rate", type=int, default=5000, help="synthetic stream rate (msgs/s)")
+    args = parser.parse_args()
+    logger.remove()
+    frames = synthesize_frames(args.frames, m=args.symbols, rate=args.rate)
+    print(f"codec[{BACKEND}], {args.frames} frames over {args.symbols} symbols at {args.rate} msgs/s")
+    for sample in 0.0, 0.1, 1.0:
+        bench(frames, sample)
+
+
+if __name__ == "__main__":
+    main()
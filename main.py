@@ -1,63 +1,202 @@
 import asyncio as aio
+import contextlib
 import copy
 import datetime as dt
 import os
+import pathlib
+import signal
 import tomllib
 from loguru import logger
 from typing import Any
 
 from monitor import (
+    MONITORS,
+    Account,
     Bot,
-    PositionMonitor,
-    MarketMonitor,
-    OrderMonitor,
-    ExchangeMonitor,
+    LoopProfiler,
+    MarketPublisher,
+    MetricsServer,
     MonitorGroup,
+    Scheduler,
+    StateStore,
+    Supervisor,
+    load_plugins,
+    make_executor,
 )
 
 
-async def launch(
+def setup_logger(
     config: dict[str, Any],
+    shard: str | None = None,
 ) -> None:
-    aio.get_event_loop().slow_callback_duration = config["asyncio"][
-        "slow_callback_duration"
-    ]
-
     if config["loguru"]["logger"]["remove"]:
         logger.remove()
+    dir_name = dt.datetime.now().strftime("%Y%m%d_%H%M%S")
+    if shard is not None:
+        dir_name = os.path.join(dir_name, shard)
     for kwargs in config["loguru"]["logger"]["add"]:
-        dir_name = dt.datetime.now().strftime("%Y%m%d_%H%M%S")
+        kwargs = copy.deepcopy(kwargs)
         kwargs["sink"] = os.path.join(f"./logs/{dir_name}/", kwargs["sink"])
         logger.add(**kwargs)
 
-    position_bot = Bot(config["feishu_bot"]["webhook_position"])
-    market_bot = Bot(config["feishu_bot"]["webhook_market"])
-    order_bot = Bot(config["feishu_bot"]["webhook_order"])
-    exchange_bot = Bot(config["feishu_bot"]["webhook_exchange"])
 
+def account_configs(
+    config: dict[str, Any],
+) -> list[dict[str, Any]]:
+    if "binance_accounts" in config:
+        return config["binance_accounts"]
+    return [config["binance_account"]]
+
+
+async def serve_forever() -> None:
+    loop = aio.get_running_loop()
+    future = loop.create_future()
+    for sig in signal.SIGINT, signal.SIGTERM:
+        loop.add_signal_handler(sig, future.cancel)
+    try:
+        await future
+    except aio.CancelledError as e:
+        print(repr(e))
+
+
+async def launch(
+    config: dict[str, Any],
+) -> None:
+    aio.get_event_loop().slow_callback_duration = config["asyncio"][
+        "slow_callback_duration"
+    ]
+
+    shard = config.get("shard")
+    setup_logger(config, None if shard is None else shard["name"])
+
+    state_config = config.get("state", {})
+    state_path = pathlib.Path(state_config.get("path", r"./state.json"))
+    if shard is not None:
+        state_path = state_path.with_name(f"{state_path.stem}.{shard["name"]}{state_path.suffix}")
+    state = StateStore(state_path, interval=state_config.get("interval", 60.0))
+
+    metrics_config = copy.deepcopy(config.get("metrics", {}))
+    if shard is not None:
+        metrics_config["port"] = metrics_config.get("port", 9100) + 1 + shard["index"]
+    metrics = MetricsServer(**metrics_config)
+    profiler_config = copy.deepcopy(config.get("profiler", {}))
+    if "directory" in profiler_config:
+        profiler_config["directory"] = pathlib.Path(profiler_config["directory"])
+    profiler = LoopProfiler(**profiler_config)
+    aio.get_running_loop().add_signal_handler(signal.SIGUSR1, profiler.toggle)
+
+    reports_config = config.get("reports", {})
+    executor = make_executor(reports_config.get("executor", "none"), workers=reports_config.get("workers"))
+
+    scheduler = Scheduler(**config.get("scheduler", {}))
+
+    load_plugins(config.get("plugins", []))
+    scopes = {"account", "market"} if shard is None else set(shard["scopes"])
+    shm_config = config.get("shm", {})
+    ring = shm_config.get("name", "binance-futures-monitor") if shard is not None and shm_config.get("enabled", False) else None
+    publishers = []
+    accounts = []
+    bots = {}
     monitors = []
-    for kwargs in config["monitors"]:
-        kwargs = copy.deepcopy(kwargs)
-        kwargs["key"] = config["binance_account"]["key"]
-        kwargs["secret"] = config["binance_account"]["secret"]
-        cls = kwargs.pop("cls")
-        if "PositionMonitor" == cls:
-            monitor = PositionMonitor(position_bot, **kwargs)
-        elif "MarketMonitor" == cls:
-            monitor = MarketMonitor(market_bot, **kwargs)
-        elif "OrderMonitor" == cls:
-            monitor = OrderMonitor(order_bot, **kwargs)
-        elif "ExchangeMonitor" == cls:
-            monitor = ExchangeMonitor(exchange_bot, **kwargs)
-        monitors.append(monitor)
-    monitor_group = MonitorGroup(monitors)
+    for i, account_config in enumerate(account_configs(config)):
+        account = Account(
+            account_config.get("name", "default"),
+            key=account_config["key"],
+            secret=account_config["secret"],
+            proxies=config.get("proxies"),
+            state=state,
+            record=account_config.get("record"),
+            executor=executor,
+            scheduler=scheduler,
+            streams=config.get("streams"),
+            market=accounts[0] if 0 < len(accounts) else None,
+        )
+        accounts.append(account)
+        for kwargs in account_config.get("monitors", config["monitors"]):
+            kwargs = copy.deepcopy(kwargs)
+            cls = kwargs.pop("cls")
+            spec = MONITORS[cls]
+            if ring is not None and spec.ring:
+                if "account" not in scopes or ("market" == spec.scope and (0 < i or 1 != shard["index"])):
+                    logger.info(f"skip {cls} ({spec.scope}) for {account.name}")
+                    continue
+                kwargs["ring"] = ring
+            elif spec.scope not in scopes or ("market" == spec.scope and 0 < i):
+                logger.info(f"skip {cls} ({spec.scope}) for {account.name}")
+                continue
+            channel = kwargs.pop("channel", None) or spec.channel
+            webhook = account_config.get("feishu_bot", config["feishu_bot"])[f"webhook_{channel}"]
+            if webhook not in bots:
+                bots[webhook] = Bot(webhook, name=channel)
+            monitors.append(account.build(cls, bots[webhook], **kwargs))
+    if ring is not None and "market" in scopes:
+        speeds = [kwargs.get("speed", 1) for kwargs in config["monitors"] if MONITORS[kwargs["cls"]].ring]
+        publishers.append(
+            MarketPublisher(
+                accounts[0].hub,
+                ring,
+                speed=shm_config.get("speed", speeds[0] if 0 < len(speeds) else 1),
+                capacity=shm_config.get("capacity", 1024),
+                slots=shm_config.get("slots", 256),
+            )
+        )
+    monitor_group = MonitorGroup(monitors, **config.get("monitor_group", {}))
+
+    logger.critical(">>> ENTER >>>")
+    async with contextlib.AsyncExitStack() as stack:
+        if executor is not None:
+            stack.enter_context(executor)
+        for x in metrics, profiler, state, scheduler, *accounts, *publishers, *bots.values(), monitor_group:
+            await stack.enter_async_context(x)
+        await serve_forever()
+    logger.critical("<<< EXIT <<<")
+
+
+def run_shard(
+    config: dict[str, Any],
+) -> None:
+    aio.run(launch(config), debug=config["asyncio"]["debug"])
+
+
+def shard_configs(
+    config: dict[str, Any],
+) -> dict[str, dict[str, Any]]:
+    supervisor_config = config["supervisor"]
+    accounts = account_configs(config)
+    market_account = supervisor_config.get("market_account")
+    market = next((x for x in accounts if x.get("name") == market_account), accounts[0])
+    workers = max(1, min(supervisor_config.get("workers", os.cpu_count() or 1), len(accounts)))
+    shards = {}
+    for index in range(workers + 1):
+        shard_config = copy.deepcopy(config)
+        shard_config.pop("binance_account", None)
+        if 0 == index:
+            shard_config["binance_accounts"] = [market]
+            shard_config["shard"] = {"name": "market", "index": index, "scopes": ["market"]}
+        else:
+            shard_config["binance_accounts"] = accounts[index - 1 :: workers]
+            shard_config["shard"] = {"name": f"worker{index}", "index": index, "scopes": ["account"]}
+        shards[shard_config["shard"]["name"]] = shard_config
+    return shards
+
+
+async def supervise(
+    config: dict[str, Any],
+) -> None:
+    setup_logger(config, "supervisor")
+    supervisor_config = config["supervisor"]
+    supervisor = Supervisor(
+        run_shard,
+        shard_configs(config),
+        restart_delay=supervisor_config.get("restart_delay", 1.0),
+        restart_delay_max=supervisor_config.get("restart_delay_max", 60.0),
+        stop_timeout=supervisor_config.get("stop_timeout", 30.0),
+    )
+    metrics = MetricsServer(**config.get("metrics", {}))
 
     logger.critical(">>> ENTER >>>")
-    async with position_bot, market_bot, order_bot, exchange_bot, monitor_group:
-        try:
-            await aio.Future()
-        except aio.CancelledError as e:
-            print(repr(e))
+    async with metrics, supervisor:
+        await serve_forever()
     logger.critical("<<< EXIT <<<")
 
 
@@ -70,7 +209,10 @@ def main() -> None:
         config.update(tomllib.load(f0))
         config.update(tomllib.load(f1))
 
-    aio.run(launch(config), debug=config["asyncio"]["debug"])
+    if config.get("supervisor", {}).get("enabled", False):
+        aio.run(supervise(config), debug=config["asyncio"]["debug"])
+    else:
+        run_shard(config)
 
 
 if __name__ == "__main__":
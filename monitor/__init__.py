@@ -1,13 +1,190 @@
-from .bot import *
-from .cards import *
-from .monitor import *
-from .timewindow import *
-from .utils import *
-
-from . import bot
-from . import cards
-from . import monitor
-from . import timewindow
-from . import utils
-
-__all__ = bot.__all__ + cards.__all__ + monitor.__all__ + timewindow.__all__ + utils.__all__
+import importlib
+
+_submodules = {
+    "bot": (
+        "BaseBot",
+        "Bot",
+        "BotNowait",
+    ),
+    "breadth": (
+        "PERCENTILES",
+        "breadth",
+    ),
+    "cards": (
+        "local_datetime_element_factory",
+        "at_all_element_factory",
+        "launch_card_factory",
+        "finish_card_factory",
+        "error_card_factory",
+        "position_card_factory",
+        "market_card_factory",
+        "breadth_card_factory",
+        "funding_card_factory",
+        "liquidation_card_factory",
+        "spread_card_factory",
+        "order_card_factory",
+        "exchange_card_factory",
+    ),
+    "clock": (
+        "Clock",
+        "RealClock",
+        "ExchangeClock",
+        "VirtualClock",
+        "REAL_CLOCK",
+    ),
+    "clocksync": (
+        "ClockSync",
+    ),
+    "codec": (
+        "DecodeError",
+        "BACKEND",
+        "loads",
+        "decode_envelope",
+        "decode_mark_prices",
+        "decode_user_event",
+        "decode_positions",
+        "decode_force_order",
+        "decode_book_ticker",
+    ),
+    "cooldown": (
+        "Cooldowns",
+    ),
+    "funding": (
+        "FundingHistory",
+    ),
+    "history": (
+        "WINDOWS",
+        "Series",
+        "PositionHistory",
+    ),
+    "lazy": (
+        "lazy_import",
+    ),
+    "metrics": (
+        "Registry",
+        "Counter",
+        "Gauge",
+        "Histogram",
+        "REGISTRY",
+        "MetricsServer",
+    ),
+    "monitor": (
+        "BaseMonitor",
+        "PositionMonitor",
+        "MarketMonitor",
+        "FundingMonitor",
+        "LiquidationMonitor",
+        "SpreadMonitor",
+        "OrderMonitor",
+        "ExchangeMonitor",
+        "MonitorGroup",
+    ),
+    "profiler": (
+        "LoopProfiler",
+    ),
+    "records": (
+        "Record",
+        "convert",
+        "MarkPrice",
+        "OrderUpdate",
+        "OrderTradeUpdate",
+        "Position",
+        "LiquidationOrder",
+        "ForceOrder",
+        "BookTicker",
+    ),
+    "recorder": (
+        "SEGMENT_VERSION",
+        "StreamRecorder",
+        "read_segments",
+    ),
+    "registry": (
+        "MonitorSpec",
+        "MONITORS",
+        "register_monitor",
+        "load_plugins",
+        "Account",
+    ),
+    "replay": (
+        "CaptureBot",
+        "Replayer",
+    ),
+    "reports": (
+        "make_executor",
+        "run_report",
+        "position_report",
+        "order_report",
+    ),
+    "scheduler": (
+        "Schedule",
+        "Every",
+        "Cron",
+        "parse_schedule",
+        "Job",
+        "Scheduler",
+    ),
+    "shm": (
+        "SymbolTable",
+        "MarketRing",
+        "MarketPublisher",
+    ),
+    "spread": (
+        "SpreadBook",
+    ),
+    "state": (
+        "StateNamespace",
+        "StateStore",
+    ),
+    "streams": (
+        "StreamHub",
+    ),
+    "supervisor": (
+        "Supervisor",
+    ),
+    "timewindow": (
+        "TimewindowEmpty",
+        "Timewindow",
+        "SparseTimewindow",
+        "SumTimewindow",
+    ),
+    "utils": (
+        "format_symbol",
+        "markdown_color",
+        "time_ms",
+        "parse_interval",
+        "format_milliseconds",
+        "until_next",
+        "until_next_day",
+        "until_next_hour",
+        "until_next_minute",
+        "until_next_second",
+        "restapi_wrapper",
+        "write_atomic",
+        "json_load",
+        "json_dump",
+        "csv_append",
+        "csv_appendrows",
+    ),
+    "volatility": (
+        "ReturnStats",
+    ),
+}
+_exports = {name: module for module, names in _submodules.items() for name in names}
+
+__all__ = [name for names in _submodules.values() for name in names]
+
+
+def __getattr__(
+    name: str,
+):
+    if name in _submodules:
+        return importlib.import_module(f".{name}", __name__)
+    if name in _exports:
+        value = getattr(importlib.import_module(f".{_exports[name]}", __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {repr(__name__)} has no attribute {repr(name)}")
+
+
+def __dir__() -> list[str]:
+    return sorted({*globals(), *__all__, *_submodules})
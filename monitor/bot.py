@@ -1,10 +1,11 @@
-import aiohttp
 import asyncio
 from types import TracebackType
 from typing import Self, Type
 from loguru import logger
 
 from .cards import launch_card_factory, finish_card_factory, error_card_factory
+from .clock import Clock, REAL_CLOCK
+from .metrics import Counter, Gauge, Histogram
 
 __all__ = [
     "BaseBot",
@@ -12,6 +13,27 @@ __all__ = [
     "BotNowait",
 ]
 
+BOT_QUEUE_DEPTH = Gauge(
+    "monitor_bot_queue_depth",
+    "Payloads waiting in the bot queue.",
+    ("bot",),
+)
+BOT_SEND_SECONDS = Histogram(
+    "monitor_bot_send_seconds",
+    "Webhook POST latency per try.",
+    ("bot",),
+)
+BOT_RETRIES = Counter(
+    "monitor_bot_retries_total",
+    "Webhook tries that failed and were retried.",
+    ("bot",),
+)
+BOT_FAILURES = Counter(
+    "monitor_bot_failures_total",
+    "Payloads dropped after all tries failed.",
+    ("bot",),
+)
+
 
 class BaseBot:
 
@@ -19,10 +41,16 @@ class BaseBot:
         self,
         url: str,
         *,
+        name: str = "bot",
         delay: float = 1.0,
+        clock: Clock | None = None,
     ) -> None:
         self._url = url
+        self._name = name
         self._delay = delay
+        self._clock = REAL_CLOCK if clock is None else clock
+        import aiohttp
+
         self._que = asyncio.Queue()
         self._sess = aiohttp.ClientSession()
         self._task = None
@@ -106,30 +134,36 @@ class Bot(BaseBot):
         error_card = error_card_factory()
 
         url = self._url
+        name = self._name
         delay = self._delay
         while True:
             payload, event = await self._que.get()
+            BOT_QUEUE_DEPTH.set(self._que.qsize(), bot=name)
             logger.info(f"payload: {repr(payload)[:256]}")
             max_tries = 3
             for _ in range(max_tries):
-                await asyncio.sleep(delay)
-                resp = await self._sess.post(url, json=payload)
+                await self._clock.sleep(delay)
+                with BOT_SEND_SECONDS.time(bot=name):
+                    resp = await self._sess.post(url, json=payload)
+                    text = await resp.text()
                 status = resp.status
                 reason = resp.reason
                 headers = resp.headers
-                text = await resp.text()
                 if not resp.ok:
                     logger.warning(f"{status} {reason} {text}")
+                    BOT_RETRIES.inc(bot=name)
                     continue
                 data = await resp.json()
                 if not (isinstance(data, dict) and 0 == data.get("code")):
                     logger.warning(f"{status} {reason} {text}")
+                    BOT_RETRIES.inc(bot=name)
                     continue
                 logger.success(f"{status} {reason} {text}")
                 break
             else:
                 message = f"{status} {reason} {text}\n{headers}"
                 logger.error(message)
+                BOT_FAILURES.inc(bot=name)
                 error_card["body"]["elements"][1]["text"]["content"] = message
                 payload = {"msg_type": "interactive", "card": error_card}
                 resp = await self._sess.post(url, json=payload)
@@ -143,6 +177,7 @@ class Bot(BaseBot):
         event = asyncio.Event()
         payload = {"msg_type": "text", "content": {"text": text}}
         await self._que.put((payload, event))
+        BOT_QUEUE_DEPTH.set(self._que.qsize(), bot=self._name)
         return event
 
     async def send_post(
@@ -152,6 +187,7 @@ class Bot(BaseBot):
         event = asyncio.Event()
         payload = {"msg_type": "post", "content": {"post": post}}
         await self._que.put((payload, event))
+        BOT_QUEUE_DEPTH.set(self._que.qsize(), bot=self._name)
         return event
 
     async def send_share_chat(
@@ -164,6 +200,7 @@ class Bot(BaseBot):
             "content": {"share_chat_id": share_chat_id},
         }
         await self._que.put((payload, event))
+        BOT_QUEUE_DEPTH.set(self._que.qsize(), bot=self._name)
         return event
 
     async def send_image(
@@ -173,6 +210,7 @@ class Bot(BaseBot):
         event = asyncio.Event()
         payload = {"msg_type": "image", "content": {"image_key": image_key}}
         await self._que.put((payload, event))
+        BOT_QUEUE_DEPTH.set(self._que.qsize(), bot=self._name)
         return event
 
     async def send_interactive(
@@ -182,6 +220,7 @@ class Bot(BaseBot):
         event = asyncio.Event()
         payload = {"msg_type": "interactive", "card": card}
         await self._que.put((payload, event))
+        BOT_QUEUE_DEPTH.set(self._que.qsize(), bot=self._name)
         return event
 
 
@@ -209,33 +248,39 @@ class BotNowait(BaseBot):
         error_card = error_card_factory()
 
         url = self._url
+        name = self._name
         delay = self._delay
         while True:
-            await asyncio.sleep(1.0)
+            await self._clock.sleep(1.0)
             if self._que.empty():
                 continue
             payload, event = self._que.get_nowait()
+            BOT_QUEUE_DEPTH.set(self._que.qsize(), bot=name)
             logger.info(f"payload: {repr(payload)[:256]}")
             max_tries = 3
             for _ in range(max_tries):
-                await asyncio.sleep(delay)
-                resp = await self._sess.post(url, json=payload)
+                await self._clock.sleep(delay)
+                with BOT_SEND_SECONDS.time(bot=name):
+                    resp = await self._sess.post(url, json=payload)
+                    text = await resp.text()
                 status = resp.status
                 reason = resp.reason
                 headers = resp.headers
-                text = await resp.text()
                 if not resp.ok:
                     logger.warning(f"{status} {reason} {text}")
+                    BOT_RETRIES.inc(bot=name)
                     continue
                 data = await resp.json()
                 if not (isinstance(data, dict) and 0 == data.get("code")):
                     logger.warning(f"{status} {reason} {text}")
+                    BOT_RETRIES.inc(bot=name)
                     continue
                 logger.success(f"{status} {reason} {text}")
                 break
             else:
                 message = f"{status} {reason} {text}\n{headers}"
                 logger.error(message)
+                BOT_FAILURES.inc(bot=name)
                 error_card["body"]["elements"][1]["text"]["content"] = message
                 payload = {"msg_type": "interactive", "card": error_card}
                 resp = await self._sess.post(url, json=payload)
@@ -249,6 +294,7 @@ class BotNowait(BaseBot):
         event = asyncio.Event()
         payload = {"msg_type": "text", "content": {"text": text}}
         self._que.put_nowait((payload, event))
+        BOT_QUEUE_DEPTH.set(self._que.qsize(), bot=self._name)
         return event
 
     def send_post(
@@ -258,6 +304,7 @@ class BotNowait(BaseBot):
         event = asyncio.Event()
         payload = {"msg_type": "post", "content": {"post": post}}
         self._que.put_nowait((payload, event))
+        BOT_QUEUE_DEPTH.set(self._que.qsize(), bot=self._name)
         return event
 
     def send_share_chat(
@@ -270,6 +317,7 @@ class BotNowait(BaseBot):
             "content": {"share_chat_id": share_chat_id},
         }
         self._que.put_nowait((payload, event))
+        BOT_QUEUE_DEPTH.set(self._que.qsize(), bot=self._name)
         return event
 
     def send_image(
@@ -279,6 +327,7 @@ class BotNowait(BaseBot):
         event = asyncio.Event()
         payload = {"msg_type": "image", "content": {"image_key": image_key}}
         self._que.put_nowait((payload, event))
+        BOT_QUEUE_DEPTH.set(self._que.qsize(), bot=self._name)
         return event
 
     def send_interactive(
@@ -288,4 +337,5 @@ class BotNowait(BaseBot):
         event = asyncio.Event()
         payload = {"msg_type": "interactive", "card": card}
         self._que.put_nowait((payload, event))
+        BOT_QUEUE_DEPTH.set(self._que.qsize(), bot=self._name)
         return event
@@ -0,0 +1,33 @@
+from __future__ import annotations
+
+from .lazy import *
+
+np = lazy_import("numpy")
+
+__all__ = [
+    "PERCENTILES",
+    "breadth",
+]
+
+PERCENTILES = (5, 25, 50, 75, 95)
+
+
+def breadth(
+    change_percents: np.ndarray,
+    threshold: float,
+) -> dict[str, float]:
+    valid = change_percents[np.isfinite(change_percents)]
+    n = len(valid)
+    stats = {
+        "symbols": n,
+        "advancers": int(np.count_nonzero(0 < valid)),
+        "decliners": int(np.count_nonzero(valid < 0)),
+        "up": int(np.count_nonzero(threshold <= valid)),
+        "down": int(np.count_nonzero(valid <= -threshold)),
+    }
+    stats["up_percent"] = 100 * stats["up"] / n if 0 < n else 0.0
+    stats["down_percent"] = 100 * stats["down"] / n if 0 < n else 0.0
+    percentiles = np.percentile(valid, PERCENTILES) if 0 < n else np.full(len(PERCENTILES), np.nan)
+    for q, x in zip(PERCENTILES, percentiles):
+        stats[f"p{q}"] = float(x)
+    return stats
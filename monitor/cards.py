@@ -8,6 +8,10 @@ __all__ = [
     "error_card_factory",
     "position_card_factory",
     "market_card_factory",
+    "breadth_card_factory",
+    "funding_card_factory",
+    "liquidation_card_factory",
+    "spread_card_factory",
     "order_card_factory",
     "exchange_card_factory",
 ]
@@ -203,6 +207,16 @@ POSITION_CARD = {
                         },
                         "width": "120px",
                     },
+                    {
+                        "name": "change4h_percent",
+                        "display_name": "近4h涨跌(%)",
+                        "data_type": "number",
+                        "format": {
+                            "precision": 2,
+                            "separator": False,
+                        },
+                        "width": "120px",
+                    },
                     {
                         "name": "change12h_percent",
                         "display_name": "近12h涨跌(%)",
@@ -213,6 +227,16 @@ POSITION_CARD = {
                         },
                         "width": "120px",
                     },
+                    {
+                        "name": "change24h_percent",
+                        "display_name": "近24h涨跌(%)",
+                        "data_type": "number",
+                        "format": {
+                            "precision": 2,
+                            "separator": False,
+                        },
+                        "width": "120px",
+                    },
                 ],
             },
             {
@@ -310,6 +334,16 @@ POSITION_CARD = {
                         },
                         "width": "120px",
                     },
+                    {
+                        "name": "change4h_percent",
+                        "display_name": "近4h涨跌(%)",
+                        "data_type": "number",
+                        "format": {
+                            "precision": 2,
+                            "separator": False,
+                        },
+                        "width": "120px",
+                    },
                     {
                         "name": "change12h_percent",
                         "display_name": "近12h涨跌(%)",
@@ -320,6 +354,16 @@ POSITION_CARD = {
                         },
                         "width": "120px",
                     },
+                    {
+                        "name": "change24h_percent",
+                        "display_name": "近24h涨跌(%)",
+                        "data_type": "number",
+                        "format": {
+                            "precision": 2,
+                            "separator": False,
+                        },
+                        "width": "120px",
+                    },
                 ],
             },
             {
@@ -367,6 +411,36 @@ POSITION_CARD = {
                         },
                         "width": "120px",
                     },
+                    {
+                        "name": "pnl4h",
+                        "display_name": "近4h盈亏(U)",
+                        "data_type": "number",
+                        "format": {
+                            "precision": 2,
+                            "separator": False,
+                        },
+                        "width": "120px",
+                    },
+                    {
+                        "name": "pnl12h",
+                        "display_name": "近12h盈亏(U)",
+                        "data_type": "number",
+                        "format": {
+                            "precision": 2,
+                            "separator": False,
+                        },
+                        "width": "120px",
+                    },
+                    {
+                        "name": "pnl24h",
+                        "display_name": "近24h盈亏(U)",
+                        "data_type": "number",
+                        "format": {
+                            "precision": 2,
+                            "separator": False,
+                        },
+                        "width": "120px",
+                    },
                     {
                         "name": "drawdown_percent",
                         "display_name": "当前回撤(%)",
@@ -422,13 +496,340 @@ MARKET_CARD = {
                     {
                         "name": "change_percent",
                         "display_name": "涨跌(%)",
+                        "data_type": "markdown",
+                        "width": "80px",
+                    },
+                ],
+            },
+        ],
+    },
+}
+
+BREADTH_CARD = {
+    "schema": "2.0",
+    "config": {
+        "width_mode": "fill",
+    },
+    "header": {
+        "template": "blue",
+        "title": {
+            "tag": "plain_text",
+            "content": "市场宽度推送",
+        },
+    },
+    "body": {
+        "elements": [
+            LOCAL_DATETIME_ELEMENT,
+            {
+                "tag": "table",
+                "freeze_first_column": False,
+                "page_size": 10,
+                "row_height": "auto",
+                "row_max_height": "60px",
+                "header_style": {},
+                "rows": [],
+                "columns": [
+                    {
+                        "name": "timedelta",
+                        "display_name": "时段",
+                        "data_type": "markdown",
+                        "width": "80px",
+                    },
+                    {
+                        "name": "direction",
+                        "display_name": "方向",
+                        "data_type": "markdown",
+                        "width": "80px",
+                    },
+                    {
+                        "name": "share_percent",
+                        "display_name": "占比(%)",
+                        "data_type": "number",
+                        "format": {
+                            "precision": 2,
+                            "separator": False,
+                        },
+                        "width": "80px",
+                    },
+                    {
+                        "name": "advancers",
+                        "display_name": "上涨数",
+                        "data_type": "number",
+                        "format": {
+                            "precision": 0,
+                            "separator": False,
+                        },
+                        "width": "80px",
+                    },
+                    {
+                        "name": "decliners",
+                        "display_name": "下跌数",
+                        "data_type": "number",
+                        "format": {
+                            "precision": 0,
+                            "separator": False,
+                        },
+                        "width": "80px",
+                    },
+                    {
+                        "name": "median_percent",
+                        "display_name": "中位数(%)",
+                        "data_type": "number",
+                        "format": {
+                            "precision": 2,
+                            "separator": False,
+                        },
+                        "width": "80px",
+                    },
+                    {
+                        "name": "range_percent",
+                        "display_name": "P5~P95(%)",
+                        "data_type": "markdown",
+                        "width": "140px",
+                    },
+                ],
+            },
+        ],
+    },
+}
+
+FUNDING_CARD = {
+    "schema": "2.0",
+    "config": {
+        "width_mode": "fill",
+    },
+    "header": {
+        "template": "blue",
+        "title": {
+            "tag": "plain_text",
+            "content": "资金费率推送",
+        },
+    },
+    "body": {
+        "elements": [
+            LOCAL_DATETIME_ELEMENT,
+            {
+                "tag": "table",
+                "freeze_first_column": False,
+                "page_size": 10,
+                "row_height": "auto",
+                "row_max_height": "60px",
+                "header_style": {},
+                "rows": [],
+                "columns": [
+                    {
+                        "name": "symbol",
+                        "display_name": "交易对",
+                        "data_type": "markdown",
+                        "width": "160px",
+                    },
+                    {
+                        "name": "reason",
+                        "display_name": "原因",
+                        "data_type": "markdown",
+                        "width": "100px",
+                    },
+                    {
+                        "name": "funding_rate_percent",
+                        "display_name": "资金费率(%)",
+                        "data_type": "number",
+                        "format": {
+                            "precision": 4,
+                            "separator": False,
+                        },
+                        "width": "100px",
+                    },
+                    {
+                        "name": "last_funding_rate_percent",
+                        "display_name": "上期费率(%)",
+                        "data_type": "number",
+                        "format": {
+                            "precision": 4,
+                            "separator": False,
+                        },
+                        "width": "100px",
+                    },
+                    {
+                        "name": "funding_fee",
+                        "display_name": "预估资金费",
                         "data_type": "number",
                         "format": {
                             "precision": 2,
                             "separator": False,
                         },
+                        "width": "100px",
+                    },
+                    {
+                        "name": "next_funding_time",
+                        "display_name": "结算时间",
+                        "data_type": "date",
+                        "date_format": "YYYY-MM-DD HH:mm:ss",
+                        "width": "160px",
+                    },
+                ],
+            },
+        ],
+    },
+}
+
+LIQUIDATION_CARD = {
+    "schema": "2.0",
+    "config": {
+        "width_mode": "fill",
+    },
+    "header": {
+        "template": "blue",
+        "title": {
+            "tag": "plain_text",
+            "content": "爆仓推送",
+        },
+    },
+    "body": {
+        "elements": [
+            LOCAL_DATETIME_ELEMENT,
+            {
+                "tag": "table",
+                "freeze_first_column": False,
+                "page_size": 10,
+                "row_height": "auto",
+                "row_max_height": "60px",
+                "header_style": {},
+                "rows": [],
+                "columns": [
+                    {
+                        "name": "symbol",
+                        "display_name": "交易对",
+                        "data_type": "markdown",
+                        "width": "160px",
+                    },
+                    {
+                        "name": "side",
+                        "display_name": "爆仓方向",
+                        "data_type": "markdown",
+                        "width": "100px",
+                    },
+                    {
+                        "name": "timedelta",
+                        "display_name": "时段",
+                        "data_type": "markdown",
                         "width": "80px",
                     },
+                    {
+                        "name": "notional",
+                        "display_name": "爆仓额",
+                        "data_type": "number",
+                        "format": {
+                            "precision": 2,
+                            "separator": True,
+                        },
+                        "width": "120px",
+                    },
+                    {
+                        "name": "count",
+                        "display_name": "笔数",
+                        "data_type": "number",
+                        "format": {
+                            "precision": 0,
+                            "separator": False,
+                        },
+                        "width": "80px",
+                    },
+                ],
+            },
+        ],
+    },
+}
+
+SPREAD_CARD = {
+    "schema": "2.0",
+    "config": {
+        "width_mode": "fill",
+    },
+    "header": {
+        "template": "blue",
+        "title": {
+            "tag": "plain_text",
+            "content": "价差推送",
+        },
+    },
+    "body": {
+        "elements": [
+            LOCAL_DATETIME_ELEMENT,
+            {
+                "tag": "table",
+                "freeze_first_column": False,
+                "page_size": 10,
+                "row_height": "auto",
+                "row_max_height": "60px",
+                "header_style": {},
+                "rows": [],
+                "columns": [
+                    {
+                        "name": "symbol",
+                        "display_name": "交易对",
+                        "data_type": "markdown",
+                        "width": "160px",
+                    },
+                    {
+                        "name": "spread_bps",
+                        "display_name": "价差(bp)",
+                        "data_type": "number",
+                        "format": {
+                            "precision": 2,
+                            "separator": False,
+                        },
+                        "width": "80px",
+                    },
+                    {
+                        "name": "mean_bps",
+                        "display_name": "均值(bp)",
+                        "data_type": "number",
+                        "format": {
+                            "precision": 2,
+                            "separator": False,
+                        },
+                        "width": "80px",
+                    },
+                    {
+                        "name": "zscore",
+                        "display_name": "偏离(σ)",
+                        "data_type": "number",
+                        "format": {
+                            "precision": 1,
+                            "separator": False,
+                        },
+                        "width": "80px",
+                    },
+                    {
+                        "name": "bid_price",
+                        "display_name": "买一价(U)",
+                        "data_type": "number",
+                        "format": {
+                            "precision": 5,
+                            "separator": False,
+                        },
+                        "width": "120px",
+                    },
+                    {
+                        "name": "ask_price",
+                        "display_name": "卖一价(U)",
+                        "data_type": "number",
+                        "format": {
+                            "precision": 5,
+                            "separator": False,
+                        },
+                        "width": "120px",
+                    },
+                    {
+                        "name": "depth",
+                        "display_name": "盘口深度(U)",
+                        "data_type": "number",
+                        "format": {
+                            "precision": 2,
+                            "separator": True,
+                        },
+                        "width": "120px",
+                    },
                 ],
             },
         ],
@@ -649,5 +1050,9 @@ finish_card_factory = lambda: copy.deepcopy(FINISH_CARD)
 error_card_factory = lambda: copy.deepcopy(ERROR_CARD)
 position_card_factory = lambda: copy.deepcopy(POSITION_CARD)
 market_card_factory = lambda: copy.deepcopy(MARKET_CARD)
+breadth_card_factory = lambda: copy.deepcopy(BREADTH_CARD)
+funding_card_factory = lambda: copy.deepcopy(FUNDING_CARD)
+liquidation_card_factory = lambda: copy.deepcopy(LIQUIDATION_CARD)
+spread_card_factory = lambda: copy.deepcopy(SPREAD_CARD)
 order_card_factory = lambda: copy.deepcopy(ORDER_CARD)
 exchange_card_factory = lambda: copy.deepcopy(EXCHANGE_CARD)
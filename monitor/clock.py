@@ -0,0 +1,186 @@
+import asyncio
+import datetime
+import heapq
+import itertools
+import time
+
+__all__ = [
+    "Clock",
+    "RealClock",
+    "ExchangeClock",
+    "VirtualClock",
+    "REAL_CLOCK",
+]
+
+
+class Clock:
+
+    def time(
+        self,
+    ) -> float:
+        raise NotImplementedError
+
+    def time_ms(
+        self,
+    ) -> int:
+        return int(1000 * self.time())
+
+    def now(
+        self,
+    ) -> datetime.datetime:
+        return datetime.datetime.fromtimestamp(self.time())
+
+    async def sleep(
+        self,
+        delay: float,
+    ) -> None:
+        raise NotImplementedError
+
+
+class RealClock(Clock):
+
+    def __init__(
+        self,
+        *,
+        interval: float = 10.0,
+        tolerance: float = 0.05,
+    ) -> None:
+        self._interval = interval
+        self._tolerance = tolerance
+        self.resyncs = 0
+        self.resync()
+
+    def time(
+        self,
+    ) -> float:
+        m = time.monotonic()
+        t = self._t0 + (m - self._m0)
+        if self._interval <= m - self._checked:
+            self._checked = m
+            if self._tolerance < abs(time.time() - t):
+                self.resyncs += 1
+                self.resync()
+                return self._t0
+        return t
+
+    def resync(
+        self,
+    ) -> None:
+        self._t0 = time.time()
+        self._m0 = self._checked = time.monotonic()
+
+    async def sleep(
+        self,
+        delay: float,
+    ) -> None:
+        await asyncio.sleep(delay)
+
+
+class ExchangeClock(Clock):
+
+    def __init__(
+        self,
+        base: Clock | None = None,
+        *,
+        offset: int = 0,
+    ) -> None:
+        self._base = REAL_CLOCK if base is None else base
+        self._offset = offset
+
+    @property
+    def base(
+        self,
+    ) -> Clock:
+        return self._base
+
+    @property
+    def offset(
+        self,
+    ) -> int:
+        return self._offset
+
+    def adjust(
+        self,
+        offset: int,
+    ) -> None:
+        self._offset = offset
+
+    def time(
+        self,
+    ) -> float:
+        return self._base.time() + self._offset / 1000
+
+    def time_ms(
+        self,
+    ) -> int:
+        return self._base.time_ms() + self._offset
+
+    async def sleep(
+        self,
+        delay: float,
+    ) -> None:
+        await self._base.sleep(delay)
+
+
+class VirtualClock(Clock):
+
+    def __init__(
+        self,
+        t: int = 0,
+        *,
+        settle: int = 8,
+    ) -> None:
+        self._t = t
+        self._settle = settle
+        self._heap = []
+        self._seq = itertools.count()
+
+    def time(
+        self,
+    ) -> float:
+        return self._t / 1000
+
+    def time_ms(
+        self,
+    ) -> int:
+        return self._t
+
+    async def sleep(
+        self,
+        delay: float,
+    ) -> None:
+        if delay <= 0:
+            await asyncio.sleep(0)
+            return
+        fut = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._heap, (self._t + int(1000 * delay), next(self._seq), fut))
+        await fut
+
+    def set(
+        self,
+        t: int,
+    ) -> None:
+        self._t = t
+
+    async def settle(
+        self,
+    ) -> None:
+        for _ in range(self._settle):
+            await asyncio.sleep(0)
+
+    async def advance(
+        self,
+        t: int,
+    ) -> None:
+        heap = self._heap
+        await asyncio.sleep(0)
+        while 0 < len(heap) and heap[0][0] <= t:
+            deadline, _, fut = heapq.heappop(heap)
+            self._t = max(self._t, deadline)
+            if not fut.done():
+                fut.set_result(None)
+            await self.settle()
+        self._t = max(self._t, t)
+
+
+REAL_CLOCK = RealClock()
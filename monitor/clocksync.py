@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import asyncio
+import collections
+from types import TracebackType
+from typing import TYPE_CHECKING, Self, Type
+from loguru import logger
+
+from .clock import *
+from .metrics import *
+
+if TYPE_CHECKING:
+    from binance.um_futures import UMFutures
+
+__all__ = [
+    "ClockSync",
+]
+
+CLOCK_OFFSET = Gauge(
+    "monitor_clock_offset_milliseconds",
+    "Estimated exchange clock offset (server - local).",
+)
+CLOCK_RTT = Gauge(
+    "monitor_clock_rtt_milliseconds",
+    "Round-trip time of the sample the offset was taken from.",
+)
+FRAME_LAG = Histogram(
+    "monitor_frame_lag_seconds",
+    "Estimated server time at receipt minus frame event time.",
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+
+
+class ClockSync:
+
+    def __init__(
+        self,
+        client: UMFutures,
+        *,
+        clock: ExchangeClock | None = None,
+        interval: float = 5 * 60.0,
+        burst: int = 3,
+        samples: int = 8,
+        alpha: float = 0.05,
+    ) -> None:
+        self._client = client
+        self._clock = ExchangeClock() if clock is None else clock
+        self._interval = interval
+        self._burst = burst
+        self._samples = collections.deque(maxlen=samples)
+        self._alpha = alpha
+        self._task = None
+        self.rtt = None
+        self.lag = None
+        self.lag_max = 0
+
+    async def __aenter__(
+        self,
+    ) -> Self:
+        await self.start()
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: Type[BaseException] | None,
+        exc_value: BaseException | None,
+        exc_traceback: TracebackType | None,
+    ) -> None:
+        await self.stop()
+
+    async def _engine(
+        self,
+    ) -> None:
+        delay = self._interval
+        while True:
+            await self._clock.sleep(delay)
+            await self.sync(1)
+
+    async def start(
+        self,
+    ) -> None:
+        logger.info(f"{self} starting")
+        if self.running:
+            logger.warning(f"{self} has started")
+            return
+        await self.sync(self._burst)
+        self._task = asyncio.create_task(self._engine())
+        logger.info(f"{self} started")
+
+    async def stop(
+        self,
+    ) -> None:
+        logger.info(f"{self} stopping")
+        if not self.running:
+            logger.warning(f"{self} has stopped")
+            return
+        self._task.cancel()
+        self._task = None
+        logger.info(f"{self} stopped")
+
+    @property
+    def running(
+        self,
+    ) -> bool:
+        return not (self._task is None or self._task.cancelled() or self._task.done())
+
+    @property
+    def clock(
+        self,
+    ) -> ExchangeClock:
+        return self._clock
+
+    @property
+    def offset(
+        self,
+    ) -> int:
+        return self._clock.offset
+
+    def _probe(
+        self,
+    ) -> tuple[int, int]:
+        base = self._clock.base
+        t0 = base.time_ms()
+        server_time = self._client.time()["serverTime"]
+        t1 = base.time_ms()
+        return t1 - t0, server_time - (t0 + t1) // 2
+
+    async def sync(
+        self,
+        n: int = 1,
+    ) -> None:
+        for _ in range(n):
+            try:
+                rtt, offset = await asyncio.to_thread(self._probe)
+            except Exception as e:
+                logger.warning(f"sync\n{repr(e)}")
+                continue
+            self._samples.append((rtt, offset))
+        if 0 == len(self._samples):
+            return
+        self.rtt, offset = min(self._samples)
+        self._clock.adjust(offset)
+        self.lag_max = 0
+        CLOCK_OFFSET.set(offset)
+        CLOCK_RTT.set(self.rtt)
+        logger.info(f"sync rtt={self.rtt}ms offset={offset}ms")
+
+    def observe(
+        self,
+        event_time: int,
+    ) -> int:
+        lag = self._clock.time_ms() - event_time
+        if lag < 0:
+            self._clock.adjust(self._clock.offset - lag)
+            lag = 0
+        self.lag = lag if self.lag is None else self.lag + self._alpha * (lag - self.lag)
+        self.lag_max = max(self.lag_max, lag)
+        FRAME_LAG.observe(lag / 1000)
+        return lag
@@ -0,0 +1,156 @@
+import json
+from typing import Any
+
+from .records import *
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+__all__ = [
+    "DecodeError",
+    "BACKEND",
+    "loads",
+    "decode_envelope",
+    "decode_mark_prices",
+    "decode_user_event",
+    "decode_positions",
+    "decode_force_order",
+    "decode_book_ticker",
+]
+
+
+class DecodeError(Exception):
+    pass
+
+
+if msgspec is not None:
+    BACKEND = "msgspec"
+    _loads = msgspec.json.Decoder().decode
+    _errors = (msgspec.DecodeError,)
+elif orjson is not None:
+    BACKEND = "orjson"
+    _loads = orjson.loads
+    _errors = (orjson.JSONDecodeError,)
+else:
+    BACKEND = "json"
+    _loads = json.loads
+    _errors = (json.JSONDecodeError,)
+
+
+def loads(
+    data: bytes | str,
+) -> Any:
+    try:
+        return _loads(data)
+    except _errors as e:
+        raise DecodeError(repr(e)) from e
+
+
+def _convert[T](
+    obj: Any,
+    typ: type[T],
+) -> T:
+    try:
+        return convert(obj, typ)
+    except Exception as e:
+        raise DecodeError(repr(e)) from e
+
+
+if msgspec is not None:
+
+    class _Envelope(msgspec.Struct):
+        stream: str | None = None
+        data: msgspec.Raw = msgspec.Raw()
+
+    _envelope_decoder = msgspec.json.Decoder(_Envelope)
+    _mark_prices_decoder = msgspec.json.Decoder(list[MarkPrice] | dict[str, Any], strict=False)
+    _book_ticker_decoder = msgspec.json.Decoder(BookTicker, strict=False)
+
+    def decode_envelope(
+        data: bytes | str,
+    ) -> tuple[str | None, Any]:
+        try:
+            envelope = _envelope_decoder.decode(data)
+        except msgspec.ValidationError:
+            return None, loads(data)
+        except msgspec.DecodeError as e:
+            raise DecodeError(repr(e)) from e
+        if envelope.stream is None:
+            return None, loads(data)
+        return envelope.stream, envelope.data
+
+    def decode_mark_prices(
+        data: Any,
+    ) -> list[MarkPrice] | Any:
+        try:
+            return _mark_prices_decoder.decode(data)
+        except msgspec.DecodeError as e:
+            raise DecodeError(repr(e)) from e
+
+    def decode_book_ticker(
+        data: Any,
+    ) -> BookTicker | Any:
+        try:
+            return _book_ticker_decoder.decode(data)
+        except msgspec.ValidationError:
+            return loads(data)
+        except msgspec.DecodeError as e:
+            raise DecodeError(repr(e)) from e
+
+else:
+
+    def decode_envelope(
+        data: bytes | str,
+    ) -> tuple[str | None, Any]:
+        obj = loads(data)
+        if not (isinstance(obj, dict) and "stream" in obj):
+            return None, obj
+        return obj["stream"], obj.get("data")
+
+    def decode_mark_prices(
+        data: Any,
+    ) -> list[MarkPrice] | Any:
+        obj = data if isinstance(data, (dict, list)) else loads(data)
+        if not isinstance(obj, list):
+            return obj
+        return [_convert(x, MarkPrice) for x in obj]
+
+    def decode_book_ticker(
+        data: Any,
+    ) -> BookTicker | Any:
+        obj = data if isinstance(data, (dict, list)) else loads(data)
+        if not (isinstance(obj, dict) and "bookTicker" == obj.get("e")):
+            return obj
+        return _convert(obj, BookTicker)
+
+
+def decode_user_event(
+    data: Any,
+) -> OrderTradeUpdate | Any:
+    obj = data if isinstance(data, (dict, list)) else loads(data)
+    if not (isinstance(obj, dict) and "ORDER_TRADE_UPDATE" == obj.get("e")):
+        return obj
+    return _convert(obj, OrderTradeUpdate)
+
+
+def decode_positions(
+    data: Any,
+) -> list[Position]:
+    obj = data if isinstance(data, list) else loads(data)
+    return [_convert(x, Position) for x in obj]
+
+
+def decode_force_order(
+    data: Any,
+) -> ForceOrder | Any:
+    obj = data if isinstance(data, (dict, list)) else loads(data)
+    if not (isinstance(obj, dict) and "forceOrder" == obj.get("e")):
+        return obj
+    return _convert(obj, ForceOrder)
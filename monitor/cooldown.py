@@ -0,0 +1,197 @@
+import heapq
+from typing import Any, Hashable, Iterable
+
+from .clock import *
+from .metrics import *
+from .state import *
+from .utils import *
+
+__all__ = [
+    "Cooldowns",
+]
+
+COOLDOWN_ENTRIES = Gauge(
+    "monitor_cooldown_entries",
+    "Live entries held per cooldown index.",
+    ("name",),
+)
+COOLDOWN_SUPPRESSED = Counter(
+    "monitor_cooldown_suppressed_total",
+    "Alerts suppressed by an active cooldown, by rule.",
+    ("name", "rule"),
+)
+
+
+def _milliseconds(
+    cooldown: str | float,
+) -> int:
+    if isinstance(cooldown, str):
+        return parse_interval(cooldown)
+    return round(1000 * cooldown)
+
+
+class Cooldowns:
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        cooldown: str | float = 0.0,
+        rules: dict[str, str | float] | None = None,
+        clock: Clock | None = None,
+        state: StateNamespace | None = None,
+    ) -> None:
+        self._name = name
+        self._cooldown = _milliseconds(cooldown)
+        self._rules = {rule: _milliseconds(x) for rule, x in (rules or {}).items()}
+        self._clock = REAL_CLOCK if clock is None else clock
+        self._state = state
+        self._expiries: dict[tuple[str, Hashable], int] = {}
+        self._heap: list[tuple[int, int, tuple[str, Hashable]]] = []
+        self._seq = 0
+        self._suppressed: dict[str, int] = {}
+        self._dirty = False
+        if state is not None:
+            self._restore(state.get(name, []))
+
+    def __repr__(
+        self,
+    ) -> str:
+        return f"{type(self).__name__}({repr(self._name)}, {len(self._expiries)} entries)"
+
+    def __len__(
+        self,
+    ) -> int:
+        return len(self._expiries)
+
+    def __contains__(
+        self,
+        item: tuple[str, Hashable],
+    ) -> bool:
+        return int(self._clock.time_ms()) < self._expiries.get(item, 0)
+
+    def cooldown(
+        self,
+        rule: str,
+    ) -> int:
+        return self._rules.get(rule, self._cooldown)
+
+    def set_cooldown(
+        self,
+        rule: str,
+        cooldown: str | float,
+    ) -> None:
+        self._rules[rule] = _milliseconds(cooldown)
+
+    def ready(
+        self,
+        rule: str,
+        key: Hashable,
+    ) -> bool:
+        return self._expiries.get((rule, key), 0) <= int(self._clock.time_ms())
+
+    def hit(
+        self,
+        rule: str,
+        key: Hashable,
+        *,
+        until: int | None = None,
+    ) -> bool:
+        now = int(self._clock.time_ms())
+        item = rule, key
+        expiries = self._expiries
+        if now < expiries.get(item, 0):
+            self._suppressed[rule] = self._suppressed.get(rule, 0) + 1
+            return False
+        expiry = now + self.cooldown(rule) if until is None else until
+        if expiry <= now:
+            return True
+        expiries[item] = expiry
+        self._push(expiry, item)
+        self._dirty = True
+        return True
+
+    def reset(
+        self,
+        rule: str,
+        key: Hashable,
+    ) -> None:
+        if self._expiries.pop((rule, key), None) is not None:
+            self._dirty = True
+
+    def expire(
+        self,
+    ) -> int:
+        now = int(self._clock.time_ms())
+        heap = self._heap
+        expiries = self._expiries
+        n = 0
+        while 0 < len(heap) and heap[0][0] <= now:
+            expiry, _, item = heapq.heappop(heap)
+            if expiries.get(item) == expiry:
+                del expiries[item]
+                n += 1
+        if len(expiries) < len(heap) // 2:
+            self._compact()
+        if 0 < n:
+            self._dirty = True
+        for rule, count in self._suppressed.items():
+            COOLDOWN_SUPPRESSED.inc(count, name=self._name, rule=rule)
+        self._suppressed.clear()
+        COOLDOWN_ENTRIES.set(len(expiries), name=self._name)
+        return n
+
+    def save(
+        self,
+    ) -> None:
+        if self._state is None or not self._dirty:
+            return
+        self._state.set(self._name, [[rule, self._encode(key), expiry] for (rule, key), expiry in self._expiries.items()])
+        self._dirty = False
+
+    def _push(
+        self,
+        expiry: int,
+        item: tuple[str, Hashable],
+    ) -> None:
+        self._seq += 1
+        heapq.heappush(self._heap, (expiry, self._seq, item))
+
+    def _compact(
+        self,
+    ) -> None:
+        self._heap = heap = []
+        for item, expiry in self._expiries.items():
+            self._seq += 1
+            heap.append((expiry, self._seq, item))
+        heapq.heapify(heap)
+
+    def _restore(
+        self,
+        entries: Iterable[list[Any]],
+    ) -> None:
+        now = int(self._clock.time_ms())
+        for rule, key, expiry in entries:
+            if now < expiry:
+                item = rule, self._decode(key)
+                self._expiries[item] = expiry
+                self._push(expiry, item)
+        COOLDOWN_ENTRIES.set(len(self._expiries), name=self._name)
+
+    @classmethod
+    def _encode(
+        cls,
+        key: Hashable,
+    ) -> Any:
+        if isinstance(key, tuple):
+            return [cls._encode(x) for x in key]
+        return key
+
+    @classmethod
+    def _decode(
+        cls,
+        key: Any,
+    ) -> Hashable:
+        if isinstance(key, list):
+            return tuple(cls._decode(x) for x in key)
+        return key
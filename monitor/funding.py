@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import math
+
+from .lazy import *
+from .records import *
+from .shm import *
+
+np = lazy_import("numpy")
+
+__all__ = [
+    "FundingHistory",
+]
+
+
+class FundingHistory:
+
+    def __init__(
+        self,
+        capacity: int = 1024,
+        *,
+        depth: int = 21,
+        symbols: SymbolTable | None = None,
+    ) -> None:
+        self.symbols = SymbolTable(capacity) if symbols is None else symbols
+        self._rates = np.full(capacity, np.nan)
+        self._nexts = np.zeros(capacity, dtype=np.int64)
+        self._settled_rates = np.full((capacity, depth), np.nan)
+        self._settled_times = np.zeros((capacity, depth), dtype=np.int64)
+        self._counts = np.zeros(capacity, dtype=np.int64)
+
+    @property
+    def depth(
+        self,
+    ) -> int:
+        return self._settled_rates.shape[1]
+
+    def push(
+        self,
+        data: list[MarkPrice],
+    ) -> None:
+        symbols = self.symbols
+        n = len(data)
+        idx = np.empty(n, dtype=np.int64)
+        rates = np.empty(n)
+        nexts = np.empty(n, dtype=np.int64)
+        k = 0
+        for x in data:
+            if "" == x.funding_rate:
+                continue
+            try:
+                idx[k] = symbols.index(x.symbol)
+            except IndexError:
+                continue
+            rates[k] = float(x.funding_rate)
+            nexts[k] = x.next_funding_time
+            k += 1
+        self.update(idx[:k], rates[:k], nexts[:k])
+
+    def update(
+        self,
+        idx: np.ndarray,
+        rates: np.ndarray,
+        nexts: np.ndarray,
+    ) -> None:
+        prev = self._nexts[idx]
+        settled = (0 < prev) & (prev < nexts)
+        if settled.any():
+            s = idx[settled]
+            j = self._counts[s] % self.depth
+            self._settled_rates[s, j] = self._rates[s]
+            self._settled_times[s, j] = prev[settled]
+            self._counts[s] += 1
+        self._rates[idx] = rates
+        self._nexts[idx] = nexts
+
+    def rate(
+        self,
+        symbol: str,
+    ) -> tuple[float, int]:
+        i = self.symbols.get(symbol)
+        if i is None:
+            return math.nan, 0
+        return float(self._rates[i]), int(self._nexts[i])
+
+    def last(
+        self,
+        symbol: str,
+    ) -> float:
+        i = self.symbols.get(symbol)
+        if i is None or 0 == self._counts[i]:
+            return math.nan
+        return float(self._settled_rates[i, (self._counts[i] - 1) % self.depth])
+
+    def history(
+        self,
+        symbol: str,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        i = self.symbols.get(symbol)
+        if i is None:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        count = int(self._counts[i])
+        order = np.arange(max(0, count - self.depth), count) % self.depth
+        return self._settled_times[i, order], self._settled_rates[i, order]
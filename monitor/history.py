@@ -0,0 +1,223 @@
+from __future__ import annotations
+
+import math
+from typing import Any, Iterable
+
+from .lazy import *
+from .records import *
+
+np = lazy_import("numpy")
+
+__all__ = [
+    "WINDOWS",
+    "Series",
+    "PositionHistory",
+]
+
+WINDOWS = {
+    "1h": 1000 * 60 * 60,
+    "4h": 1000 * 60 * 60 * 4,
+    "12h": 1000 * 60 * 60 * 12,
+    "24h": 1000 * 60 * 60 * 24,
+}
+
+
+class Series:
+
+    def __init__(
+        self,
+        fields: tuple[str, ...],
+        *,
+        capacity: int,
+        windows: dict[str, int] = WINDOWS,
+        tolerance: int = 30_000,
+    ) -> None:
+        self.fields = fields
+        self._columns = {field: i for i, field in enumerate(fields)}
+        self._windows = {window: i for i, window in enumerate(windows)}
+        self._spans = np.array(list(windows.values()), dtype=np.int64)
+        self._tolerance = tolerance
+        self._times = np.zeros(capacity, dtype=np.int64)
+        self._values = np.full((capacity, len(fields)), np.nan)
+        self._n = 0
+        self._bases = np.full(len(windows), -1, dtype=np.int64)
+        self._deltas = np.full((len(windows), len(fields)), np.nan)
+        self._origins = np.full((len(windows), len(fields)), np.nan)
+
+    def __len__(
+        self,
+    ) -> int:
+        return min(self._n, len(self._times))
+
+    @property
+    def time(
+        self,
+    ) -> int | None:
+        return None if 0 == self._n else int(self._times[(self._n - 1) % len(self._times)])
+
+    def push(
+        self,
+        t: int,
+        values: Iterable[float],
+    ) -> None:
+        times = self._times
+        capacity = len(times)
+        n = self._n
+        if 0 < n and t <= times[(n - 1) % capacity]:
+            return
+        i = n % capacity
+        times[i] = t
+        self._values[i] = row = np.fromiter(values, dtype=np.float64, count=len(self.fields))
+        self._n = n = n + 1
+        for k, span in enumerate(self._spans):
+            cutoff = t - span + self._tolerance
+            p = max(self._bases[k], n - capacity)
+            while p + 1 < n and times[(p + 1) % capacity] <= cutoff:
+                p += 1
+            self._bases[k] = p
+            if 0 <= p and times[p % capacity] <= cutoff:
+                self._origins[k] = origin = self._values[p % capacity]
+                self._deltas[k] = row - origin
+            else:
+                self._origins[k] = np.nan
+                self._deltas[k] = np.nan
+
+    def last(
+        self,
+        field: str,
+    ) -> float:
+        if 0 == self._n:
+            return math.nan
+        return float(self._values[(self._n - 1) % len(self._times), self._columns[field]])
+
+    def delta(
+        self,
+        window: str,
+        field: str,
+    ) -> float:
+        return float(self._deltas[self._windows[window], self._columns[field]])
+
+    def change_percent(
+        self,
+        window: str,
+        field: str,
+    ) -> float:
+        origin = self._origins[self._windows[window], self._columns[field]]
+        if not 0 < origin:
+            return math.nan
+        return float(100 * self._deltas[self._windows[window], self._columns[field]] / origin)
+
+    def window(
+        self,
+        span: int,
+        field: str,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        times = self._times
+        capacity = len(times)
+        n = self._n
+        idx = np.arange(max(0, n - capacity), n) % capacity
+        if 0 < n:
+            idx = idx[self.time - span <= times[idx]]
+        return times[idx], self._values[idx, self._columns[field]]
+
+
+class PositionHistory:
+
+    POSITION_FIELDS = ("price", "notional", "pnl")
+    ACCOUNT_FIELDS = ("totl", "long", "shrt")
+
+    def __init__(
+        self,
+        *,
+        step: int = 60_000,
+        windows: dict[str, int] = WINDOWS,
+    ) -> None:
+        self._step = step
+        self._windows = windows
+        self._span = max(windows.values())
+        self._capacity = self._span // step + 8
+        self._tolerance = step // 2
+        self.account = self._series(self.ACCOUNT_FIELDS)
+        self.positions = {}
+
+    @property
+    def windows(
+        self,
+    ) -> tuple[str, ...]:
+        return tuple(self._windows)
+
+    def _series(
+        self,
+        fields: tuple[str, ...],
+    ) -> Series:
+        return Series(fields, capacity=self._capacity, windows=self._windows, tolerance=self._tolerance)
+
+    def sample(
+        self,
+        t: int,
+        account: dict[str, Any],
+        positions: list[Position],
+    ) -> None:
+        long = shrt = 0.0
+        history = self.positions
+        for pos in positions:
+            if pos.notional < 0:
+                shrt += -pos.notional
+            else:
+                long += pos.notional
+            if 0 == pos.position_amt:
+                continue
+            key = pos.symbol, pos.position_side
+            series = history.get(key)
+            if series is None:
+                history[key] = series = self._series(self.POSITION_FIELDS)
+            series.push(t, (pos.mark_price, pos.notional, pos.unrealized_profit))
+        self.account.push(t, (float(account["totalMarginBalance"]), long, shrt))
+        for key in [key for key, series in history.items() if series.time < t - self._span]:
+            del history[key]
+
+    def changes(
+        self,
+        field: str = "price",
+    ) -> dict[tuple[str, str], dict[str, float]]:
+        changes = {}
+        for key, series in self.positions.items():
+            row = {}
+            for window in self._windows:
+                change_percent = series.change_percent(window, field)
+                if not math.isnan(change_percent):
+                    row[window] = change_percent
+            changes[key] = row
+        return changes
+
+    def pnls(
+        self,
+    ) -> dict[str, dict[str, float]]:
+        pnls = {}
+        account = self.account
+        for window in self._windows:
+            totl = account.delta(window, "totl")
+            if math.isnan(totl):
+                continue
+            pnls[window] = {
+                "long": account.delta(window, "long"),
+                "shrt": 0.0 - account.delta(window, "shrt"),
+                "totl": totl,
+            }
+        return pnls
+
+    def movers(
+        self,
+        window: str,
+        threshold: float,
+        *,
+        field: str = "price",
+        percent: bool = True,
+    ) -> list[tuple[tuple[str, str], float]]:
+        movers = []
+        for key, series in self.positions.items():
+            change = series.change_percent(window, field) if percent else series.delta(window, field)
+            if threshold <= abs(change):
+                movers.append((key, change))
+        movers.sort(key=lambda x: -abs(x[1]))
+        return movers
@@ -0,0 +1,23 @@
+import importlib.util
+import sys
+from types import ModuleType
+
+__all__ = [
+    "lazy_import",
+]
+
+
+def lazy_import(
+    name: str,
+) -> ModuleType:
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ModuleNotFoundError(f"No module named {repr(name)}", name=name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
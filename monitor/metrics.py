@@ -0,0 +1,339 @@
+from __future__ import annotations
+
+import bisect
+import math
+import threading
+import time
+from types import TracebackType
+from typing import TYPE_CHECKING, Self, Type
+from loguru import logger
+
+if TYPE_CHECKING:
+    import aiohttp.web
+
+__all__ = [
+    "Registry",
+    "Counter",
+    "Gauge",
+    "Histogram",
+    "REGISTRY",
+    "MetricsServer",
+]
+
+DEFAULT_BUCKETS = (
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+
+def _escape(
+    s: str,
+) -> str:
+    return s.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(
+    labelnames: tuple[str, ...],
+    labelvalues: tuple[str, ...],
+    extra: str = "",
+) -> str:
+    parts = [f'{k}="{_escape(v)}"' for k, v in zip(labelnames, labelvalues)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(
+    v: float,
+) -> str:
+    if math.isinf(v):
+        return "+Inf" if 0 < v else "-Inf"
+    return repr(float(v))
+
+
+class Registry:
+
+    def __init__(
+        self,
+    ) -> None:
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def register(
+        self,
+        metric: "Metric",
+    ) -> None:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"duplicate metric {repr(metric.name)}")
+            self._metrics[metric.name] = metric
+
+    def render(
+        self,
+    ) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {_escape(metric.help)}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+class Metric:
+    type = "untyped"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: tuple[str, ...] = (),
+        *,
+        registry: Registry | None = None,
+    ) -> None:
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}
+        (REGISTRY if registry is None else registry).register(self)
+
+    def _key(
+        self,
+        labels: dict[str, str],
+    ) -> tuple[str, ...]:
+        return tuple(str(labels[k]) for k in self.labelnames)
+
+    def render(
+        self,
+    ) -> list[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, k)} {_format_value(v)}" for k, v in items]
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def inc(
+        self,
+        amount: float = 1.0,
+        **labels: str,
+    ) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+
+class Gauge(Metric):
+    type = "gauge"
+
+    def set(
+        self,
+        value: float,
+        **labels: str,
+    ) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(
+        self,
+        amount: float = 1.0,
+        **labels: str,
+    ) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(
+        self,
+        amount: float = 1.0,
+        **labels: str,
+    ) -> None:
+        self.inc(-amount, **labels)
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: tuple[str, ...] = (),
+        *,
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+        registry: Registry | None = None,
+    ) -> None:
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, help, labelnames, registry=registry)
+
+    def observe(
+        self,
+        value: float,
+        **labels: str,
+    ) -> None:
+        key = self._key(labels)
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            if key not in self._values:
+                self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            counts, _, _ = values = self._values[key]
+            counts[i] += 1
+            values[1] += value
+            values[2] += 1
+
+    def time(
+        self,
+        **labels: str,
+    ) -> "_Timer":
+        return _Timer(self, labels)
+
+    def render(
+        self,
+    ) -> list[str]:
+        with self._lock:
+            items = sorted((k, (list(v[0]), v[1], v[2])) for k, v in self._values.items())
+        lines = []
+        for k, (counts, total, count) in items:
+            cumulative = 0
+            for le, n in zip((*self.buckets, math.inf), counts):
+                cumulative += n
+                labels = _format_labels(self.labelnames, k, f'le="{_format_value(le)}"')
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, k)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class _Timer:
+
+    def __init__(
+        self,
+        histogram: Histogram,
+        labels: dict[str, str],
+    ) -> None:
+        self._histogram = histogram
+        self._labels = labels
+        self._t0 = 0.0
+
+    def __enter__(
+        self,
+    ) -> Self:
+        self._t0 = time.perf_counter()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Type[BaseException] | None,
+        exc_value: BaseException | None,
+        exc_traceback: TracebackType | None,
+    ) -> None:
+        self._histogram.observe(time.perf_counter() - self._t0, **self._labels)
+
+    async def __aenter__(
+        self,
+    ) -> Self:
+        return self.__enter__()
+
+    async def __aexit__(
+        self,
+        exc_type: Type[BaseException] | None,
+        exc_value: BaseException | None,
+        exc_traceback: TracebackType | None,
+    ) -> None:
+        self.__exit__(exc_type, exc_value, exc_traceback)
+
+
+class MetricsServer:
+
+    def __init__(
+        self,
+        *,
+        host: str = "127.0.0.1",
+        port: int = 9100,
+        registry: Registry | None = None,
+    ) -> None:
+        self._host = host
+        self._port = port
+        self._registry = REGISTRY if registry is None else registry
+        self._runner = None
+
+    async def __aenter__(
+        self,
+    ) -> Self:
+        await self.start()
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: Type[BaseException] | None,
+        exc_value: BaseException | None,
+        exc_traceback: TracebackType | None,
+    ) -> None:
+        await self.stop()
+
+    async def _handle(
+        self,
+        request: aiohttp.web.Request,
+    ) -> aiohttp.web.Response:
+        import aiohttp.web
+
+        return aiohttp.web.Response(
+            text=self._registry.render(),
+            content_type="text/plain",
+            headers={"X-Content-Type-Options": "nosniff"},
+        )
+
+    async def start(
+        self,
+    ) -> None:
+        logger.info(f"{self} starting")
+        if self.running:
+            logger.warning(f"{self} has started")
+            return
+        import aiohttp.web
+
+        app = aiohttp.web.Application()
+        app.router.add_get("/metrics", self._handle)
+        self._runner = aiohttp.web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await aiohttp.web.TCPSite(self._runner, self._host, self._port).start()
+        logger.info(f"{self} started http://{self._host}:{self._port}/metrics")
+
+    async def stop(
+        self,
+    ) -> None:
+        logger.info(f"{self} stopping")
+        if not self.running:
+            logger.warning(f"{self} has stopped")
+            return
+        await self._runner.cleanup()
+        self._runner = None
+        logger.info(f"{self} stopped")
+
+    @property
+    def running(
+        self,
+    ) -> bool:
+        return self._runner is not None
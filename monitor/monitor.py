@@ -1,37 +1,101 @@
+from __future__ import annotations
+
 import asyncio
 import collections
-import json
+import datetime
 import math
-import pandas as pd
 import pathlib
+import time
 from types import TracebackType
-from typing import Iterable, Self, Type
-from binance.um_futures import UMFutures
-from binance.websocket.um_futures.websocket_client import UMFuturesWebsocketClient
-from binance.websocket.binance_socket_manager import BinanceSocketManager
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Iterable, Self, Type
 from loguru import logger
 
 from .bot import *
+from .breadth import *
 from .cards import *
+from .clock import *
+from .clocksync import *
+from .lazy import *
+from .metrics import *
+from .codec import *
+from .cooldown import *
+from .funding import *
+from .history import *
+from .records import *
+from .recorder import *
+from .registry import *
+from .reports import *
+from .scheduler import *
+from .shm import *
+from .spread import *
+from .state import *
+from .streams import *
 from .utils import *
 from .timewindow import *
+from .volatility import *
+
+if TYPE_CHECKING:
+    import concurrent.futures
+    from binance.um_futures import UMFutures
+
+np = lazy_import("numpy")
 
 __all__ = [
     "BaseMonitor",
     "PositionMonitor",
     "MarketMonitor",
+    "FundingMonitor",
+    "LiquidationMonitor",
+    "SpreadMonitor",
     "OrderMonitor",
     "ExchangeMonitor",
     "MonitorGroup",
 ]
 
+TIMEWINDOW_SIZE = Gauge(
+    "monitor_timewindow_size",
+    "Snapshots held per MarketMonitor timewindow.",
+    ("interval",),
+)
+LIFECYCLE_SECONDS = Gauge(
+    "monitor_lifecycle_seconds",
+    "Duration of the last start/stop per monitor.",
+    ("monitor", "phase"),
+)
+LIFECYCLE_FAILURES = Counter(
+    "monitor_lifecycle_failures_total",
+    "Monitor starts/stops that raised or hit their deadline.",
+    ("monitor", "phase"),
+)
+MARKET_BREADTH = Gauge(
+    "monitor_market_breadth",
+    "Cross-sectional statistics of symbol returns per MarketMonitor timewindow.",
+    ("interval", "stat"),
+)
+EVALUATION_SECONDS = Histogram(
+    "monitor_evaluation_seconds",
+    "Time spent in one alert evaluation pass.",
+    ("monitor",),
+)
+BOOK_TICKERS = Counter(
+    "monitor_book_tickers_total",
+    "Book ticker updates seen by SpreadMonitor, by sampling result.",
+    ("result",),
+)
+
 
 class BaseMonitor:
 
     def __init__(
         self,
+        *,
+        clock: Clock | None = None,
+        scheduler: Scheduler | None = None,
     ) -> None:
-        self._task = None
+        self._clock = REAL_CLOCK if clock is None else clock
+        self._own_scheduler = scheduler is None
+        self._scheduler = Scheduler(clock=self._clock) if scheduler is None else scheduler
+        self._jobs = []
 
     async def __aenter__(
         self,
@@ -47,9 +111,17 @@ class BaseMonitor:
     ) -> None:
         await self.stop()
 
-    async def _engine(
+    def _job(
         self,
-    ) -> None:
+        callback: Callable[[], Awaitable[Any]],
+        schedule: str | float | Schedule,
+        **kwargs,
+    ) -> Job:
+        return Job(f"{type(self).__name__}.{callback.__name__}", callback, schedule, **kwargs)
+
+    def jobs(
+        self,
+    ) -> list[Job]:
         raise NotImplementedError
 
     async def start(
@@ -59,7 +131,9 @@ class BaseMonitor:
         if self.running:
             logger.warning(f"{self} has started")
             return
-        self._task = asyncio.create_task(self._engine())
+        if self._own_scheduler:
+            await self._scheduler.start()
+        self._jobs = [self._scheduler.add(job) for job in self.jobs()]
         logger.info(f"{self} started")
 
     async def stop(
@@ -69,242 +143,259 @@ class BaseMonitor:
         if not self.running:
             logger.warning(f"{self} has stopped")
             return
-        self._task.cancel()
-        self._task = None
+        for job in self._jobs:
+            self._scheduler.remove(job)
+        self._jobs = []
+        if self._own_scheduler:
+            await self._scheduler.stop()
         logger.info(f"{self} stopped")
 
     @property
     def running(
         self,
     ) -> bool:
-        return not (self._task is None or self._task.cancelled() or self._task.done())
+        return 0 < len(self._jobs)
 
+    @staticmethod
+    def _make_client(
+        key: str | None,
+        secret: str | None,
+        proxies: dict[str, str] | None,
+        **kwargs,
+    ) -> UMFutures:
+        from binance.um_futures import UMFutures
 
+        return UMFutures(
+            key=key,
+            secret=secret,
+            proxies=proxies,
+            **kwargs,
+        )
+
+
+@register_monitor(channel="position", state=True, reports=True)
 class PositionMonitor(BaseMonitor):
 
     def __init__(
         self,
         bot: Bot,
         *,
+        client: UMFutures | None = None,
         key: str | None = None,
         secret: str | None = None,
         proxies: dict[str, str] | None = None,
+        state: StateNamespace | None = None,
+        clock: Clock | None = None,
+        scheduler: Scheduler | None = None,
+        executor: concurrent.futures.Executor | None = None,
         minute: int = 0,
+        sample: str = "1m",
         drawdown_percent_threshold: float = 5.0,
         **kwargs,
     ) -> None:
-        super().__init__()
+        super().__init__(clock=clock, scheduler=scheduler)
         self._bot = bot
-        self._client = UMFutures(
-            key=key,
-            secret=secret,
-            proxies=proxies,
-            **kwargs,
-        )
+        self._client = self._make_client(key, secret, proxies, **kwargs) if client is None else client
+        self._state = StateStore(pathlib.Path(r"./state.json")).namespace(type(self).__name__) if state is None else state
+        self._executor = executor
         self._minute = minute
         self._drawdown_percent_threshold = drawdown_percent_threshold
+        self._sample = parse_interval(sample)
+        self._history = PositionHistory(step=self._sample)
+        self._slot = None
+        self._error_slot = None
+        self._position_job = self._job(self.monitor_position, Every(self._sample))
+        self._at_all_element = at_all_element_factory()
+        self._error_card = error_card_factory()
+        self._position_card = position_card_factory()
+        self._position_csv = pathlib.Path(r"./data/position.csv")
+        self._var_json = pathlib.Path(r"./var.json")
+
+    @property
+    def history(
+        self,
+    ) -> PositionHistory:
+        return self._history
 
-    async def _engine(
+    async def start(
         self,
     ) -> None:
-        async with asyncio.TaskGroup() as tg:
-            tg.create_task(self.monitor_position())
+        if self.running:
+            return
+        if "totl_max" not in self._state:
+            var = await json_load(self._var_json)
+            if "totl_max" in var:
+                self._state.set("totl_max", float(var["totl_max"]))
+                logger.info(f"{self} migrated totl_max={var["totl_max"]} from {repr(self._var_json)}")
+        await super().start()
+
+    def jobs(
+        self,
+    ) -> list[Job]:
+        return [
+            self._position_job,
+        ]
 
     async def monitor_position(
         self,
     ) -> None:
-        at_all_element = at_all_element_factory()
-        error_card = error_card_factory()
-        position_card = position_card_factory()
-
-        var_json = pathlib.Path(r"./var.json")
-        position_csv = pathlib.Path(r"./data/position.csv")
-        account_dq = collections.deque(maxlen=1)
-        position_dq = collections.deque(maxlen=12)
-        delay = until_next_hour(minute=self._minute)
-        sleep_task = asyncio.create_task(asyncio.sleep(delay))
-        while True:
-            await sleep_task
-            delay = until_next_hour(minute=self._minute)
-            sleep_task = asyncio.create_task(asyncio.sleep(delay))
-            position_card["body"]["elements"][1]["rows"] = rows1 = []
-            position_card["body"]["elements"][2]["rows"] = rows2 = []
-            position_card["body"]["elements"][3]["rows"] = rows3 = [
-                {"indicator": x} for x in ("多仓", "空仓", "总仓", "总资产")
-            ]
-            while 4 < len(position_card["body"]["elements"]):
-                del position_card["body"]["elements"][-1]
-            try:
-                task1 = asyncio.create_task(restapi_wrapper(self._client.account))
-                task2 = asyncio.create_task(restapi_wrapper(self._client.get_position_risk))
-                task3 = asyncio.create_task(restapi_wrapper(self._client.time))
-                data1 = await task1
-                data2 = await task2
-                data3 = await task3
-            except Exception as e:
-                error_card["body"]["elements"][1]["text"]["content"] = message = repr(e)
-                logger.error(message)
+        at_all_element = self._at_all_element
+        error_card = self._error_card
+        position_card = self._position_card
+
+        tick = self._position_job.last
+        now = self._clock.now() if tick is None else datetime.datetime.fromtimestamp(tick / 1000)
+        slot = (now - datetime.timedelta(minutes=self._minute)).replace(minute=0, second=0, microsecond=0)
+        due = self._slot is not None and self._slot != slot
+        try:
+            task1 = asyncio.create_task(restapi_wrapper(self._client.account))
+            task2 = asyncio.create_task(restapi_wrapper(self._client.get_position_risk))
+            data1 = await task1
+            data2 = decode_positions(await task2)
+        except Exception as e:
+            error_card["body"]["elements"][1]["text"]["content"] = message = repr(e)
+            logger.error(message)
+            if due and self._error_slot != slot:
+                self._error_slot = slot
                 await self._bot.send_interactive(error_card)
-                continue
-            account = data1
-            position = {(x["symbol"], x["positionSide"]): x for x in data2}
-            server_time = data3["serverTime"]
-            long = shrt = 0.0
-            long_up, shrt_up = 0.0, 0.0
-            for pos in position.values():
-                if "-" == pos["notional"][0]:
-                    shrt += -float(pos["notional"])
-                    shrt_up += float(pos["unRealizedProfit"])
-                else:
-                    long += float(pos["notional"])
-                    long_up += float(pos["unRealizedProfit"])
-            lort = long + shrt
-            lort_up = long_up + shrt_up
-            totl = float(account["totalMarginBalance"])
-            rows3[0]["notional"] = long
-            rows3[1]["notional"] = shrt
-            rows3[2]["notional"] = lort
-            rows3[3]["notional"] = totl
-            rows3[0]["unrealized_profit"] = long_up
-            rows3[1]["unrealized_profit"] = shrt_up
-            rows3[2]["unrealized_profit"] = lort_up
-            if 1 <= len(position_dq):
-                oth_position = position_dq[-1]
-                oth_long = oth_shrt = 0.0
-                for oth_pos in oth_position.values():
-                    if "-" == oth_pos["notional"][0]:
-                        oth_shrt += -float(oth_pos["notional"])
-                    else:
-                        oth_long += float(oth_pos["notional"])
-                long_pnl1h = long - oth_long
-                shrt_pnl1h = oth_shrt - shrt
-                lort_pnl1h = long_pnl1h + shrt_pnl1h
-                rows3[0]["pnl1h"] = long_pnl1h
-                rows3[1]["pnl1h"] = shrt_pnl1h
-                rows3[2]["pnl1h"] = lort_pnl1h
-            if 1 <= len(account_dq):
-                oth_account = account_dq[-1]
-                oth_totl = float(oth_account["totalMarginBalance"])
-                totl_pnl1h = totl - oth_totl
-                rows3[3]["pnl1h"] = totl_pnl1h
-            var = await json_load(var_json)
-            totl_max = max(totl, float(var.get("totl_max", "0.0")))
-            var["totl_max"] = str(totl_max)
-            if 0 < totl_max:
-                drawdown_percent = 100 * (totl_max - totl) / totl_max
-                rows3[3]["drawdown_percent"] = drawdown_percent
-                if self._drawdown_percent_threshold <= drawdown_percent:
-                    position_card["body"]["elements"].append(at_all_element)
-            for pos in sorted(position.values(), key=lambda x: float(x["unRealizedProfit"]), reverse=True):
-                ps = "-" == pos["notional"][0]
-                f_ps = markdown_color("空", "red") if ps else markdown_color("多", "green")
-                symbol = pos["symbol"]
-                f_symbol = format_symbol(symbol)
-                notional = abs(float(pos["notional"]))
-                notional_percent = 100 * notional / lort if 0 < lort else 0.0
-                unrealized_profit = float(pos["unRealizedProfit"])
-                position_amt = abs(float(pos["positionAmt"]))
-                entry_price = float(pos["entryPrice"])
-                mark_price = float(pos["markPrice"])
-                margin = float(pos["positionInitialMargin"])
-                unrealized_profit_percent = 100 * unrealized_profit / margin if 0 < margin else 0.0
-                row = {"position": f"{f_ps} {f_symbol}"}
-                (rows2 if ps else rows1).append(row)
-                row["notional"] = notional
-                row["notional_percent"] = notional_percent
-                row["unrealized_profit"] = unrealized_profit
-                row["unrealized_profit_percent"] = unrealized_profit_percent
-                row["position_amt"] = position_amt
-                row["entry_price"] = entry_price
-                row["mark_price"] = mark_price
-                if 1 <= len(position_dq) and symbol in position_dq[-1]:
-                    oth_position = position_dq[-1]
-                    oth_mark_price = float(oth_position[symbol]["markPrice"])
-                    if 0 < oth_mark_price:
-                        change1h_percent = 100 * (mark_price - oth_mark_price) / oth_mark_price
-                        row["change1h_percent"] = change1h_percent
-                if 12 <= len(position_dq) and symbol in position_dq[-12]:
-                    oth_position = position_dq[-12]
-                    oth_mark_price = float(oth_position[symbol]["markPrice"])
-                    if 0 < oth_mark_price:
-                        change12h_percent = 100 * (mark_price - oth_mark_price) / oth_mark_price
-                        row["change12h_percent"] = change12h_percent
-            account_dq.append(account)
-            position_dq.append(position)
-            csv_row = {
-                "timestamp": server_time,
-                "table1": json.dumps(rows1),
-                "table2": json.dumps(rows2),
-                "table3": json.dumps(rows3),
-            }
-            task1 = asyncio.create_task(self._bot.send_interactive(position_card))
-            task2 = asyncio.create_task(json_dump(var_json, var))
-            task3 = asyncio.create_task(csv_append(position_csv, csv_row))
-            await task1
-            await task2
-            await task3
-
-
+            return
+        server_time = self._clock.time_ms()
+        self._history.sample(server_time, data1, data2)
+        self._slot = slot
+        if not due:
+            return
+        while 4 < len(position_card["body"]["elements"]):
+            del position_card["body"]["elements"][-1]
+        report = await run_report(
+            self._executor,
+            position_report,
+            data1,
+            data2,
+            self._history.changes(),
+            self._history.pnls(),
+            self._state.get("totl_max", 0.0),
+            self._drawdown_percent_threshold,
+        )
+        self._state.set("totl_max", report["totl_max"])
+        position_card["body"]["elements"][1]["rows"] = report["rows1"]
+        position_card["body"]["elements"][2]["rows"] = report["rows2"]
+        position_card["body"]["elements"][3]["rows"] = report["rows3"]
+        if report["alert"]:
+            position_card["body"]["elements"].append(at_all_element)
+        csv_row = {
+            "timestamp": server_time,
+            "table1": report["table1"],
+            "table2": report["table2"],
+            "table3": report["table3"],
+        }
+        task1 = asyncio.create_task(self._bot.send_interactive(position_card))
+        task2 = asyncio.create_task(self._state.checkpoint())
+        task3 = asyncio.create_task(csv_append(self._position_csv, csv_row))
+        await task1
+        await task2
+        await task3
+
+
+@register_monitor(channel="market", scope="market", state=True, streams=True, ring=True, clocksync=True)
 class MarketMonitor(BaseMonitor):
 
     def __init__(
         self,
         bot: Bot,
         *,
+        client: UMFutures | None = None,
+        hub: StreamHub | None = None,
         key: str | None = None,
         secret: str | None = None,
         proxies: dict[str, str] | None = None,
         params: dict[str, float] = {},
+        zscores: dict[str, float] = {},
+        halflife: str = "1h",
+        breadth: dict[str, float] = {},
+        cooldowns: dict[str, str | float] = {},
+        coalesce: float = 0.0,
         speed: int = 1,
         maxm: int = 256,
+        capacity: int = 1024,
+        ring: str | None = None,
+        stale: float = 10.0,
+        record: str | None = None,
+        state: StateNamespace | None = None,
+        clock: Clock | None = None,
+        scheduler: Scheduler | None = None,
+        clocksync: ClockSync | None = None,
         **kwargs,
     ) -> None:
-        super().__init__()
+        super().__init__(clock=clock, scheduler=scheduler)
         self._bot = bot
-        self._client = UMFutures(
-            key=key,
-            secret=secret,
-            proxies=proxies,
-            **kwargs,
-        )
-        self._wsclient = UMFuturesWebsocketClient(
-            on_message=self.on_message,
-            on_open=self.on_open,
-            on_close=self.on_close,
-            on_error=self.on_error,
-            on_ping=self.on_ping,
-            on_pong=self.on_pong,
-            is_combined=False,
-            proxies=proxies,
-        )
+        self._clocksync = clocksync
+        self._client = self._make_client(key, secret, proxies, **kwargs) if client is None else client
+        self._ring = ring
+        self._ring_attached = None
+        self._ring_seq = 0
+        self._ring_time = 0.0
+        self._stale = stale
+        self._own_hub = hub is None and ring is None
+        if ring is not None:
+            self._hub = None
+        elif hub is None:
+            self._hub = StreamHub(proxies=proxies, record=record, clock=self._clock, name=type(self).__name__)
+        else:
+            self._hub = hub
+        self._stream = f"!markPrice@arr@{speed}s" if 1 == speed else "!markPrice@arr"
+        self._symbols = SymbolTable(capacity)
         self._positions = {}
         self._speed = speed
+        self._cooldowns = Cooldowns("market", clock=self._clock, state=state)
+        self._coalesce = round(1000 * coalesce)
+        self._pending = {}
+        self._stats = ReturnStats(capacity, halflife=parse_interval(halflife)) if 0 < len(zscores) else None
         self._tws = tws = []
-        for interval, change_percent in sorted(
-            (int(pd.Timedelta(interval).total_seconds()) * 1000, change_percent)
-            for interval, change_percent in params.items()
-        ):
+        rules = {}
+        for rule in [*params, *zscores]:
+            rules.setdefault(parse_interval(rule), rule)
+        for interval, rule in sorted(rules.items()):
             unit = interval // maxm
-            tw = SparseTimewindow(interval, unit=unit)
-            tw.change_percent = change_percent
+            tw = SparseTimewindow(interval, unit=unit, clock=self._clock)
+            tw.change_percent = next((v for k, v in params.items() if parse_interval(k) == interval), math.inf)
+            tw.zscore = next((v for k, v in zscores.items() if parse_interval(k) == interval), math.inf)
+            tw.breadth = next((v for k, v in breadth.items() if parse_interval(k) == interval), math.inf)
+            tw.rule = rule
             tws.append(tw)
+            self._cooldowns.set_cooldown(rule, cooldowns.get(rule, rule))
+            self._cooldowns.set_cooldown(f"breadth{rule}", cooldowns.get(f"breadth{rule}", rule))
+        self._error_card = error_card_factory()
+        self._market_card = market_card_factory()
+        self._breadth_card = breadth_card_factory()
 
-    async def _engine(
+    def jobs(
         self,
-    ) -> None:
-        async with asyncio.TaskGroup() as tg:
-            tg.create_task(self.monitor_positions())
-            tg.create_task(self.monitor_market())
+    ) -> list[Job]:
+        jobs = [
+            self._job(self.monitor_positions, 60 * 1.0, immediate=True),
+            self._job(self.monitor_market, self._speed * 2 * 1.0, jitter=0.0, stagger=0.0),
+        ]
+        if self._ring is not None:
+            jobs.append(self._job(self.monitor_ring, 0.1 * self._speed, jitter=0.0, stagger=0.0))
+        return jobs
 
     async def start(
         self,
     ) -> None:
         if self.running:
             return
-        self._wsclient.mark_price_all_market(speed=self._speed)
-        stream = f"!markPrice@arr@{self._speed}s" if 1 == self._speed else "!markPrice@arr"
-        logger.success(f"SUBSCRIBE: {stream}")
-        await super().start()
+        if self._hub is not None:
+            self._hub.subscribe(self._stream, decode_mark_prices, self.on_mark_prices)
+        try:
+            if self._own_hub:
+                await self._hub.start()
+            await super().start()
+        except BaseException:
+            if self._hub is not None:
+                self._hub.unsubscribe(self._stream, self.on_mark_prices)
+            if self._own_hub:
+                await self._hub.stop()
+            raise
 
     async def stop(
         self,
@@ -312,194 +403,450 @@ class MarketMonitor(BaseMonitor):
         if not self.running:
             return
         await super().stop()
-        self._wsclient.stop()
+        self._cooldowns.save()
+        if self._hub is not None:
+            self._hub.unsubscribe(self._stream, self.on_mark_prices)
+        if self._own_hub:
+            await self._hub.stop()
 
-    def on_message(
+    def on_mark_prices(
         self,
-        socket_manager: BinanceSocketManager,
-        data: bytes | str,
+        data: list[MarkPrice] | Any,
+        t: int,
     ) -> None:
-        try:
-            data = json.loads(data)
-        except json.JSONDecodeError as e:
-            logger.warning(f"on_message\n{repr(e)}\n{repr(data)}")
-            return
         if isinstance(data, list):
-            logger.debug(f"on_message\n{repr(data)}")
-            mps = {x["s"]: x for x in data}
+            logger.opt(lazy=True).debug("on_mark_prices\n{}", lambda: repr(data))
+            if 0 < len(data):
+                t = data[0].event_time
+                if self._clocksync is not None:
+                    self._clocksync.observe(t)
+            symbols = self._symbols
+            ps = np.full(symbols.capacity, np.nan)
+            for x in data:
+                try:
+                    ps[symbols.index(x.symbol)] = x.mark_price
+                except IndexError:
+                    continue
             for tw in self._tws:
-                tw.push(mps, time_ms())
+                tw.push(ps, t)
+            if self._stats is not None:
+                self._stats.push(ps, t)
         else:
-            logger.info(f"on_message\n{repr(data)}")
+            logger.info(f"on_mark_prices\n{repr(data)}")
 
-    def on_open(
+    async def monitor_positions(
         self,
-        socket_manager: BinanceSocketManager,
     ) -> None:
-        logger.info(f"on_open")
+        error_card = self._error_card
 
-    def on_close(
+        try:
+            data = decode_positions(await restapi_wrapper(self._client.get_position_risk))
+        except Exception as e:
+            error_card["body"]["elements"][1]["text"]["content"] = message = repr(e)
+            logger.error(message)
+            await self._bot.send_interactive(error_card)
+            return
+        self._positions.clear()
+        self._positions.update((x.symbol, x) for x in data)
+
+    async def monitor_ring(
         self,
-        socket_manager: BinanceSocketManager,
     ) -> None:
-        logger.info(f"on_close")
+        ring = self._ring_attached
+        if ring is None:
+            try:
+                ring = self._ring_attached = MarketRing.attach(self._ring)
+            except (FileNotFoundError, ValueError):
+                return
+            logger.info(f"{self} attached {ring.name}")
+            for tw in self._tws:
+                tw.clear()
+            if self._stats is not None:
+                self._stats.clear(ring.capacity)
+            self._symbols = ring.symbols
+            self._ring_seq = ring.seq
+            self._ring_time = self._clock.time()
+        seq = self._ring_seq
+        cur = ring.seq
+        if cur == seq:
+            if self._stale < self._clock.time() - self._ring_time:
+                logger.warning(f"{self} {ring.name} stale for {self._stale}s, reattaching")
+                ring.close()
+                self._ring_attached = None
+            return
+        for s in range(max(seq + 1, cur - ring.slots + 2), cur + 1):
+            ps = np.empty(ring.capacity)
+            t = ring.read(s, ps)
+            if t is None:
+                continue
+            for tw in self._tws:
+                tw.push(ps, t)
+            if self._stats is not None:
+                self._stats.push(ps, t)
+        self._ring_seq = cur
+        self._ring_time = self._clock.time()
 
-    def on_error(
+    async def monitor_market(
         self,
-        socket_manager: BinanceSocketManager,
-        e: Exception,
     ) -> None:
-        logger.warning(f"on_error\n{repr(e)}")
-        socket_manager.create_ws_connection()
-        self._wsclient.mark_price_all_market(speed=self._speed)
-        stream = f"!markPrice@arr@{self._speed}s" if 1 == self._speed else "!markPrice@arr"
-        logger.success(f"SUBSCRIBE: {stream}")
+        market_card = self._market_card
+        breadth_card = self._breadth_card
+        cooldowns = self._cooldowns
+        pending = self._pending
+
+        market_card["body"]["elements"][1]["rows"] = rows = []
+        breadth_card["body"]["elements"][1]["rows"] = breadth_rows = []
+        sorting_map = {}
+        t_eval = time.perf_counter()
+        now = self._clock.time_ms()
+        cooldowns.expire()
+        for tw in self._tws:
+            TIMEWINDOW_SIZE.set(len(tw), interval=format_milliseconds(tw.interval))
+        for tw in self._tws:
+            if tw.empty():
+                break
+            ps0, t0 = tw.head()
+            ps1, t1 = tw.tail()
+            if t1 - t0 + 2 * tw.unit + 8_000 < tw.interval:
+                break
+            n = len(self._symbols)
+            ps0, ps1 = ps0[:n], ps1[:n]
+            with np.errstate(divide="ignore", invalid="ignore"):
+                change_percents = 100 * (ps1 - ps0) / ps0
+            alerts = tw.change_percent <= np.abs(change_percents)
+            if self._stats is not None and tw.zscore < math.inf:
+                zscores = self._stats.zscores(ps0, ps1, t1 - t0)
+                alerts |= tw.zscore <= np.abs(zscores)
+            else:
+                zscores = None
+            stats = breadth(change_percents, tw.change_percent)
+            f_interval = format_milliseconds(tw.interval)
+            for stat in "advancers", "decliners", "up_percent", "down_percent", "p5", "p50", "p95":
+                MARKET_BREADTH.set(stats[stat], interval=f_interval, stat=stat)
+            direction = "up" if stats["down_percent"] < stats["up_percent"] else "down"
+            wide = tw.breadth <= stats[f"{direction}_percent"]
+            if wide and cooldowns.hit(f"breadth{tw.rule}", direction):
+                row = {}
+                breadth_rows.append(row)
+                row["timedelta"] = f_interval
+                row["direction"] = markdown_color("涨", "green") if "up" == direction else markdown_color("跌", "red")
+                row["share_percent"] = stats[f"{direction}_percent"]
+                row["advancers"] = stats["advancers"]
+                row["decliners"] = stats["decliners"]
+                row["median_percent"] = stats["p50"]
+                row["range_percent"] = f"{stats["p5"]:+.2f} ~ {stats["p95"]:+.2f}"
+            for i in np.flatnonzero((0 < ps0) & alerts):
+                symbol = self._symbols.symbol(i)
+                if wide and symbol not in self._positions:
+                    continue
+                change = float(change_percents[i]), None if zscores is None or np.isnan(zscores[i]) else float(zscores[i])
+                triggered = pending.get(symbol)
+                if triggered is not None and tw.interval in triggered[1]:
+                    triggered[1][tw.interval] = change
+                    continue
+                if not cooldowns.hit(tw.rule, symbol):
+                    continue
+                if triggered is None:
+                    pending[symbol] = triggered = now, {}
+                triggered[1][tw.interval] = change
+        for symbol in [symbol for symbol, (t, _) in pending.items() if self._coalesce <= now - t]:
+            _, changes = pending.pop(symbol)
+            changes = sorted(changes.items())
+            row = {}
+            rows.append(row)
+            f_symbol = format_symbol(symbol)
+            if symbol in self._positions:
+                ps = self._positions[symbol].notional < 0
+                f_ps = markdown_color("空", "red") if ps else markdown_color("多", "green")
+                row["symbol"] = f"{f_ps} {f_symbol}"
+            else:
+                row["symbol"] = f_symbol
+            row["timedelta"] = "\n".join(format_milliseconds(interval) for interval, _ in changes)
+            row["change_percent"] = "\n".join(
+                markdown_color(
+                    f"{change_percent:+.2f}" if zscore is None else f"{change_percent:+.2f} ({zscore:+.1f}σ)",
+                    "green" if 0 <= change_percent else "red",
+                )
+                for _, (change_percent, zscore) in changes
+            )
+            sorting_map[row["symbol"]] = (
+                0 if symbol in self._positions else 1,
+                changes[0][0],
+                -max(abs(change_percent) for _, (change_percent, _) in changes),
+            )
+        EVALUATION_SECONDS.observe(time.perf_counter() - t_eval, monitor="MarketMonitor")
+        cooldowns.save()
+        if 0 < len(breadth_rows):
+            await self._bot.send_interactive(breadth_card)
+        if 0 == len(rows):
+            return
+        rows.sort(key=lambda x: sorting_map[x["symbol"]])
+        await self._bot.send_interactive(market_card)
+
 
-    def on_ping(
+@register_monitor(channel="market", streams=True, market=True, ring=True, state=True)
+class FundingMonitor(BaseMonitor):
+
+    def __init__(
+        self,
+        bot: Bot,
+        *,
+        client: UMFutures | None = None,
+        hub: StreamHub | None = None,
+        key: str | None = None,
+        secret: str | None = None,
+        proxies: dict[str, str] | None = None,
+        speed: int = 1,
+        capacity: int = 1024,
+        depth: int = 21,
+        rate_percent: float = 0.1,
+        lead: str = "30m",
+        ring: str | None = None,
+        stale: float = 10.0,
+        record: str | None = None,
+        state: StateNamespace | None = None,
+        clock: Clock | None = None,
+        scheduler: Scheduler | None = None,
+        **kwargs,
+    ) -> None:
+        super().__init__(clock=clock, scheduler=scheduler)
+        self._bot = bot
+        self._client = self._make_client(key, secret, proxies, **kwargs) if client is None else client
+        self._ring = ring
+        self._ring_attached = None
+        self._ring_seq = 0
+        self._ring_time = 0.0
+        self._stale = stale
+        self._own_hub = hub is None and ring is None
+        if ring is not None:
+            self._hub = None
+        elif hub is None:
+            self._hub = StreamHub(proxies=proxies, record=record, clock=self._clock, name=type(self).__name__)
+        else:
+            self._hub = hub
+        self._stream = f"!markPrice@arr@{speed}s" if 1 == speed else "!markPrice@arr"
+        self._speed = speed
+        self._depth = depth
+        self._history = FundingHistory(capacity, depth=depth)
+        self._positions = {}
+        self._rate_percent = rate_percent
+        self._lead = parse_interval(lead)
+        self._cooldowns = Cooldowns("funding", clock=self._clock, state=state)
+        self._error_card = error_card_factory()
+        self._funding_card = funding_card_factory()
+
+    @property
+    def history(
+        self,
+    ) -> FundingHistory:
+        return self._history
+
+    def jobs(
+        self,
+    ) -> list[Job]:
+        jobs = [
+            self._job(self.monitor_positions, 60 * 1.0, immediate=True),
+            self._job(self.monitor_funding, "* * * * *"),
+        ]
+        if self._ring is not None:
+            jobs.append(self._job(self.monitor_ring, 1.0 * self._speed, jitter=0.0, stagger=0.0))
+        return jobs
+
+    async def start(
         self,
-        socket_manager: BinanceSocketManager,
-        data: bytes | str,
     ) -> None:
-        logger.debug(f"on_ping\n{repr(data)}")
+        if self.running:
+            return
+        if self._hub is not None:
+            self._hub.subscribe(self._stream, decode_mark_prices, self.on_mark_prices)
+        try:
+            if self._own_hub:
+                await self._hub.start()
+            await super().start()
+        except BaseException:
+            if self._hub is not None:
+                self._hub.unsubscribe(self._stream, self.on_mark_prices)
+            if self._own_hub:
+                await self._hub.stop()
+            raise
 
-    def on_pong(
+    async def stop(
         self,
-        socket_manager: BinanceSocketManager,
     ) -> None:
-        logger.debug(f"on_pong")
+        if not self.running:
+            return
+        await super().stop()
+        self._cooldowns.save()
+        if self._hub is not None:
+            self._hub.unsubscribe(self._stream, self.on_mark_prices)
+        if self._own_hub:
+            await self._hub.stop()
 
-    async def monitor_positions(
+    def on_mark_prices(
         self,
+        data: list[MarkPrice] | Any,
+        t: int,
     ) -> None:
-        error_card = error_card_factory()
+        if isinstance(data, list):
+            self._history.push(data)
 
-        delay = 60 * 1.0
-        sleep_task = asyncio.create_task(asyncio.sleep(0.0))
-        while True:
-            await sleep_task
-            sleep_task = asyncio.create_task(asyncio.sleep(delay))
+    async def monitor_ring(
+        self,
+    ) -> None:
+        ring = self._ring_attached
+        if ring is None:
             try:
-                data = await restapi_wrapper(self._client.get_position_risk)
-            except Exception as e:
-                error_card["body"]["elements"][1]["text"]["content"] = message = repr(e)
-                logger.error(message)
-                await self._bot.send_interactive(error_card)
+                ring = self._ring_attached = MarketRing.attach(self._ring)
+            except (FileNotFoundError, ValueError):
+                return
+            logger.info(f"{self} attached {ring.name}")
+            self._history = FundingHistory(ring.capacity, depth=self._depth, symbols=ring.symbols)
+            self._ring_seq = ring.seq
+            self._ring_time = self._clock.time()
+        seq = self._ring_seq
+        cur = ring.seq
+        if cur == seq:
+            if self._stale < self._clock.time() - self._ring_time:
+                logger.warning(f"{self} {ring.name} stale for {self._stale}s, reattaching")
+                ring.close()
+                self._ring_attached = None
+            return
+        rates = np.empty(ring.capacity)
+        nexts = np.empty(ring.capacity, dtype=np.int64)
+        for s in range(max(seq + 1, cur - ring.slots + 2), cur + 1):
+            if ring.read(s, rates=rates, nexts=nexts) is None:
                 continue
-            self._positions.clear()
-            self._positions.update((x["symbol"], x) for x in data)
+            idx = np.flatnonzero(0 < nexts)
+            self._history.update(idx, rates[idx], nexts[idx])
+        self._ring_seq = cur
+        self._ring_time = self._clock.time()
 
-    async def monitor_market(
+    async def monitor_positions(
         self,
     ) -> None:
-        market_card = market_card_factory()
+        error_card = self._error_card
 
-        memories = {}
-        delay = self._speed * 2 * 1.0
-        sleep_task = asyncio.create_task(asyncio.sleep(delay))
-        while True:
-            await sleep_task
-            sleep_task = asyncio.create_task(asyncio.sleep(delay))
-            market_card["body"]["elements"][1]["rows"] = rows = []
-            sorting_map = {}
-            for tw in self._tws:
-                if tw.empty():
-                    break
-                mps0, t0 = tw.head()
-                mps1, t1 = tw.tail()
-                if t1 - t0 + 2 * tw.unit + 8_000 < tw.interval:
-                    break
-                for symbol in mps0.keys() & mps1.keys():
-                    mp0 = float(mps0[symbol]["p"])
-                    mp1 = float(mps1[symbol]["p"])
-                    if not 0 < mp0:
-                        continue
-                    change_percent = 100 * (mp1 - mp0) / mp0
-                    if abs(change_percent) < tw.change_percent:
-                        continue
-                    t = time_ms()
-                    key = symbol, tw.interval
-                    if t - memories.get(key, -math.inf) < tw.interval:
-                        continue
-                    memories[key] = t
-                    row = {}
-                    rows.append(row)
-                    f_symbol = format_symbol(symbol)
-                    if symbol in self._positions:
-                        ps = "-" == self._positions[symbol]["notional"][0]
-                        f_ps = markdown_color("空", "red") if ps else markdown_color("多", "green")
-                        row["symbol"] = f"{f_ps} {f_symbol}"
-                    else:
-                        row["symbol"] = f_symbol
-                    row["timedelta"] = format_milliseconds(tw.interval)
-                    row["change_percent"] = change_percent
-                    sorting_map[row["symbol"]] = (
-                        0 if symbol in self._positions else 1,
-                        tw.interval,
-                        -abs(change_percent),
-                    )
-            if 0 == len(rows):
+        try:
+            data = decode_positions(await restapi_wrapper(self._client.get_position_risk))
+        except Exception as e:
+            error_card["body"]["elements"][1]["text"]["content"] = message = repr(e)
+            logger.error(message)
+            await self._bot.send_interactive(error_card)
+            return
+        self._positions.clear()
+        self._positions.update((x.symbol, x) for x in data if 0 != x.position_amt)
+
+    async def monitor_funding(
+        self,
+    ) -> None:
+        funding_card = self._funding_card
+        cooldowns = self._cooldowns
+        history = self._history
+
+        funding_card["body"]["elements"][1]["rows"] = rows = []
+        now = self._clock.time_ms()
+        cooldowns.expire()
+        for symbol, pos in self._positions.items():
+            funding_rate, next_funding_time = history.rate(symbol)
+            if math.isnan(funding_rate) or not now < next_funding_time <= now + self._lead:
+                continue
+            last_funding_rate = history.last(symbol)
+            reasons = []
+            if self._rate_percent <= 100 * abs(funding_rate):
+                reasons.append(markdown_color("极端", "red"))
+            if funding_rate * last_funding_rate < 0:
+                reasons.append(markdown_color("翻转", "orange"))
+            if 0 == len(reasons):
+                continue
+            if not cooldowns.hit("funding", (symbol, next_funding_time), until=next_funding_time):
                 continue
-            rows.sort(key=lambda x: sorting_map[x["symbol"]])
-            await self._bot.send_interactive(market_card)
+            row = {}
+            rows.append(row)
+            ps = pos.notional < 0
+            f_ps = markdown_color("空", "red") if ps else markdown_color("多", "green")
+            row["symbol"] = f"{f_ps} {format_symbol(symbol)}"
+            row["reason"] = " ".join(reasons)
+            row["funding_rate_percent"] = 100 * funding_rate
+            if not math.isnan(last_funding_rate):
+                row["last_funding_rate_percent"] = 100 * last_funding_rate
+            row["funding_fee"] = -pos.notional * funding_rate
+            row["next_funding_time"] = next_funding_time
+        cooldowns.save()
+        if 0 == len(rows):
+            return
+        rows.sort(key=lambda x: x["funding_fee"])
+        await self._bot.send_interactive(funding_card)
 
 
-class OrderMonitor(BaseMonitor):
+@register_monitor(channel="market", streams=True, market=True, state=True)
+class LiquidationMonitor(BaseMonitor):
 
     def __init__(
         self,
         bot: Bot,
         *,
+        client: UMFutures | None = None,
+        hub: StreamHub | None = None,
         key: str | None = None,
         secret: str | None = None,
         proxies: dict[str, str] | None = None,
+        params: dict[str, float] = {"5m": 1_000_000.0},
+        cooldowns: dict[str, str | float] = {},
+        interval: float = 10.0,
+        max_rows: int = 20,
+        record: str | None = None,
+        state: StateNamespace | None = None,
+        clock: Clock | None = None,
+        scheduler: Scheduler | None = None,
         **kwargs,
     ) -> None:
-        super().__init__()
+        super().__init__(clock=clock, scheduler=scheduler)
         self._bot = bot
-        self._client = UMFutures(
-            key=key,
-            secret=secret,
-            proxies=proxies,
-            **kwargs,
-        )
-        self._wsclient = UMFuturesWebsocketClient(
-            on_message=self.on_message,
-            on_open=self.on_open,
-            on_close=self.on_close,
-            on_error=self.on_error,
-            on_ping=self.on_ping,
-            on_pong=self.on_pong,
-            is_combined=False,
-            proxies=proxies,
-        )
-        self._listenkey = ""
+        self._client = self._make_client(key, secret, proxies, **kwargs) if client is None else client
+        self._own_hub = hub is None
+        self._hub = StreamHub(proxies=proxies, record=record, clock=self._clock, name=type(self).__name__) if hub is None else hub
+        self._stream = "!forceOrder@arr"
         self._orders_dq = collections.deque()
-        self._new_orders_by_id = {}
+        self._positions = {}
+        self._interval = interval
+        self._max_rows = max_rows
+        self._cooldowns = Cooldowns("liquidation", clock=self._clock, state=state)
+        self._tws = tws = []
+        for interval, rule, notional in sorted(
+            (parse_interval(interval), interval, notional)
+            for interval, notional in params.items()
+        ):
+            tw = SumTimewindow(interval, unit=max(1000, interval // 256), clock=self._clock)
+            tw.notional = notional
+            tw.rule = rule
+            tws.append(tw)
+            self._cooldowns.set_cooldown(rule, cooldowns.get(rule, rule))
+        self._error_card = error_card_factory()
+        self._liquidation_card = liquidation_card_factory()
 
-    async def _engine(
+    def jobs(
         self,
-    ) -> None:
-        async with asyncio.TaskGroup() as tg:
-            tg.create_task(self.monitor_listenkey())
-            tg.create_task(self.monitor_order())
+    ) -> list[Job]:
+        return [
+            self._job(self.monitor_positions, 60 * 1.0, immediate=True),
+            self._job(self.monitor_liquidation, self._interval),
+        ]
 
     async def start(
         self,
     ) -> None:
         if self.running:
             return
+        self._hub.subscribe(self._stream, decode_force_order, self.on_force_order)
         try:
-            data = await restapi_wrapper(self._client.new_listen_key)
-        except Exception as e:
-            error_card = error_card_factory()
-            error_card["body"]["elements"][1]["text"]["content"] = message = repr(e)
-            logger.error(message)
-            await self._bot.send_interactive(error_card)
-        else:
-            self._listenkey = data["listenKey"]
-            self._wsclient.user_data(self._listenkey)
-            logger.success(f"SUBSCRIBE: {self._listenkey}")
-        await super().start()
+            if self._own_hub:
+                await self._hub.start()
+            await super().start()
+        except BaseException:
+            self._hub.unsubscribe(self._stream, self.on_force_order)
+            if self._own_hub:
+                await self._hub.stop()
+            raise
 
     async def stop(
         self,
@@ -507,306 +854,494 @@ class OrderMonitor(BaseMonitor):
         if not self.running:
             return
         await super().stop()
-        self._wsclient.stop()
+        self._cooldowns.save()
+        self._hub.unsubscribe(self._stream, self.on_force_order)
+        if self._own_hub:
+            await self._hub.stop()
+
+    def on_force_order(
+        self,
+        data: ForceOrder | Any,
+        t: int,
+    ) -> None:
+        if isinstance(data, ForceOrder):
+            self._orders_dq.append((data.order, t))
+        else:
+            logger.info(f"on_force_order\n{repr(data)}")
+
+    async def monitor_positions(
+        self,
+    ) -> None:
+        error_card = self._error_card
+
         try:
-            data = await restapi_wrapper(self._client.close_listen_key, self._listenkey)
+            data = decode_positions(await restapi_wrapper(self._client.get_position_risk))
         except Exception as e:
-            error_card = error_card_factory()
             error_card["body"]["elements"][1]["text"]["content"] = message = repr(e)
             logger.error(message)
             await self._bot.send_interactive(error_card)
+            return
+        self._positions.clear()
+        self._positions.update((x.symbol, x) for x in data if 0 != x.position_amt)
 
-    def on_message(
+    async def monitor_liquidation(
         self,
-        socket_manager: BinanceSocketManager,
-        data: bytes | str,
     ) -> None:
-        try:
-            data = json.loads(data)
-        except json.JSONDecodeError as e:
-            logger.warning(f"on_message\n{repr(e)}\n{repr(data)}")
+        liquidation_card = self._liquidation_card
+        cooldowns = self._cooldowns
+
+        liquidation_card["body"]["elements"][1]["rows"] = rows = []
+        orders_dq = self._orders_dq
+        while 0 < len(orders_dq):
+            o, t = orders_dq.popleft()
+            key = o.symbol, o.side
+            notional = o.filled_quantity * o.average_price
+            for tw in self._tws:
+                tw.add(key, notional, t)
+        now = self._clock.time_ms()
+        cooldowns.expire()
+        candidates = []
+        for tw in self._tws:
+            tw.expire(now)
+            sums = tw.sums
+            for symbol in self._positions:
+                for side in "SELL", "BUY":
+                    notional = sums.get((symbol, side), 0.0)
+                    if tw.notional <= notional:
+                        candidates.append((notional, tw, symbol, side))
+        candidates.sort(key=lambda x: -x[0])
+        for notional, tw, symbol, side in candidates:
+            if self._max_rows <= len(rows):
+                break
+            if not cooldowns.hit(tw.rule, (symbol, side)):
+                continue
+            row = {}
+            rows.append(row)
+            ps = self._positions[symbol].notional < 0
+            f_ps = markdown_color("空", "red") if ps else markdown_color("多", "green")
+            row["symbol"] = f"{f_ps} {format_symbol(symbol)}"
+            row["side"] = markdown_color("多头爆仓", "red") if "SELL" == side else markdown_color("空头爆仓", "green")
+            row["timedelta"] = format_milliseconds(tw.interval)
+            row["notional"] = notional
+            row["count"] = tw.counts[symbol, side]
+        cooldowns.save()
+        if 0 == len(rows):
             return
-        if isinstance(data, dict) and "ORDER_TRADE_UPDATE" == data.get("e"):
-            logger.info(f"on_message\n{repr(data)}")
-            self._orders_dq.append(data)
-            if "NEW" == data["o"]["x"]:
-                self._new_orders_by_id[data["o"]["i"]] = data
-        else:
-            logger.info(f"on_message\n{repr(data)}")
+        await self._bot.send_interactive(liquidation_card)
+
+
+@register_monitor(channel="market", streams=True, market=True, state=True)
+class SpreadMonitor(BaseMonitor):
+
+    def __init__(
+        self,
+        bot: Bot,
+        *,
+        client: UMFutures | None = None,
+        hub: StreamHub | None = None,
+        key: str | None = None,
+        secret: str | None = None,
+        proxies: dict[str, str] | None = None,
+        held: bool = False,
+        capacity: int = 1024,
+        sample: float = 0.1,
+        halflife: str = "5m",
+        spread_bps: float = 50.0,
+        zscore: float = 6.0,
+        min_bps: float = 5.0,
+        cooldown: str | float = "5m",
+        interval: float = 5.0,
+        record: str | None = None,
+        state: StateNamespace | None = None,
+        clock: Clock | None = None,
+        scheduler: Scheduler | None = None,
+        **kwargs,
+    ) -> None:
+        super().__init__(clock=clock, scheduler=scheduler)
+        self._bot = bot
+        self._client = self._make_client(key, secret, proxies, **kwargs) if client is None else client
+        self._own_hub = hub is None
+        self._hub = StreamHub(proxies=proxies, record=record, clock=self._clock, name=type(self).__name__) if hub is None else hub
+        self._held = held
+        self._streams = set()
+        self._book = SpreadBook(capacity, sample=round(1000 * sample), halflife=parse_interval(halflife))
+        self._sampled = 0
+        self._dropped = 0
+        self._positions = {}
+        self._spread_bps = spread_bps
+        self._zscore = zscore
+        self._min_bps = min_bps
+        self._interval = interval
+        self._cooldowns = Cooldowns("spread", cooldown=cooldown, clock=self._clock, state=state)
+        self._error_card = error_card_factory()
+        self._spread_card = spread_card_factory()
 
-    def on_open(
+    @property
+    def book(
         self,
-        socket_manager: BinanceSocketManager,
+    ) -> SpreadBook:
+        return self._book
+
+    def jobs(
+        self,
+    ) -> list[Job]:
+        return [
+            self._job(self.monitor_positions, 60 * 1.0, immediate=True),
+            self._job(self.monitor_spread, self._interval),
+        ]
+
+    def _subscribe(
+        self,
+        streams: set[str],
     ) -> None:
-        logger.info(f"on_open")
+        for stream in self._streams - streams:
+            self._hub.unsubscribe(stream, self.on_book_ticker)
+        for stream in streams - self._streams:
+            self._hub.subscribe(stream, decode_book_ticker, self.on_book_ticker, label="bookTicker")
+        self._streams = streams
 
-    def on_close(
+    async def start(
         self,
-        socket_manager: BinanceSocketManager,
     ) -> None:
-        logger.info(f"on_close")
+        if self.running:
+            return
+        if not self._held:
+            self._subscribe({"!bookTicker"})
+        try:
+            if self._own_hub:
+                await self._hub.start()
+            await super().start()
+        except BaseException:
+            self._subscribe(set())
+            if self._own_hub:
+                await self._hub.stop()
+            raise
 
-    def on_error(
+    async def stop(
         self,
-        socket_manager: BinanceSocketManager,
-        e: Exception,
     ) -> None:
-        logger.warning(f"on_error\n{repr(e)}")
-        socket_manager.create_ws_connection()
-        self._wsclient.user_data(self._listenkey)
-        logger.success(f"SUBSCRIBE: {self._listenkey}")
+        if not self.running:
+            return
+        await super().stop()
+        self._cooldowns.save()
+        self._subscribe(set())
+        if self._own_hub:
+            await self._hub.stop()
 
-    def on_ping(
+    def on_book_ticker(
         self,
-        socket_manager: BinanceSocketManager,
-        data: bytes | str,
+        data: BookTicker | Any,
+        t: int,
     ) -> None:
-        logger.debug(f"on_ping\n{repr(data)}")
+        if isinstance(data, BookTicker):
+            self._book.update(data, t)
+        else:
+            logger.info(f"on_book_ticker\n{repr(data)}")
 
-    def on_pong(
+    async def monitor_positions(
         self,
-        socket_manager: BinanceSocketManager,
     ) -> None:
-        logger.debug(f"on_pong")
+        error_card = self._error_card
 
-    async def monitor_listenkey(
+        try:
+            data = decode_positions(await restapi_wrapper(self._client.get_position_risk))
+        except Exception as e:
+            error_card["body"]["elements"][1]["text"]["content"] = message = repr(e)
+            logger.error(message)
+            await self._bot.send_interactive(error_card)
+            return
+        self._positions.clear()
+        self._positions.update((x.symbol, x) for x in data if 0 != x.position_amt)
+        if self._held and self.running:
+            self._subscribe({f"{symbol.lower()}@bookTicker" for symbol in self._positions})
+
+    async def monitor_spread(
         self,
     ) -> None:
-        error_card = error_card_factory()
+        spread_card = self._spread_card
+        cooldowns = self._cooldowns
+        book = self._book
+
+        spread_card["body"]["elements"][1]["rows"] = rows = []
+        sampled, dropped = book.sampled, book.dropped
+        BOOK_TICKERS.inc(sampled - self._sampled, result="sampled")
+        BOOK_TICKERS.inc(dropped - self._dropped, result="dropped")
+        self._sampled, self._dropped = sampled, dropped
+        cooldowns.expire()
+        zscores = book.zscores()
+        for symbol, pos in self._positions.items():
+            i = book.symbols.get(symbol)
+            if i is None:
+                continue
+            spread = float(book.spreads[i])
+            zscore = float(zscores[i])
+            if not (self._spread_bps <= spread or (self._min_bps <= spread and self._zscore <= zscore)):
+                continue
+            if not cooldowns.hit("spread", symbol):
+                continue
+            row = {}
+            rows.append(row)
+            ps = pos.notional < 0
+            f_ps = markdown_color("空", "red") if ps else markdown_color("多", "green")
+            row["symbol"] = f"{f_ps} {format_symbol(symbol)}"
+            row["spread_bps"] = spread
+            row["mean_bps"] = float(book.means[i])
+            if not math.isnan(zscore):
+                row["zscore"] = min(zscore, 999.0)
+            row["bid_price"] = float(book.bids[i])
+            row["ask_price"] = float(book.asks[i])
+            row["depth"] = float(book.depths[i])
+        cooldowns.save()
+        if 0 == len(rows):
+            return
+        rows.sort(key=lambda x: -x["spread_bps"])
+        await self._bot.send_interactive(spread_card)
+
+
+@register_monitor(channel="order", streams=True, clocksync=True, reports=True)
+class OrderMonitor(BaseMonitor):
+
+    def __init__(
+        self,
+        bot: Bot,
+        *,
+        client: UMFutures | None = None,
+        hub: StreamHub | None = None,
+        key: str | None = None,
+        secret: str | None = None,
+        proxies: dict[str, str] | None = None,
+        record: str | None = None,
+        clock: Clock | None = None,
+        scheduler: Scheduler | None = None,
+        clocksync: ClockSync | None = None,
+        executor: concurrent.futures.Executor | None = None,
+        **kwargs,
+    ) -> None:
+        super().__init__(clock=clock, scheduler=scheduler)
+        self._bot = bot
+        self._clocksync = clocksync
+        self._executor = executor
+        self._client = self._make_client(key, secret, proxies, **kwargs) if client is None else client
+        self._own_hub = hub is None
+        self._hub = StreamHub(proxies=proxies, record=record, clock=self._clock, name=type(self).__name__) if hub is None else hub
+        self._listenkey = ""
+        self._orders_dq = collections.deque()
+        self._new_orders_by_id = {}
+        self._error_card = error_card_factory()
+        self._order_card = order_card_factory()
+        self._orders_csv = pathlib.Path(r"./data/orders.csv")
 
-        delay = 60 * 1.0
-        sleep_task = asyncio.create_task(asyncio.sleep(delay))
-        while True:
-            await sleep_task
-            sleep_task = asyncio.create_task(asyncio.sleep(delay))
+    def jobs(
+        self,
+    ) -> list[Job]:
+        return [
+            self._job(self.monitor_listenkey, 60 * 1.0),
+            self._job(self.monitor_order, "* * * * *", jitter=0.0, stagger=0.0),
+        ]
+
+    async def start(
+        self,
+    ) -> None:
+        if self.running:
+            return
+        try:
+            if self._own_hub:
+                await self._hub.start()
             try:
                 data = await restapi_wrapper(self._client.new_listen_key)
             except Exception as e:
+                error_card = error_card_factory()
                 error_card["body"]["elements"][1]["text"]["content"] = message = repr(e)
                 logger.error(message)
                 await self._bot.send_interactive(error_card)
-                continue
-            new_listenkey = data["listenKey"]
-            if self._listenkey == new_listenkey:
-                continue
-            self._wsclient.user_data(self._listenkey, action="UNSUBSCRIBE")
-            logger.success(f"UNSUBSCRIBE: {self._listenkey}")
-            self._listenkey = new_listenkey
-            self._wsclient.user_data(self._listenkey)
-            logger.success(f"SUBSCRIBE: {self._listenkey}")
+            else:
+                self._listenkey = data["listenKey"]
+                self._hub.subscribe(self._listenkey, decode_user_event, self.on_user_event, label="userData")
+            await super().start()
+        except BaseException:
+            self._hub.unsubscribe(self._listenkey, self.on_user_event)
+            if self._own_hub:
+                await self._hub.stop()
+            raise
+
+    async def stop(
+        self,
+    ) -> None:
+        if not self.running:
+            return
+        await super().stop()
+        self._hub.unsubscribe(self._listenkey, self.on_user_event)
+        if self._own_hub:
+            await self._hub.stop()
+        try:
+            data = await restapi_wrapper(self._client.close_listen_key, self._listenkey)
+        except Exception as e:
+            error_card = error_card_factory()
+            error_card["body"]["elements"][1]["text"]["content"] = message = repr(e)
+            logger.error(message)
+            await self._bot.send_interactive(error_card)
+
+    def on_user_event(
+        self,
+        data: OrderTradeUpdate | Any,
+        t: int,
+    ) -> None:
+        if isinstance(data, OrderTradeUpdate):
+            logger.info(f"on_user_event\n{repr(data)}")
+            if self._clocksync is not None:
+                self._clocksync.observe(data.event_time)
+            self._orders_dq.append(data)
+            if "NEW" == data.order.execution_type:
+                self._new_orders_by_id[data.order.order_id] = data
+        else:
+            logger.info(f"on_user_event\n{repr(data)}")
+
+    async def monitor_listenkey(
+        self,
+    ) -> None:
+        error_card = self._error_card
+
+        try:
+            data = await restapi_wrapper(self._client.new_listen_key)
+        except Exception as e:
+            error_card["body"]["elements"][1]["text"]["content"] = message = repr(e)
+            logger.error(message)
+            await self._bot.send_interactive(error_card)
+            return
+        new_listenkey = data["listenKey"]
+        if self._listenkey == new_listenkey:
+            return
+        self._hub.unsubscribe(self._listenkey, self.on_user_event)
+        self._listenkey = new_listenkey
+        self._hub.subscribe(self._listenkey, decode_user_event, self.on_user_event, label="userData")
 
     async def monitor_order(
         self,
     ) -> None:
-        order_card = order_card_factory()
-
-        orders_csv = pathlib.Path(r"./data/orders.csv")
-        delay = until_next_minute()
-        sleep_task = asyncio.create_task(asyncio.sleep(delay))
-        while True:
-            await sleep_task
-            delay = until_next_minute()
-            sleep_task = asyncio.create_task(asyncio.sleep(delay))
-            orders = sorted(self._orders_dq, key=lambda x: x["o"]["T"])
-            self._orders_dq.clear()
-            step = 10
-            for i in range(0, len(orders), step):
-                order_card["body"]["elements"][1]["rows"] = rows = []
-                csv_rows = []
-                for order in orders[i : i + step]:
-                    timestamp = order["o"]["T"]
-                    order_id = order["o"]["i"]
-                    f_order_id = str(order_id)[:7]
-                    side = order["o"]["S"]
-                    f_side = markdown_color("买", "green") if "BUY" == side else markdown_color("卖", "red")
-                    symbol = order["o"]["s"]
-                    f_symbol = format_symbol(symbol)
-                    price = float(order["o"]["p"])
-                    quantity = float(order["o"]["q"])
-                    notional = quantity * price
-                    last_price = float(order["o"]["L"])
-                    last_quantity = float(order["o"]["l"])
-                    last_notional = last_quantity * last_price
-                    realized_profit = float(order["o"]["rp"])
-                    filled_quantity = float(order["o"]["z"])
-                    filled_percent = 100 * filled_quantity / quantity if 0 < quantity else 0.0
-                    slippage = last_price - price if "BUY" == side else price - last_price
-                    slippage_percent = 100 * slippage / price if 0 < price else 0.0
-                    commission = float(order["o"]["n"])
-                    commission_percent = 100 * commission / last_notional if 0 < last_notional else 0.0
-                    if order_id in self._new_orders_by_id:
-                        delay = timestamp - self._new_orders_by_id[order_id]["o"]["T"]
-                        f_delay = format_milliseconds(delay)
-                    else:
-                        delay = None
-                        f_delay = "--"
-                    role = "MAKER" if order["o"]["m"] else "TAKER"
-                    task = order["o"]["x"]
-                    status = order["o"]["X"]
-                    f_status = {"PARTIALLY_FILLED": "PARTIAL"}.get(status, status)
-                    order_type = order["o"]["o"]
-                    valid_type = order["o"]["f"]
-                    if order_id in self._new_orders_by_id and "PARTIALLY_FILLED" != status:
-                        del self._new_orders_by_id[order_id]
-                    row = {}
-                    rows.append(row)
-                    row["timestamp"] = timestamp
-                    row["order_id"] = f_order_id
-                    row["side"] = f_side
-                    row["symbol"] = f_symbol
-                    row["last_quantity"] = last_quantity
-                    row["last_price"] = last_price
-                    row["last_notional"] = last_notional
-                    row["realized_profit"] = realized_profit
-                    row["filled_percent"] = filled_percent
-                    row["slippage_percent"] = slippage_percent
-                    row["delay"] = f_delay
-                    row["role"] = role
-                    row["task"] = task
-                    row["status"] = f_status
-                    row["order_type"] = order_type
-                    row["valid_type"] = valid_type
-                    csv_row = {}
-                    csv_rows.append(csv_row)
-                    csv_row["timestamp"] = timestamp
-                    csv_row["order_id"] = order_id
-                    csv_row["side"] = side
-                    csv_row["symbol"] = symbol
-                    csv_row["quantity"] = quantity
-                    csv_row["price"] = price
-                    csv_row["notional"] = notional
-                    csv_row["last_quantity"] = last_quantity
-                    csv_row["last_price"] = last_price
-                    csv_row["last_notional"] = last_notional
-                    csv_row["realized_profit"] = realized_profit
-                    csv_row["filled_quantity"] = filled_quantity
-                    csv_row["filled_percent"] = filled_percent
-                    csv_row["slippage"] = slippage
-                    csv_row["slippage_percent"] = slippage_percent
-                    csv_row["commission"] = commission
-                    csv_row["commission_percent"] = commission_percent
-                    csv_row["delay"] = delay
-                    csv_row["role"] = role
-                    csv_row["task"] = task
-                    csv_row["status"] = status
-                    csv_row["order_type"] = order_type
-                    csv_row["valid_type"] = valid_type
-                if 0 == len(rows):
-                    continue
-                task1 = asyncio.create_task(self._bot.send_interactive(order_card))
-                task2 = asyncio.create_task(csv_appendrows(orders_csv, csv_rows))
-                await (await task1).wait()
-                await task2
+        order_card = self._order_card
+
+        orders = sorted(self._orders_dq, key=lambda x: x.order.trade_time)
+        self._orders_dq.clear()
+        step = 10
+        for i in range(0, len(orders), step):
+            batch = orders[i : i + step]
+            new_trade_times = {
+                x.order.order_id: self._new_orders_by_id[x.order.order_id].order.trade_time
+                for x in batch
+                if x.order.order_id in self._new_orders_by_id
+            }
+            rows, csv_rows, done = await run_report(self._executor, order_report, batch, new_trade_times)
+            for order_id in done:
+                self._new_orders_by_id.pop(order_id, None)
+            order_card["body"]["elements"][1]["rows"] = rows
+            if 0 == len(rows):
+                continue
+            task1 = asyncio.create_task(self._bot.send_interactive(order_card))
+            task2 = asyncio.create_task(csv_appendrows(self._orders_csv, csv_rows))
+            await (await task1).wait()
+            await task2
 
 
+@register_monitor(channel="exchange", scope="market", state=True)
 class ExchangeMonitor(BaseMonitor):
 
     def __init__(
         self,
         bot: Bot,
         *,
+        client: UMFutures | None = None,
         key: str | None = None,
         secret: str | None = None,
         proxies: dict[str, str] | None = None,
+        state: StateNamespace | None = None,
+        clock: Clock | None = None,
+        scheduler: Scheduler | None = None,
         minute: int = 0,
+        cooldown: str | float | None = None,
         **kwargs,
     ) -> None:
-        super().__init__()
+        super().__init__(clock=clock, scheduler=scheduler)
         self._bot = bot
-        self._client = UMFutures(
-            key=key,
-            secret=secret,
-            proxies=proxies,
-            **kwargs,
-        )
+        self._client = self._make_client(key, secret, proxies, **kwargs) if client is None else client
         self._positions = {}
         self._minute = minute
-
-    async def _engine(
+        self._until = cooldown is None
+        self._cooldowns = Cooldowns("exchange", cooldown=0.0 if cooldown is None else cooldown, clock=self._clock, state=state)
+        self._at_all_element = at_all_element_factory()
+        self._error_card = error_card_factory()
+        self._exchange_card = exchange_card_factory()
+        self._exchange_card["body"]["elements"].append(self._at_all_element)
+
+    def jobs(
         self,
-    ) -> None:
-        async with asyncio.TaskGroup() as tg:
-            tg.create_task(self.monitor_positions())
-            tg.create_task(self.monitor_exchange())
+    ) -> list[Job]:
+        return [
+            self._job(self.monitor_positions, 50 * 60 * 1.0, immediate=True),
+            self._job(self.monitor_exchange, f"{self._minute} * * * *"),
+        ]
 
     async def monitor_positions(
         self,
     ) -> None:
-        error_card = error_card_factory()
+        error_card = self._error_card
 
-        delay = 50 * 60 * 1.0
-        sleep_task = asyncio.create_task(asyncio.sleep(0.0))
-        while True:
-            await sleep_task
-            sleep_task = asyncio.create_task(asyncio.sleep(delay))
-            try:
-                data = await restapi_wrapper(self._client.get_position_risk)
-            except Exception as e:
-                error_card["body"]["elements"][1]["text"]["content"] = message = repr(e)
-                logger.error(message)
-                await self._bot.send_interactive(error_card)
-                continue
-            self._positions.clear()
-            self._positions.update((x["symbol"], x) for x in data)
+        try:
+            data = decode_positions(await restapi_wrapper(self._client.get_position_risk))
+        except Exception as e:
+            error_card["body"]["elements"][1]["text"]["content"] = message = repr(e)
+            logger.error(message)
+            await self._bot.send_interactive(error_card)
+            return
+        self._positions.clear()
+        self._positions.update((x.symbol, x) for x in data)
 
     async def monitor_exchange(
         self,
     ) -> None:
-        at_all_element = at_all_element_factory()
-        error_card = error_card_factory()
-        exchange_card = exchange_card_factory()
-        exchange_card["body"]["elements"].append(at_all_element)
-
-        memories = {}
+        error_card = self._error_card
+        exchange_card = self._exchange_card
+        cooldowns = self._cooldowns
         perpetual_time = 4133404800000
-        delay = until_next_hour(minute=self._minute)
-        sleep_task = asyncio.create_task(asyncio.sleep(delay))
-        while True:
-            await sleep_task
-            delay = until_next_hour(minute=self._minute)
-            sleep_task = asyncio.create_task(asyncio.sleep(delay))
-            exchange_card["body"]["elements"][1]["rows"] = rows = []
-            try:
-                task1 = asyncio.create_task(restapi_wrapper(self._client.exchange_info))
-                task2 = asyncio.create_task(restapi_wrapper(self._client.time))
-                data1 = await task1
-                data2 = await task2
-            except Exception as e:
-                error_card["body"]["elements"][1]["text"]["content"] = message = repr(e)
-                logger.error(message)
-                await self._bot.send_interactive(error_card)
+
+        exchange_card["body"]["elements"][1]["rows"] = rows = []
+        try:
+            data1 = await restapi_wrapper(self._client.exchange_info)
+        except Exception as e:
+            error_card["body"]["elements"][1]["text"]["content"] = message = repr(e)
+            logger.error(message)
+            await self._bot.send_interactive(error_card)
+            return
+        symbols = data1["symbols"]
+        server_time = self._clock.time_ms()
+        cooldowns.expire()
+        for data in symbols:
+            if "PERPETUAL" != data["contractType"]:
                 continue
-            symbols = data1["symbols"]
-            server_time = data2["serverTime"]
-            for data in symbols:
-                if "PERPETUAL" != data["contractType"]:
-                    continue
-                symbol = data["symbol"]
-                status = data["status"]
-                onboard_date = data["onboardDate"]
-                delivery_date = data["deliveryDate"]
-                if not (server_time < delivery_date < perpetual_time or server_time < onboard_date < perpetual_time):
-                    continue
-                t = time_ms()
-                key = symbol, status, onboard_date, delivery_date
-                if key in memories:
-                    continue
-                memories[key] = t
-                row = {}
-                rows.append(row)
-                f_symbol = format_symbol(symbol)
-                if symbol in self._positions:
-                    ps = "-" == self._positions[symbol]["notional"][0]
-                    f_ps = markdown_color("空", "red") if ps else markdown_color("多", "green")
-                    row["symbol"] = f"{f_ps} {f_symbol}"
-                else:
-                    row["symbol"] = f_symbol
-                row["status"] = status
-                row["onboard_date"] = onboard_date
-                row["delivery_date"] = delivery_date
-            if 0 == len(rows):
+            symbol = data["symbol"]
+            status = data["status"]
+            onboard_date = data["onboardDate"]
+            delivery_date = data["deliveryDate"]
+            if not (server_time < delivery_date < perpetual_time or server_time < onboard_date < perpetual_time):
+                continue
+            until = max(x for x in (onboard_date, delivery_date) if x < perpetual_time) if self._until else None
+            if not cooldowns.hit("contract", (symbol, status, onboard_date, delivery_date), until=until):
                 continue
-            await self._bot.send_interactive(exchange_card)
+            row = {}
+            rows.append(row)
+            f_symbol = format_symbol(symbol)
+            if symbol in self._positions:
+                ps = self._positions[symbol].notional < 0
+                f_ps = markdown_color("空", "red") if ps else markdown_color("多", "green")
+                row["symbol"] = f"{f_ps} {f_symbol}"
+            else:
+                row["symbol"] = f_symbol
+            row["status"] = status
+            row["onboard_date"] = onboard_date
+            row["delivery_date"] = delivery_date
+        cooldowns.save()
+        if 0 == len(rows):
+            return
+        await self._bot.send_interactive(exchange_card)
 
 
 class MonitorGroup[BaseMonitor]:
@@ -814,8 +1349,13 @@ class MonitorGroup[BaseMonitor]:
     def __init__(
         self,
         monitors: Iterable[BaseMonitor],
+        *,
+        start_timeout: float = 30.0,
+        stop_timeout: float = 10.0,
     ) -> None:
         self._monitors = list(monitors)
+        self._start_timeout = start_timeout
+        self._stop_timeout = stop_timeout
 
     async def __aenter__(
         self,
@@ -831,6 +1371,32 @@ class MonitorGroup[BaseMonitor]:
     ) -> None:
         await self.stop()
 
+    async def _call(
+        self,
+        i: int,
+        monitor: BaseMonitor,
+        phase: str,
+        timeout: float,
+    ) -> bool:
+        name = f"{i}:{type(monitor).__name__}"
+        t0 = time.perf_counter()
+        try:
+            await asyncio.wait_for(getattr(monitor, phase)(), timeout)
+        except TimeoutError:
+            logger.error(f"{self} {phase} {name} exceeded {timeout}s")
+            ok = False
+        except Exception as e:
+            logger.error(f"{self} {phase} {name} failed\n{repr(e)}")
+            ok = False
+        else:
+            ok = True
+        elapsed = time.perf_counter() - t0
+        LIFECYCLE_SECONDS.set(elapsed, monitor=name, phase=phase)
+        if not ok:
+            LIFECYCLE_FAILURES.inc(monitor=name, phase=phase)
+        logger.info(f"{self} {phase} {name} {"ok" if ok else "failed"} in {elapsed:.3f}s")
+        return ok
+
     async def start(
         self,
     ) -> None:
@@ -838,9 +1404,10 @@ class MonitorGroup[BaseMonitor]:
         if self.running:
             logger.warning(f"{self} has started")
             return
-        for monitor in self._monitors:
-            await monitor.start()
-        logger.info(f"{self} started")
+        oks = await asyncio.gather(
+            *(self._call(i, monitor, "start", self._start_timeout) for i, monitor in enumerate(self._monitors))
+        )
+        logger.info(f"{self} started {sum(oks)}/{len(oks)}")
 
     async def stop(
         self,
@@ -849,9 +1416,14 @@ class MonitorGroup[BaseMonitor]:
         if not self.running:
             logger.warning(f"{self} has stopped")
             return
-        for monitor in reversed(self._monitors):
-            await monitor.stop()
-        logger.info(f"{self} stopped")
+        oks = await asyncio.gather(
+            *(
+                self._call(i, monitor, "stop", self._stop_timeout)
+                for i, monitor in enumerate(self._monitors)
+                if monitor.running
+            )
+        )
+        logger.info(f"{self} stopped {sum(oks)}/{len(oks)}")
 
     @property
     def running(
@@ -0,0 +1,198 @@
+import asyncio
+import collections
+import pathlib
+import sys
+import threading
+import time
+import traceback
+from types import FrameType, TracebackType
+from typing import Self, Type
+from loguru import logger
+
+from .metrics import *
+from .utils import *
+
+__all__ = [
+    "LoopProfiler",
+]
+
+LOOP_LAG = Histogram(
+    "monitor_loop_lag_seconds",
+    "Event loop scheduling lag (wake-up time minus requested sleep).",
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+LOOP_STALLS = Counter(
+    "monitor_loop_stalls_total",
+    "Event loop stalls over the threshold, by the task running when detected.",
+    ("task",),
+)
+LOOP_STALL_SECONDS = Histogram(
+    "monitor_loop_stall_seconds",
+    "Duration of event loop stalls over the threshold.",
+    ("task",),
+    buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+)
+PROFILE_SAMPLES = Counter(
+    "monitor_profile_samples_total",
+    "Stack samples taken from the event loop thread while sampling is on.",
+)
+
+
+def _task_name(
+    task: asyncio.Task | None,
+) -> str:
+    if task is None:
+        return "<callback>"
+    coro = task.get_coro()
+    return getattr(coro, "__qualname__", None) or task.get_name()
+
+
+def _folded(
+    frame: FrameType | None,
+) -> str:
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f"{pathlib.PurePath(code.co_filename).name}:{code.co_qualname}")
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+class LoopProfiler:
+
+    def __init__(
+        self,
+        *,
+        interval: float = 0.25,
+        threshold: float = 0.1,
+        sampling: bool = False,
+        sample_interval: float = 0.005,
+        directory: pathlib.Path = pathlib.Path("./profiles/"),
+    ) -> None:
+        self._interval = interval
+        self._threshold = threshold
+        self._sampling = sampling
+        self._sample_interval = sample_interval
+        self._directory = directory
+        self._samples = collections.Counter()
+        self._loop = None
+        self._ident = None
+        self._beat = 0.0
+        self._stop = threading.Event()
+        self._thread = None
+        self._task = None
+
+    async def __aenter__(
+        self,
+    ) -> Self:
+        await self.start()
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: Type[BaseException] | None,
+        exc_value: BaseException | None,
+        exc_traceback: TracebackType | None,
+    ) -> None:
+        await self.stop()
+
+    async def _engine(
+        self,
+    ) -> None:
+        interval = self._interval
+        while True:
+            t0 = time.perf_counter()
+            self._beat = t0
+            await asyncio.sleep(interval)
+            t1 = time.perf_counter()
+            self._beat = t1
+            LOOP_LAG.observe(max(0.0, t1 - t0 - interval))
+
+    def _watchdog(
+        self,
+    ) -> None:
+        limit = self._interval + self._threshold
+        stall = None
+        while not self._stop.is_set():
+            self._stop.wait(self._sample_interval if self._sampling else self._threshold / 2)
+            frame = sys._current_frames().get(self._ident)
+            if self._sampling and frame is not None:
+                self._samples[_folded(frame)] += 1
+                PROFILE_SAMPLES.inc()
+            beat = self._beat
+            behind = time.perf_counter() - beat
+            if stall is not None and stall[0] != beat:
+                _, task, t0 = stall
+                LOOP_STALL_SECONDS.observe(time.perf_counter() - t0, task=task)
+                stall = None
+            if stall is None and limit < behind and frame is not None:
+                task = _task_name(asyncio.current_task(self._loop))
+                stall = beat, task, beat + self._interval
+                LOOP_STALLS.inc(task=task)
+                logger.warning(
+                    f"loop stalled {behind - self._interval:.3f}s in {task}\n{"".join(traceback.format_stack(frame))}"
+                )
+
+    async def start(
+        self,
+    ) -> None:
+        logger.info(f"{self} starting")
+        if self.running:
+            logger.warning(f"{self} has started")
+            return
+        self._loop = asyncio.get_running_loop()
+        self._ident = threading.get_ident()
+        self._beat = time.perf_counter()
+        self._stop.clear()
+        self._task = asyncio.create_task(self._engine())
+        self._thread = threading.Thread(target=self._watchdog, name=f"{self}", daemon=True)
+        self._thread.start()
+        logger.info(f"{self} started")
+
+    async def stop(
+        self,
+    ) -> None:
+        logger.info(f"{self} stopping")
+        if not self.running:
+            logger.warning(f"{self} has stopped")
+            return
+        self._task.cancel()
+        self._task = None
+        self._stop.set()
+        await asyncio.to_thread(self._thread.join)
+        self._thread = None
+        if self._sampling:
+            await self.dump()
+        logger.info(f"{self} stopped")
+
+    @property
+    def running(
+        self,
+    ) -> bool:
+        return not (self._task is None or self._task.cancelled() or self._task.done())
+
+    @property
+    def sampling(
+        self,
+    ) -> bool:
+        return self._sampling
+
+    def toggle(
+        self,
+    ) -> None:
+        self._sampling = not self._sampling
+        logger.info(f"{self} sampling={self._sampling}")
+        if not self._sampling:
+            asyncio.get_running_loop().create_task(self.dump())
+
+    async def dump(
+        self,
+    ) -> pathlib.Path | None:
+        samples, self._samples = self._samples, collections.Counter()
+        if 0 == len(samples):
+            return None
+        path = self._directory / f"loop-{time_ms()}.folded"
+        s = "".join(f"{stack} {n}\n" for stack, n in samples.most_common())
+        await asyncio.to_thread(write_atomic, path, s)
+        logger.info(f"{self} dumped {sum(samples.values())} samples to {path}")
+        return path
@@ -0,0 +1,220 @@
+import asyncio
+import collections
+import contextlib
+import datetime
+import gzip
+import io
+import json
+import pathlib
+import threading
+from types import TracebackType
+from typing import IO, Iterable, Iterator, Self, Type
+from loguru import logger
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+__all__ = [
+    "SEGMENT_VERSION",
+    "StreamRecorder",
+    "read_segments",
+]
+
+SEGMENT_VERSION = 2
+
+_SUFFIXES = {
+    "gzip": ".gz",
+    "zstd": ".zst",
+}
+
+
+def _open_segment(
+    path: pathlib.Path,
+    mode: str,
+) -> IO[str]:
+    if path.suffix == _SUFFIXES["zstd"]:
+        if zstandard is None:
+            raise ModuleNotFoundError("zstandard is required for .zst segments")
+        if "w" == mode:
+            f = zstandard.ZstdCompressor().stream_writer(open(path, mode="wb"), closefd=True)
+        else:
+            f = zstandard.ZstdDecompressor().stream_reader(open(path, mode="rb"), closefd=True)
+        return io.TextIOWrapper(f, encoding="utf-8", newline="\n")
+    return gzip.open(path, mode=f"{mode}t", encoding="utf-8", newline="\n")
+
+
+class StreamRecorder:
+
+    def __init__(
+        self,
+        directory: pathlib.Path,
+        name: str,
+        *,
+        compression: str = "gzip",
+        segment_seconds: float = 60 * 60.0,
+        segment_bytes: int = 256 * 1024 * 1024,
+        interval: float = 1.0,
+    ) -> None:
+        if compression not in _SUFFIXES:
+            raise ValueError(f"{compression=}")
+        if "zstd" == compression and zstandard is None:
+            raise ModuleNotFoundError("zstandard is required for compression='zstd'")
+        self._directory = directory
+        self._name = name
+        self._suffix = f".jsonl{_SUFFIXES[compression]}"
+        self._segment_seconds = segment_seconds
+        self._segment_bytes = segment_bytes
+        self._interval = interval
+        self._dq = collections.deque()
+        self._lock = threading.Lock()
+        self._file = None
+        self._file_path = None
+        self._file_t0 = 0.0
+        self._file_bytes = 0
+        self._file_seq = 0
+        self._task = None
+
+    async def __aenter__(
+        self,
+    ) -> Self:
+        await self.start()
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: Type[BaseException] | None,
+        exc_value: BaseException | None,
+        exc_traceback: TracebackType | None,
+    ) -> None:
+        await self.stop()
+
+    async def _engine(
+        self,
+    ) -> None:
+        delay = self._interval
+        while True:
+            await asyncio.sleep(delay)
+            flush = asyncio.ensure_future(self.flush())
+            try:
+                await asyncio.shield(flush)
+            except asyncio.CancelledError:
+                await asyncio.wait([flush])
+                raise
+            except Exception as e:
+                logger.error(repr(e))
+
+    async def start(
+        self,
+    ) -> None:
+        logger.info(f"{self} starting")
+        if self.running:
+            logger.warning(f"{self} has started")
+            return
+        self._task = asyncio.create_task(self._engine())
+        logger.info(f"{self} started")
+
+    async def stop(
+        self,
+    ) -> None:
+        logger.info(f"{self} stopping")
+        if not self.running:
+            logger.warning(f"{self} has stopped")
+            return
+        task = self._task
+        self._task = None
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+        await self.flush()
+        await asyncio.to_thread(self._close)
+        logger.info(f"{self} stopped")
+
+    @property
+    def running(
+        self,
+    ) -> bool:
+        return not (self._task is None or self._task.cancelled() or self._task.done())
+
+    def record(
+        self,
+        data: bytes | str,
+        t: int,
+    ) -> None:
+        self._dq.append((t, data))
+
+    async def flush(
+        self,
+    ) -> None:
+        dq = self._dq
+        batch = []
+        while 0 < len(dq):
+            batch.append(dq.popleft())
+        if 0 == len(batch):
+            return
+        await asyncio.to_thread(self._write, batch)
+
+    def _write(
+        self,
+        batch: list[tuple[int, bytes | str]],
+    ) -> None:
+        lines = []
+        for t, data in batch:
+            if isinstance(data, bytes):
+                data = data.decode("utf-8")
+            lines.append(f"{t}\t{data}\n")
+        s = "".join(lines)
+        with self._lock:
+            now = datetime.datetime.now()
+            if self._file is not None and (
+                self._segment_seconds <= now.timestamp() - self._file_t0 or self._segment_bytes <= self._file_bytes
+            ):
+                self._file.close()
+                self._file = None
+            if self._file is None:
+                self._directory.mkdir(parents=True, exist_ok=True)
+                path = self._directory / f"{self._name}-{now.strftime("%Y%m%d_%H%M%S")}-{self._file_seq:04d}{self._suffix}"
+                logger.info(f"{self} segment {repr(path)}")
+                self._file = _open_segment(path, "w")
+                self._file_path = path
+                self._file.write(f"#segment\t{SEGMENT_VERSION}\n")
+                self._file_t0 = now.timestamp()
+                self._file_bytes = 0
+                self._file_seq += 1
+            self._file.write(s)
+            self._file.flush()
+            self._file_bytes = self._file_path.stat().st_size
+
+    def _close(
+        self,
+    ) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+def read_segments(
+    paths: Iterable[pathlib.Path],
+    *,
+    stream: str | None = None,
+) -> Iterator[tuple[int, str]]:
+    prefix = None if stream is None else f'{{"stream":{json.dumps(stream)},"data":'
+    for path in sorted(paths):
+        with _open_segment(path, "r") as f:
+            version = None
+            for line in f:
+                t, _, data = line.rstrip("\n").partition("\t")
+                if "#segment" == t:
+                    version = int(data)
+                    if SEGMENT_VERSION < version:
+                        raise ValueError(f"{path} has segment version {version}, expected <= {SEGMENT_VERSION}")
+                    continue
+                if 0 == len(data):
+                    continue
+                if version is None:
+                    version = 2 if data.startswith('{"stream"') else 1
+                if 1 == version and prefix is not None:
+                    data = f"{prefix}{data}}}"
+                yield int(t), data
@@ -0,0 +1,273 @@
+from typing import Any, Callable
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+__all__ = [
+    "Record",
+    "convert",
+    "MarkPrice",
+    "OrderUpdate",
+    "OrderTradeUpdate",
+    "Position",
+    "LiquidationOrder",
+    "ForceOrder",
+    "BookTicker",
+]
+
+if msgspec is not None:
+
+    class Record(msgspec.Struct):
+        pass
+
+    def convert[T](
+        obj: Any,
+        typ: type[T],
+    ) -> T:
+        return msgspec.convert(obj, typ, strict=False)
+
+else:
+    _MISSING = object()
+
+    class _RecordMeta(type):
+
+        def __new__(
+            mcls,
+            name: str,
+            bases: tuple[type, ...],
+            ns: dict[str, Any],
+            *,
+            rename: dict[str, str] | None = None,
+            **kwargs,
+        ):
+            annotations = ns.get("__annotations__", {})
+            fields = tuple(k for k in annotations if not k.startswith("_"))
+            ns["__struct_defaults__"] = {k: ns.pop(k) for k in fields if k in ns}
+            ns["__struct_fields__"] = fields
+            ns["__struct_encode_fields__"] = tuple((rename or {}).get(k, k) for k in fields)
+            ns["__struct_types__"] = tuple(annotations[k] for k in fields)
+            ns["__slots__"] = fields
+            return super().__new__(mcls, name, bases, ns, **kwargs)
+
+    class Record(metaclass=_RecordMeta):
+
+        def __init__(
+            self,
+            *args,
+            **kwargs,
+        ) -> None:
+            defaults = self.__struct_defaults__
+            for k, v in zip(self.__struct_fields__, args):
+                setattr(self, k, v)
+            for k in self.__struct_fields__[len(args) :]:
+                setattr(self, k, kwargs[k] if k in kwargs else defaults[k])
+
+        def __repr__(
+            self,
+        ) -> str:
+            return f"{type(self).__name__}({", ".join(f"{k}={repr(getattr(self, k))}" for k in self.__struct_fields__)})"
+
+        def __eq__(
+            self,
+            other: Any,
+        ) -> bool:
+            if type(self) is not type(other):
+                return NotImplemented
+            return all(getattr(self, k) == getattr(other, k) for k in self.__struct_fields__)
+
+    def _converter(
+        typ: Any,
+    ) -> Callable[[Any], Any] | None:
+        if isinstance(typ, type) and issubclass(typ, Record):
+            return lambda v: convert(v, typ)
+        if typ is float or typ is int:
+            return typ
+        if typ is bool:
+            return lambda v: v if isinstance(v, bool) else "true" == v
+        return None
+
+    _converters: dict[type, tuple] = {}
+
+    def convert[T](
+        obj: Any,
+        typ: type[T],
+    ) -> T:
+        if typ not in _converters:
+            _converters[typ] = tuple(
+                (k, key, _converter(t), typ.__struct_defaults__.get(k, _MISSING))
+                for k, key, t in zip(typ.__struct_fields__, typ.__struct_encode_fields__, typ.__struct_types__)
+            )
+        x = object.__new__(typ)
+        for k, key, conv, default in _converters[typ]:
+            if key in obj:
+                v = obj[key]
+                setattr(x, k, v if conv is None else conv(v))
+            elif default is _MISSING:
+                raise KeyError(key)
+            else:
+                setattr(x, k, default)
+        return x
+
+
+class MarkPrice(
+    Record,
+    rename={
+        "event_time": "E",
+        "symbol": "s",
+        "mark_price": "p",
+        "index_price": "i",
+        "funding_rate": "r",
+        "next_funding_time": "T",
+    },
+):
+    event_time: int
+    symbol: str
+    mark_price: float
+    index_price: float
+    # "" on delivery contracts, so left as sent
+    funding_rate: str
+    next_funding_time: int
+
+
+class OrderUpdate(
+    Record,
+    rename={
+        "symbol": "s",
+        "side": "S",
+        "order_type": "o",
+        "time_in_force": "f",
+        "quantity": "q",
+        "price": "p",
+        "execution_type": "x",
+        "status": "X",
+        "order_id": "i",
+        "last_quantity": "l",
+        "filled_quantity": "z",
+        "last_price": "L",
+        "trade_time": "T",
+        "is_maker": "m",
+        "realized_profit": "rp",
+        "position_side": "ps",
+        "commission": "n",
+    },
+):
+    symbol: str
+    side: str
+    order_type: str
+    time_in_force: str
+    quantity: float
+    price: float
+    execution_type: str
+    status: str
+    order_id: int
+    last_quantity: float
+    filled_quantity: float
+    last_price: float
+    trade_time: int
+    is_maker: bool
+    realized_profit: float
+    position_side: str = "BOTH"
+    commission: float = 0.0
+
+
+class OrderTradeUpdate(
+    Record,
+    rename={
+        "event_time": "E",
+        "transaction_time": "T",
+        "order": "o",
+    },
+):
+    event_time: int
+    transaction_time: int
+    order: OrderUpdate
+
+
+class Position(
+    Record,
+    rename={
+        "symbol": "symbol",
+        "position_side": "positionSide",
+        "position_amt": "positionAmt",
+        "entry_price": "entryPrice",
+        "mark_price": "markPrice",
+        "unrealized_profit": "unRealizedProfit",
+        "notional": "notional",
+        "initial_margin": "positionInitialMargin",
+        "update_time": "updateTime",
+    },
+):
+    symbol: str
+    position_side: str
+    position_amt: float
+    entry_price: float
+    mark_price: float
+    unrealized_profit: float
+    notional: float
+    initial_margin: float = 0.0
+    update_time: int = 0
+
+
+class LiquidationOrder(
+    Record,
+    rename={
+        "symbol": "s",
+        "side": "S",
+        "order_type": "o",
+        "time_in_force": "f",
+        "quantity": "q",
+        "price": "p",
+        "average_price": "ap",
+        "status": "X",
+        "last_quantity": "l",
+        "filled_quantity": "z",
+        "trade_time": "T",
+    },
+):
+    symbol: str
+    side: str
+    order_type: str
+    time_in_force: str
+    quantity: float
+    price: float
+    average_price: float
+    status: str
+    last_quantity: float
+    filled_quantity: float
+    trade_time: int
+
+
+class ForceOrder(
+    Record,
+    rename={
+        "event_time": "E",
+        "order": "o",
+    },
+):
+    event_time: int
+    order: LiquidationOrder
+
+
+class BookTicker(
+    Record,
+    rename={
+        "update_id": "u",
+        "event_time": "E",
+        "transaction_time": "T",
+        "symbol": "s",
+        "bid_price": "b",
+        "bid_quantity": "B",
+        "ask_price": "a",
+        "ask_quantity": "A",
+    },
+):
+    update_id: int
+    event_time: int
+    transaction_time: int
+    symbol: str
+    bid_price: float
+    bid_quantity: float
+    ask_price: float
+    ask_quantity: float
@@ -0,0 +1,249 @@
+from __future__ import annotations
+
+import importlib
+import importlib.metadata
+from types import TracebackType
+from typing import TYPE_CHECKING, Any, Callable, Iterable, Self, Type
+from loguru import logger
+
+from .clock import *
+from .clocksync import *
+from .scheduler import *
+from .state import *
+from .streams import *
+
+if TYPE_CHECKING:
+    import concurrent.futures
+    from binance.um_futures import UMFutures
+
+__all__ = [
+    "MonitorSpec",
+    "MONITORS",
+    "register_monitor",
+    "load_plugins",
+    "Account",
+]
+
+
+class MonitorSpec:
+
+    def __init__(
+        self,
+        cls: type,
+        *,
+        channel: str,
+        scope: str = "account",
+        rest: bool = True,
+        streams: bool = False,
+        market: bool = False,
+        ring: bool = False,
+        state: bool = False,
+        clocksync: bool = False,
+        reports: bool = False,
+    ) -> None:
+        if scope not in ("account", "market"):
+            raise ValueError(f"invalid scope {repr(scope)}")
+        self.cls = cls
+        self.channel = channel
+        self.scope = scope
+        self.rest = rest
+        self.streams = streams
+        self.market = market
+        self.ring = ring
+        self.state = state
+        self.clocksync = clocksync
+        self.reports = reports
+
+    def __repr__(
+        self,
+    ) -> str:
+        return f"{type(self).__name__}({self.cls.__name__}, channel={repr(self.channel)}, scope={repr(self.scope)})"
+
+
+MONITORS: dict[str, MonitorSpec] = {}
+
+
+def register_monitor[T: type](
+    *,
+    channel: str,
+    scope: str = "account",
+    rest: bool = True,
+    streams: bool = False,
+    market: bool = False,
+    ring: bool = False,
+    state: bool = False,
+    clocksync: bool = False,
+    reports: bool = False,
+) -> Callable[[T], T]:
+    def decorator(
+        cls: T,
+    ) -> T:
+        name = cls.__name__
+        if name in MONITORS:
+            raise ValueError(f"duplicate monitor {repr(name)}")
+        MONITORS[name] = MonitorSpec(
+            cls,
+            channel=channel,
+            scope=scope,
+            rest=rest,
+            streams=streams,
+            market=market,
+            ring=ring,
+            state=state,
+            clocksync=clocksync,
+            reports=reports,
+        )
+        return cls
+
+    return decorator
+
+
+def load_plugins(
+    modules: Iterable[str] = (),
+    *,
+    group: str = "binance_futures_monitor.monitors",
+) -> None:
+    importlib.import_module(".monitor", __package__)
+    for module in modules:
+        logger.info(f"load_plugins {module}")
+        importlib.import_module(module)
+    for entry_point in importlib.metadata.entry_points(group=group):
+        logger.info(f"load_plugins {entry_point.value}")
+        entry_point.load()
+
+
+class Account:
+
+    def __init__(
+        self,
+        name: str = "default",
+        *,
+        key: str | None = None,
+        secret: str | None = None,
+        proxies: dict[str, str] | None = None,
+        state: StateStore | None = None,
+        record: str | None = None,
+        executor: concurrent.futures.Executor | None = None,
+        scheduler: Scheduler | None = None,
+        streams: dict | None = None,
+        market: Account | None = None,
+        sync: bool = True,
+    ) -> None:
+        from binance.um_futures import UMFutures
+
+        self.name = name
+        self._proxies = proxies
+        self._state = state
+        self._record = record
+        self._executor = executor
+        self._scheduler = scheduler
+        self._streams = {} if streams is None else streams
+        self._market = market
+        self._client = UMFutures(key=key, secret=secret, proxies=proxies)
+        self._clocksync = ClockSync(self._client) if sync else None
+        self._hub = None
+        self._running = False
+
+    async def __aenter__(
+        self,
+    ) -> Self:
+        await self.start()
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: Type[BaseException] | None,
+        exc_value: BaseException | None,
+        exc_traceback: TracebackType | None,
+    ) -> None:
+        await self.stop()
+
+    async def start(
+        self,
+    ) -> None:
+        logger.info(f"{self} starting")
+        if self.running:
+            logger.warning(f"{self} has started")
+            return
+        if self._clocksync is not None:
+            await self._clocksync.start()
+        if self._hub is not None:
+            await self._hub.start()
+        self._running = True
+        logger.info(f"{self} started")
+
+    async def stop(
+        self,
+    ) -> None:
+        logger.info(f"{self} stopping")
+        if not self.running:
+            logger.warning(f"{self} has stopped")
+            return
+        if self._hub is not None:
+            await self._hub.stop()
+        if self._clocksync is not None:
+            await self._clocksync.stop()
+        self._running = False
+        logger.info(f"{self} stopped")
+
+    @property
+    def running(
+        self,
+    ) -> bool:
+        return self._running
+
+    @property
+    def client(
+        self,
+    ) -> UMFutures:
+        return self._client
+
+    @property
+    def clocksync(
+        self,
+    ) -> ClockSync | None:
+        return self._clocksync
+
+    @property
+    def clock(
+        self,
+    ) -> Clock:
+        return REAL_CLOCK if self._clocksync is None else self._clocksync.clock
+
+    @property
+    def hub(
+        self,
+    ) -> StreamHub:
+        if self._hub is None:
+            self._hub = StreamHub(
+                proxies=self._proxies,
+                record=self._record,
+                clock=self.clock,
+                name=self.name,
+                **self._streams,
+            )
+        return self._hub
+
+    def build(
+        self,
+        cls: str,
+        bot: Any,
+        **kwargs,
+    ) -> Any:
+        if cls not in MONITORS:
+            raise KeyError(f"unknown monitor {repr(cls)}, registered: {", ".join(MONITORS)}")
+        spec = MONITORS[cls]
+        if spec.rest:
+            kwargs["client"] = self.client
+        if spec.streams:
+            kwargs["hub"] = self._market.hub if spec.market and self._market is not None else self.hub
+        if spec.state and self._state is not None:
+            kwargs["state"] = self._state.namespace(cls, self.name)
+        if spec.clocksync and self._clocksync is not None:
+            kwargs["clocksync"] = self._clocksync
+        if spec.reports and self._executor is not None:
+            kwargs["executor"] = self._executor
+        if self._scheduler is not None:
+            kwargs.setdefault("scheduler", self._scheduler)
+        kwargs.setdefault("clock", self.clock)
+        return spec.cls(bot, **kwargs)
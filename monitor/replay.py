@@ -0,0 +1,155 @@
+import asyncio
+import copy
+import itertools
+import pathlib
+import time
+from types import TracebackType
+from typing import Any, Callable, Coroutine, Iterable, Self, Type
+from loguru import logger
+
+from .clock import *
+from .recorder import *
+
+__all__ = [
+    "CaptureBot",
+    "Replayer",
+]
+
+
+class CaptureBot:
+
+    def __init__(
+        self,
+    ) -> None:
+        self.payloads = []
+        self._running = False
+
+    async def __aenter__(
+        self,
+    ) -> Self:
+        await self.start()
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: Type[BaseException] | None,
+        exc_value: BaseException | None,
+        exc_traceback: TracebackType | None,
+    ) -> None:
+        await self.stop()
+
+    async def start(
+        self,
+    ) -> None:
+        self._running = True
+
+    async def stop(
+        self,
+    ) -> None:
+        self._running = False
+
+    @property
+    def running(
+        self,
+    ) -> bool:
+        return self._running
+
+    @property
+    def cards(
+        self,
+    ) -> list[dict]:
+        return [x["card"] for x in self.payloads if "interactive" == x["msg_type"]]
+
+    def _capture(
+        self,
+        payload: dict,
+    ) -> asyncio.Event:
+        self.payloads.append(copy.deepcopy(payload))
+        event = asyncio.Event()
+        event.set()
+        return event
+
+    async def send_text(
+        self,
+        text: str,
+    ) -> asyncio.Event:
+        return self._capture({"msg_type": "text", "content": {"text": text}})
+
+    async def send_post(
+        self,
+        post: dict,
+    ) -> asyncio.Event:
+        return self._capture({"msg_type": "post", "content": {"post": post}})
+
+    async def send_share_chat(
+        self,
+        share_chat_id: str,
+    ) -> asyncio.Event:
+        return self._capture({"msg_type": "share_chat", "content": {"share_chat_id": share_chat_id}})
+
+    async def send_image(
+        self,
+        image_key: str,
+    ) -> asyncio.Event:
+        return self._capture({"msg_type": "image", "content": {"image_key": image_key}})
+
+    async def send_interactive(
+        self,
+        card: dict,
+    ) -> asyncio.Event:
+        return self._capture({"msg_type": "interactive", "card": card})
+
+
+class Replayer:
+
+    def __init__(
+        self,
+        paths: Iterable[pathlib.Path],
+        *,
+        clock: VirtualClock,
+        speed: float | None = None,
+        tail: int = 0,
+        stream: str | None = None,
+    ) -> None:
+        self._paths = list(paths)
+        self._stream = stream
+        self._clock = clock
+        self._speed = speed
+        self._tail = tail
+        self.frames = 0
+        self.elapsed = 0.0
+
+    async def run(
+        self,
+        on_message: Callable[[Any, str], None],
+        *coros: Coroutine,
+    ) -> None:
+        clock = self._clock
+        speed = self._speed
+        frames = iter(read_segments(self._paths, stream=self._stream))
+        try:
+            t, data = next(frames)
+        except StopIteration:
+            for coro in coros:
+                coro.close()
+            return
+        clock.set(t)
+        t0 = time.perf_counter()
+        tasks = [asyncio.create_task(coro) for coro in coros]
+        await clock.settle()
+        try:
+            prv = t
+            for t, data in itertools.chain([(t, data)], frames):
+                if speed is not None and prv < t:
+                    await asyncio.sleep((t - prv) / 1000 / speed)
+                await clock.advance(t)
+                on_message(None, data)
+                self.frames += 1
+                prv = t
+            await clock.advance(prv + self._tail)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            self.elapsed = time.perf_counter() - t0
+        logger.info(f"{self} replayed {self.frames} frames in {self.elapsed:.3f}s")
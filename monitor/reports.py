@@ -0,0 +1,207 @@
+import asyncio
+import concurrent.futures
+import json
+import multiprocessing
+from typing import Any, Callable
+
+from .records import *
+from .utils import *
+
+__all__ = [
+    "make_executor",
+    "run_report",
+    "position_report",
+    "order_report",
+]
+
+
+def make_executor(
+    kind: str = "none",
+    *,
+    workers: int | None = None,
+) -> concurrent.futures.Executor | None:
+    if "none" == kind:
+        return None
+    if "thread" == kind:
+        return concurrent.futures.ThreadPoolExecutor(max_workers=workers, thread_name_prefix="report")
+    if "process" == kind:
+        return concurrent.futures.ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+    raise ValueError(f"invalid executor {repr(kind)}")
+
+
+async def run_report[T](
+    executor: concurrent.futures.Executor | None,
+    func: Callable[..., T],
+    /,
+    *args,
+) -> T:
+    if executor is None:
+        return func(*args)
+    return await asyncio.get_running_loop().run_in_executor(executor, func, *args)
+
+
+def position_report(
+    account: dict[str, Any],
+    positions: list[Position],
+    changes: dict[tuple[str, str], dict[str, float]],
+    pnls: dict[str, dict[str, float]],
+    totl_max: float,
+    drawdown_percent_threshold: float,
+) -> dict[str, Any]:
+    rows1 = []
+    rows2 = []
+    rows3 = [{"indicator": x} for x in ("多仓", "空仓", "总仓", "总资产")]
+    long = shrt = 0.0
+    long_up, shrt_up = 0.0, 0.0
+    for pos in positions:
+        if pos.notional < 0:
+            shrt += -pos.notional
+            shrt_up += pos.unrealized_profit
+        else:
+            long += pos.notional
+            long_up += pos.unrealized_profit
+    lort = long + shrt
+    lort_up = long_up + shrt_up
+    totl = float(account["totalMarginBalance"])
+    rows3[0]["notional"] = long
+    rows3[1]["notional"] = shrt
+    rows3[2]["notional"] = lort
+    rows3[3]["notional"] = totl
+    rows3[0]["unrealized_profit"] = long_up
+    rows3[1]["unrealized_profit"] = shrt_up
+    rows3[2]["unrealized_profit"] = lort_up
+    for window, pnl in pnls.items():
+        rows3[0][f"pnl{window}"] = pnl["long"]
+        rows3[1][f"pnl{window}"] = pnl["shrt"]
+        rows3[2][f"pnl{window}"] = pnl["long"] + pnl["shrt"]
+        rows3[3][f"pnl{window}"] = pnl["totl"]
+    totl_max = max(totl, totl_max)
+    alert = False
+    if 0 < totl_max:
+        drawdown_percent = 100 * (totl_max - totl) / totl_max
+        rows3[3]["drawdown_percent"] = drawdown_percent
+        alert = drawdown_percent_threshold <= drawdown_percent
+    for pos in sorted(positions, key=lambda x: x.unrealized_profit, reverse=True):
+        ps = pos.notional < 0
+        f_ps = markdown_color("空", "red") if ps else markdown_color("多", "green")
+        symbol = pos.symbol
+        f_symbol = format_symbol(symbol)
+        notional = abs(pos.notional)
+        notional_percent = 100 * notional / lort if 0 < lort else 0.0
+        unrealized_profit = pos.unrealized_profit
+        position_amt = abs(pos.position_amt)
+        entry_price = pos.entry_price
+        mark_price = pos.mark_price
+        margin = pos.initial_margin
+        unrealized_profit_percent = 100 * unrealized_profit / margin if 0 < margin else 0.0
+        row = {"position": f"{f_ps} {f_symbol}"}
+        (rows2 if ps else rows1).append(row)
+        row["notional"] = notional
+        row["notional_percent"] = notional_percent
+        row["unrealized_profit"] = unrealized_profit
+        row["unrealized_profit_percent"] = unrealized_profit_percent
+        row["position_amt"] = position_amt
+        row["entry_price"] = entry_price
+        row["mark_price"] = mark_price
+        for window, change_percent in changes.get((symbol, pos.position_side), {}).items():
+            row[f"change{window}_percent"] = change_percent
+    return {
+        "rows1": rows1,
+        "rows2": rows2,
+        "rows3": rows3,
+        "totl_max": totl_max,
+        "alert": alert,
+        "table1": json.dumps(rows1),
+        "table2": json.dumps(rows2),
+        "table3": json.dumps(rows3),
+    }
+
+
+def order_report(
+    orders: list[OrderTradeUpdate],
+    new_trade_times: dict[int, int],
+) -> tuple[list[dict[str, Any]], list[dict[str, Any]], list[int]]:
+    rows = []
+    csv_rows = []
+    done = []
+    for order in orders:
+        o = order.order
+        timestamp = o.trade_time
+        order_id = o.order_id
+        f_order_id = str(order_id)[:7]
+        side = o.side
+        f_side = markdown_color("买", "green") if "BUY" == side else markdown_color("卖", "red")
+        symbol = o.symbol
+        f_symbol = format_symbol(symbol)
+        price = o.price
+        quantity = o.quantity
+        notional = quantity * price
+        last_price = o.last_price
+        last_quantity = o.last_quantity
+        last_notional = last_quantity * last_price
+        realized_profit = o.realized_profit
+        filled_quantity = o.filled_quantity
+        filled_percent = 100 * filled_quantity / quantity if 0 < quantity else 0.0
+        slippage = last_price - price if "BUY" == side else price - last_price
+        slippage_percent = 100 * slippage / price if 0 < price else 0.0
+        commission = o.commission
+        commission_percent = 100 * commission / last_notional if 0 < last_notional else 0.0
+        if order_id in new_trade_times:
+            delay = timestamp - new_trade_times[order_id]
+            f_delay = format_milliseconds(delay)
+        else:
+            delay = None
+            f_delay = "--"
+        role = "MAKER" if o.is_maker else "TAKER"
+        task = o.execution_type
+        status = o.status
+        f_status = {"PARTIALLY_FILLED": "PARTIAL"}.get(status, status)
+        order_type = o.order_type
+        valid_type = o.time_in_force
+        if order_id in new_trade_times and "PARTIALLY_FILLED" != status:
+            del new_trade_times[order_id]
+            done.append(order_id)
+        row = {}
+        rows.append(row)
+        row["timestamp"] = timestamp
+        row["order_id"] = f_order_id
+        row["side"] = f_side
+        row["symbol"] = f_symbol
+        row["last_quantity"] = last_quantity
+        row["last_price"] = last_price
+        row["last_notional"] = last_notional
+        row["realized_profit"] = realized_profit
+        row["filled_percent"] = filled_percent
+        row["slippage_percent"] = slippage_percent
+        row["delay"] = f_delay
+        row["role"] = role
+        row["task"] = task
+        row["status"] = f_status
+        row["order_type"] = order_type
+        row["valid_type"] = valid_type
+        csv_row = {}
+        csv_rows.append(csv_row)
+        csv_row["timestamp"] = timestamp
+        csv_row["order_id"] = order_id
+        csv_row["side"] = side
+        csv_row["symbol"] = symbol
+        csv_row["quantity"] = quantity
+        csv_row["price"] = price
+        csv_row["notional"] = notional
+        csv_row["last_quantity"] = last_quantity
+        csv_row["last_price"] = last_price
+        csv_row["last_notional"] = last_notional
+        csv_row["realized_profit"] = realized_profit
+        csv_row["filled_quantity"] = filled_quantity
+        csv_row["filled_percent"] = filled_percent
+        csv_row["slippage"] = slippage
+        csv_row["slippage_percent"] = slippage_percent
+        csv_row["commission"] = commission
+        csv_row["commission_percent"] = commission_percent
+        csv_row["delay"] = delay
+        csv_row["role"] = role
+        csv_row["task"] = task
+        csv_row["status"] = status
+        csv_row["order_type"] = order_type
+        csv_row["valid_type"] = valid_type
+    return rows, csv_rows, done
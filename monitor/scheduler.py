@@ -0,0 +1,435 @@
+import asyncio
+import datetime
+import heapq
+import itertools
+import random
+import time
+from types import TracebackType
+from typing import Any, Awaitable, Callable, Self, Type
+from loguru import logger
+
+from .clock import *
+from .metrics import *
+from .utils import *
+
+__all__ = [
+    "Schedule",
+    "Every",
+    "Cron",
+    "parse_schedule",
+    "Job",
+    "Scheduler",
+]
+
+JOB_SECONDS = Histogram(
+    "monitor_job_seconds",
+    "Execution time of one scheduled job run.",
+    ("job",),
+)
+JOB_LAG_SECONDS = Histogram(
+    "monitor_job_lag_seconds",
+    "Delay between a job's due time and the start of its run.",
+    ("job",),
+)
+JOB_MISSED = Counter(
+    "monitor_job_missed_total",
+    "Scheduled ticks not run, by reason.",
+    ("job", "reason"),
+)
+JOB_FAILURES = Counter(
+    "monitor_job_failures_total",
+    "Scheduled job runs that raised.",
+    ("job",),
+)
+
+_GOLDEN = 0.6180339887498949
+_CRON_ALIASES = {
+    "@yearly": "0 0 1 1 *",
+    "@annually": "0 0 1 1 *",
+    "@monthly": "0 0 1 * *",
+    "@weekly": "0 0 * * 0",
+    "@daily": "0 0 * * *",
+    "@midnight": "0 0 * * *",
+    "@hourly": "0 * * * *",
+    "@minutely": "* * * * *",
+}
+_CRON_RANGES = (
+    (0, 59),
+    (0, 59),
+    (0, 23),
+    (1, 31),
+    (1, 12),
+    (0, 7),
+)
+
+
+class Schedule:
+
+    def next(
+        self,
+        t: int,
+    ) -> int:
+        raise NotImplementedError
+
+
+class Every(Schedule):
+
+    def __init__(
+        self,
+        interval: int,
+        *,
+        offset: int = 0,
+    ) -> None:
+        if interval <= 0:
+            raise ValueError(f"invalid interval {interval}")
+        self.interval = interval
+        self.offset = offset % interval
+
+    def next(
+        self,
+        t: int,
+    ) -> int:
+        return (t - self.offset) // self.interval * self.interval + self.interval + self.offset
+
+    def __repr__(
+        self,
+    ) -> str:
+        return f"{type(self).__name__}({format_milliseconds(self.interval)})"
+
+
+class Cron(Schedule):
+
+    def __init__(
+        self,
+        spec: str,
+    ) -> None:
+        self.spec = spec
+        fields = _CRON_ALIASES.get(spec.strip(), spec).split()
+        if 5 == len(fields):
+            fields.insert(0, "0")
+        if 6 != len(fields):
+            raise ValueError(f"invalid cron spec {repr(spec)}")
+        sets = [self._parse(field, lo, hi, spec) for field, (lo, hi) in zip(fields, _CRON_RANGES)]
+        self._seconds, self._minutes, self._hours, self._days, self._months, weekdays = sets
+        self._weekdays = {x % 7 for x in weekdays}
+        self._any_day = "*" == fields[3]
+        self._any_weekday = "*" == fields[5]
+
+    @staticmethod
+    def _parse(
+        field: str,
+        lo: int,
+        hi: int,
+        spec: str,
+    ) -> list[int]:
+        values = set()
+        for part in field.split(","):
+            body, _, step = part.partition("/")
+            try:
+                step = int(step) if step else 1
+                if "*" == body:
+                    a, b = lo, hi
+                elif "-" in body:
+                    a, b = map(int, body.split("-"))
+                else:
+                    a = b = int(body)
+                    if step != 1:
+                        b = hi
+            except ValueError:
+                raise ValueError(f"invalid cron field {repr(field)} in {repr(spec)}") from None
+            if not (lo <= a <= b <= hi and 0 < step):
+                raise ValueError(f"invalid cron field {repr(field)} in {repr(spec)}")
+            values.update(range(a, b + 1, step))
+        return sorted(values)
+
+    def _day(
+        self,
+        d: datetime.datetime,
+    ) -> bool:
+        day = d.day in self._days
+        weekday = (d.weekday() + 1) % 7 in self._weekdays
+        if self._any_day or self._any_weekday:
+            return day and weekday
+        return day or weekday
+
+    def next(
+        self,
+        t: int,
+    ) -> int:
+        d = datetime.datetime.fromtimestamp(t // 1000).replace(microsecond=0) + datetime.timedelta(seconds=1)
+        for _ in range(5000):
+            if d.month not in self._months:
+                d = (d.replace(day=1, hour=0, minute=0, second=0) + datetime.timedelta(days=32)).replace(day=1)
+                continue
+            if not self._day(d):
+                d = d.replace(hour=0, minute=0, second=0) + datetime.timedelta(days=1)
+                continue
+            if d.hour not in self._hours:
+                d = d.replace(minute=0, second=0) + datetime.timedelta(hours=1)
+                continue
+            if d.minute not in self._minutes:
+                d = d.replace(second=0) + datetime.timedelta(minutes=1)
+                continue
+            if d.second not in self._seconds:
+                d += datetime.timedelta(seconds=1)
+                continue
+            return int(1000 * d.timestamp())
+        raise ValueError(f"cron spec {repr(self.spec)} never fires")
+
+    def __repr__(
+        self,
+    ) -> str:
+        return f"{type(self).__name__}({repr(self.spec)})"
+
+
+def parse_schedule(
+    spec: str | float | Schedule,
+) -> Schedule:
+    if isinstance(spec, Schedule):
+        return spec
+    if isinstance(spec, (int, float)):
+        return Every(round(1000 * spec))
+    spec = spec.strip()
+    if spec.startswith("@every "):
+        return Every(parse_interval(spec[7:]))
+    if spec in _CRON_ALIASES or 5 <= len(spec.split()):
+        return Cron(spec)
+    return Every(parse_interval(spec))
+
+
+class Job:
+
+    def __init__(
+        self,
+        name: str,
+        callback: Callable[[], Awaitable[Any]],
+        schedule: str | float | Schedule,
+        *,
+        jitter: float | None = None,
+        stagger: float | None = None,
+        misfire: str | None = None,
+        grace: float | None = None,
+        overlap: bool = False,
+        immediate: bool = False,
+    ) -> None:
+        if misfire not in (None, "skip", "coalesce", "catch_up"):
+            raise ValueError(f"invalid misfire policy {repr(misfire)}")
+        self.name = name
+        self.callback = callback
+        self.schedule = parse_schedule(schedule)
+        self.jitter = jitter
+        self.stagger = stagger
+        self.misfire = misfire
+        self.grace = grace
+        self.overlap = overlap
+        self.immediate = immediate
+        self.offset = 0
+        self.tick = None
+        self.last = None
+        self.due = None
+        self._tasks = set()
+
+    def __repr__(
+        self,
+    ) -> str:
+        return f"{type(self).__name__}({repr(self.name)}, {repr(self.schedule)})"
+
+    @property
+    def busy(
+        self,
+    ) -> bool:
+        return 0 < len(self._tasks)
+
+
+class Scheduler:
+
+    def __init__(
+        self,
+        *,
+        clock: Clock | None = None,
+        jitter: float = 0.0,
+        stagger: float = 0.0,
+        misfire: str = "coalesce",
+        grace: float = 1.0,
+    ) -> None:
+        self._clock = REAL_CLOCK if clock is None else clock
+        self._jitter = jitter
+        self._stagger = stagger
+        self._misfire = misfire
+        self._grace = grace
+        self._heap = []
+        self._seq = itertools.count()
+        self._jobs = set()
+        self._slots = {}
+        self._changed = asyncio.Event()
+        self._task = None
+
+    async def __aenter__(
+        self,
+    ) -> Self:
+        await self.start()
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: Type[BaseException] | None,
+        exc_value: BaseException | None,
+        exc_traceback: TracebackType | None,
+    ) -> None:
+        await self.stop()
+
+    async def start(
+        self,
+    ) -> None:
+        logger.info(f"{self} starting")
+        if self.running:
+            logger.warning(f"{self} has started")
+            return
+        self._task = asyncio.create_task(self._engine())
+        logger.info(f"{self} started")
+
+    async def stop(
+        self,
+    ) -> None:
+        logger.info(f"{self} stopping")
+        if not self.running:
+            logger.warning(f"{self} has stopped")
+            return
+        self._task.cancel()
+        self._task = None
+        for job in list(self._jobs):
+            self.remove(job)
+        logger.info(f"{self} stopped")
+
+    @property
+    def running(
+        self,
+    ) -> bool:
+        return not (self._task is None or self._task.cancelled() or self._task.done())
+
+    @property
+    def jobs(
+        self,
+    ) -> list[Job]:
+        return sorted(self._jobs, key=lambda x: x.name)
+
+    def add(
+        self,
+        job: Job,
+    ) -> Job:
+        if job in self._jobs:
+            raise ValueError(f"{job} already scheduled")
+        now = self._clock.time_ms()
+        stagger = self._stagger if job.stagger is None else job.stagger
+        if 0 < stagger:
+            key = repr(job.schedule)
+            slot = self._slots.get(key, 0)
+            self._slots[key] = slot + 1
+            tick = job.schedule.next(now)
+            window = min(1000 * stagger, job.schedule.next(tick) - tick)
+            job.offset = int(window * (slot * _GOLDEN % 1.0))
+        job.tick = now if job.immediate else job.schedule.next(now)
+        self._jobs.add(job)
+        self._push(job, job.tick if job.immediate else self._due(job, job.tick))
+        return job
+
+    def remove(
+        self,
+        job: Job,
+    ) -> None:
+        if job not in self._jobs:
+            return
+        self._jobs.discard(job)
+        for task in list(job._tasks):
+            task.cancel()
+        self._changed.set()
+
+    def _due(
+        self,
+        job: Job,
+        tick: int,
+    ) -> int:
+        jitter = self._jitter if job.jitter is None else job.jitter
+        return tick + job.offset + (int(1000 * random.uniform(0.0, jitter)) if 0 < jitter else 0)
+
+    def _push(
+        self,
+        job: Job,
+        due: int,
+    ) -> None:
+        job.due = due
+        heapq.heappush(self._heap, (due, next(self._seq), job))
+        self._changed.set()
+
+    async def _engine(
+        self,
+    ) -> None:
+        heap = self._heap
+        while True:
+            self._changed.clear()
+            self._fire()
+            waiters = [asyncio.create_task(self._changed.wait())]
+            if 0 < len(heap):
+                delay = max(0, heap[0][0] - self._clock.time_ms()) / 1000
+                waiters.append(asyncio.create_task(self._clock.sleep(delay)))
+            try:
+                await asyncio.wait(waiters, return_when=asyncio.FIRST_COMPLETED)
+            finally:
+                for waiter in waiters:
+                    waiter.cancel()
+
+    def _fire(
+        self,
+    ) -> None:
+        heap = self._heap
+        now = self._clock.time_ms()
+        while 0 < len(heap) and heap[0][0] <= now:
+            due, _, job = heapq.heappop(heap)
+            if job not in self._jobs or due != job.due:
+                continue
+            misfire = self._misfire if job.misfire is None else job.misfire
+            grace = self._grace if job.grace is None else job.grace
+            ticks = [job.tick]
+            tick = job.schedule.next(job.tick)
+            while self._due(job, tick) <= now:
+                ticks.append(tick)
+                tick = job.schedule.next(tick)
+            job.last = ticks[-1]
+            job.tick = tick
+            self._push(job, self._due(job, tick))
+            late = 1000 * grace < now - due
+            if "catch_up" == misfire:
+                runs = len(ticks)
+            elif "skip" == misfire and late:
+                runs = 0
+            else:
+                runs = 1
+            if runs < len(ticks):
+                JOB_MISSED.inc(len(ticks) - runs, job=job.name, reason="late")
+                logger.warning(f"{self} {job.name} missed {len(ticks) - runs} ticks, {now - due}ms late")
+            if 0 == runs:
+                continue
+            if job.busy and not job.overlap:
+                JOB_MISSED.inc(runs, job=job.name, reason="overlap")
+                logger.warning(f"{self} {job.name} still running, skipping {runs} ticks")
+                continue
+            task = asyncio.create_task(self._run(job, due, runs))
+            job._tasks.add(task)
+            task.add_done_callback(job._tasks.discard)
+
+    async def _run(
+        self,
+        job: Job,
+        due: int,
+        runs: int = 1,
+    ) -> None:
+        JOB_LAG_SECONDS.observe(max(0, self._clock.time_ms() - due) / 1000, job=job.name)
+        for _ in range(runs):
+            t0 = time.perf_counter()
+            try:
+                await job.callback()
+            except Exception as e:
+                JOB_FAILURES.inc(job=job.name)
+                logger.error(f"{self} {job.name} {repr(e)}")
+            finally:
+                JOB_SECONDS.observe(time.perf_counter() - t0, job=job.name)
@@ -0,0 +1,308 @@
+from __future__ import annotations
+
+from multiprocessing.shared_memory import SharedMemory
+from types import TracebackType
+from typing import Any, Self, Type
+from loguru import logger
+
+from .codec import *
+from .lazy import *
+from .records import *
+from .streams import *
+
+np = lazy_import("numpy")
+
+__all__ = [
+    "SymbolTable",
+    "MarketRing",
+    "MarketPublisher",
+]
+
+_MAGIC = 0x4D4B5452494E4702
+_HEADER = 8
+_SYMBOL_DTYPE = "S32"
+_SYMBOL_SIZE = 32
+
+
+class SymbolTable:
+
+    def __init__(
+        self,
+        capacity: int = 1024,
+        *,
+        names: np.ndarray | None = None,
+        count: np.ndarray | None = None,
+    ) -> None:
+        self._names = np.zeros(capacity, dtype=_SYMBOL_DTYPE) if names is None else names
+        self._count = np.zeros(1, dtype=np.int64) if count is None else count
+        self._index = {}
+        self._cache = []
+
+    @property
+    def capacity(
+        self,
+    ) -> int:
+        return len(self._names)
+
+    def __len__(
+        self,
+    ) -> int:
+        return int(self._count[0])
+
+    def index(
+        self,
+        symbol: str,
+    ) -> int:
+        i = self._index.get(symbol)
+        if i is not None:
+            return i
+        i = int(self._count[0])
+        if self.capacity <= i:
+            raise IndexError(f"symbol table full ({self.capacity}), dropping {repr(symbol)}")
+        self._names[i] = symbol.encode("ascii")
+        self._index[symbol] = i
+        self._count[0] = i + 1
+        return i
+
+    def get(
+        self,
+        symbol: str,
+    ) -> int | None:
+        index = self._index
+        i = index.get(symbol)
+        if i is None and len(index) < len(self):
+            for j in range(len(index), len(self)):
+                index.setdefault(self.symbol(j), j)
+            i = index.get(symbol)
+        return i
+
+    def detach(
+        self,
+    ) -> None:
+        n = len(self)
+        self._names = self._names.copy()
+        self._count = np.array([n], dtype=np.int64)
+
+    def symbol(
+        self,
+        i: int,
+    ) -> str:
+        cache = self._cache
+        if len(cache) <= i:
+            cache.extend(x.decode("ascii") for x in self._names[len(cache) : len(self)])
+        return cache[i]
+
+
+class MarketRing:
+
+    def __init__(
+        self,
+        shm: SharedMemory,
+        *,
+        owner: bool = False,
+    ) -> None:
+        self._shm = shm
+        self._owner = owner
+        buf = shm.buf
+        self._header = header = np.ndarray(_HEADER, dtype=np.int64, buffer=buf)
+        if _MAGIC != header[0]:
+            raise ValueError(f"{shm.name} is not a market ring")
+        capacity, slots = int(header[3]), int(header[4])
+        offset = _HEADER * 8
+        names = np.ndarray(capacity, dtype=_SYMBOL_DTYPE, buffer=buf, offset=offset)
+        offset += capacity * _SYMBOL_SIZE
+        self._times = np.ndarray(slots, dtype=np.int64, buffer=buf, offset=offset)
+        offset += slots * 8
+        self._prices = np.ndarray((slots, capacity), dtype=np.float64, buffer=buf, offset=offset)
+        offset += slots * capacity * 8
+        self._rates = np.ndarray((slots, capacity), dtype=np.float64, buffer=buf, offset=offset)
+        offset += slots * capacity * 8
+        self._nexts = np.ndarray((slots, capacity), dtype=np.int64, buffer=buf, offset=offset)
+        self.symbols = SymbolTable(names=names, count=header[2:3])
+
+    @classmethod
+    def create(
+        cls,
+        name: str,
+        *,
+        capacity: int = 1024,
+        slots: int = 256,
+    ) -> Self:
+        size = _HEADER * 8 + capacity * _SYMBOL_SIZE + slots * 8 + 3 * slots * capacity * 8
+        try:
+            stale = SharedMemory(name)
+        except FileNotFoundError:
+            pass
+        else:
+            stale.close()
+            stale.unlink()
+        shm = SharedMemory(name, create=True, size=size)
+        header = np.ndarray(_HEADER, dtype=np.int64, buffer=shm.buf)
+        header[:] = 0
+        header[3] = capacity
+        header[4] = slots
+        header[0] = _MAGIC
+        return cls(shm, owner=True)
+
+    @classmethod
+    def attach(
+        cls,
+        name: str,
+    ) -> Self:
+        return cls(SharedMemory(name))
+
+    def close(
+        self,
+    ) -> None:
+        if self.symbols is None:
+            return
+        self.symbols.detach()
+        self._header = self._times = self._prices = self._rates = self._nexts = self.symbols = None
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
+
+    @property
+    def name(
+        self,
+    ) -> str:
+        return self._shm.name
+
+    @property
+    def capacity(
+        self,
+    ) -> int:
+        return self._prices.shape[1]
+
+    @property
+    def slots(
+        self,
+    ) -> int:
+        return self._prices.shape[0]
+
+    @property
+    def seq(
+        self,
+    ) -> int:
+        return int(self._header[1])
+
+    def publish(
+        self,
+        t: int,
+        data: list[MarkPrice],
+    ) -> int:
+        seq = int(self._header[1]) + 1
+        slot = seq % self.slots
+        row = self._prices[slot]
+        row.fill(np.nan)
+        rates = self._rates[slot]
+        rates.fill(np.nan)
+        nexts = self._nexts[slot]
+        nexts.fill(0)
+        symbols = self.symbols
+        for x in data:
+            try:
+                i = symbols.index(x.symbol)
+            except IndexError:
+                continue
+            row[i] = x.mark_price
+            if "" != x.funding_rate:
+                rates[i] = float(x.funding_rate)
+                nexts[i] = x.next_funding_time
+        self._times[slot] = t
+        self._header[1] = seq
+        return seq
+
+    def read(
+        self,
+        seq: int,
+        out: np.ndarray | None = None,
+        *,
+        rates: np.ndarray | None = None,
+        nexts: np.ndarray | None = None,
+    ) -> int | None:
+        slots = self.slots
+        if not (0 < seq <= self.seq):
+            return None
+        slot = seq % slots
+        if out is not None:
+            np.copyto(out, self._prices[slot])
+        if rates is not None:
+            np.copyto(rates, self._rates[slot])
+        if nexts is not None:
+            np.copyto(nexts, self._nexts[slot])
+        t = int(self._times[slot])
+        if seq + slots - 1 <= self.seq:
+            return None
+        return t
+
+
+class MarketPublisher:
+
+    def __init__(
+        self,
+        hub: StreamHub,
+        name: str,
+        *,
+        speed: int = 1,
+        capacity: int = 1024,
+        slots: int = 256,
+    ) -> None:
+        self._hub = hub
+        self._name = name
+        self._stream = f"!markPrice@arr@{speed}s" if 1 == speed else "!markPrice@arr"
+        self._capacity = capacity
+        self._slots = slots
+        self._ring = None
+
+    async def __aenter__(
+        self,
+    ) -> Self:
+        await self.start()
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: Type[BaseException] | None,
+        exc_value: BaseException | None,
+        exc_traceback: TracebackType | None,
+    ) -> None:
+        await self.stop()
+
+    async def start(
+        self,
+    ) -> None:
+        logger.info(f"{self} starting")
+        if self.running:
+            logger.warning(f"{self} has started")
+            return
+        self._ring = MarketRing.create(self._name, capacity=self._capacity, slots=self._slots)
+        self._hub.subscribe(self._stream, decode_mark_prices, self.on_mark_prices)
+        logger.info(f"{self} started {self._name}")
+
+    async def stop(
+        self,
+    ) -> None:
+        logger.info(f"{self} stopping")
+        if not self.running:
+            logger.warning(f"{self} has stopped")
+            return
+        self._hub.unsubscribe(self._stream, self.on_mark_prices)
+        self._ring.close()
+        self._ring = None
+        logger.info(f"{self} stopped")
+
+    @property
+    def running(
+        self,
+    ) -> bool:
+        return self._ring is not None
+
+    def on_mark_prices(
+        self,
+        data: list[MarkPrice] | Any,
+        t: int,
+    ) -> None:
+        if not isinstance(data, list) or 0 == len(data):
+            return
+        self._ring.publish(data[0].event_time, data)
@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import math
+
+from .lazy import *
+from .records import *
+from .shm import *
+
+np = lazy_import("numpy")
+
+__all__ = [
+    "SpreadBook",
+]
+
+
+class SpreadBook:
+
+    def __init__(
+        self,
+        capacity: int = 1024,
+        *,
+        sample: int = 100,
+        halflife: int = 1000 * 60 * 5,
+        warmup: int = 100,
+    ) -> None:
+        self._sample = sample
+        self._tau = halflife / math.log(2)
+        self._warmup = warmup
+        self.symbols = SymbolTable(capacity)
+        self.bids = np.full(capacity, np.nan)
+        self.asks = np.full(capacity, np.nan)
+        self.depths = np.full(capacity, np.nan)
+        self.spreads = np.full(capacity, np.nan)
+        self.times = np.full(capacity, -sample, dtype=np.int64)
+        self.means = np.zeros(capacity)
+        self.variances = np.zeros(capacity)
+        self.counts = np.zeros(capacity, dtype=np.int64)
+        self.sampled = 0
+        self.dropped = 0
+
+    def update(
+        self,
+        x: BookTicker,
+        t: int,
+    ) -> bool:
+        try:
+            i = self.symbols.index(x.symbol)
+        except IndexError:
+            self.dropped += 1
+            return False
+        dt = t - int(self.times[i])
+        if dt < self._sample:
+            self.dropped += 1
+            return False
+        self.sampled += 1
+        bid = x.bid_price
+        ask = x.ask_price
+        mid = 0.5 * (bid + ask)
+        if not 0 < mid:
+            return False
+        spread = 10_000 * (ask - bid) / mid
+        self.bids[i] = bid
+        self.asks[i] = ask
+        self.depths[i] = bid * x.bid_quantity + ask * x.ask_quantity
+        self.spreads[i] = spread
+        self.times[i] = t
+        count = int(self.counts[i])
+        if 0 == count:
+            self.means[i] = spread
+        else:
+            alpha = -math.expm1(-dt / self._tau)
+            mean = float(self.means[i])
+            diff = spread - mean
+            self.means[i] = mean + alpha * diff
+            self.variances[i] = (1.0 - alpha) * (float(self.variances[i]) + alpha * diff * diff)
+        self.counts[i] = count + 1
+        return True
+
+    def zscores(
+        self,
+    ) -> np.ndarray:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            z = (self.spreads - self.means) / np.sqrt(self.variances)
+        z[self.counts < self._warmup] = np.nan
+        return z
@@ -0,0 +1,174 @@
+import asyncio
+import json
+import pathlib
+from types import TracebackType
+from typing import Any, Self, Type
+from loguru import logger
+
+from .utils import write_atomic
+
+__all__ = [
+    "StateNamespace",
+    "StateStore",
+]
+
+
+class StateNamespace:
+
+    def __init__(
+        self,
+        store: "StateStore",
+        name: str,
+    ) -> None:
+        self._store = store
+        self._name = name
+
+    @property
+    def name(
+        self,
+    ) -> str:
+        return self._name
+
+    def __contains__(
+        self,
+        key: str,
+    ) -> bool:
+        return key in self._store._data.get(self._name, {})
+
+    def get(
+        self,
+        key: str,
+        default: Any = None,
+    ) -> Any:
+        return self._store._data.get(self._name, {}).get(key, default)
+
+    def set(
+        self,
+        key: str,
+        value: Any,
+    ) -> None:
+        data = self._store._data.setdefault(self._name, {})
+        if key in data and data[key] == value:
+            return
+        data[key] = value
+        self._store._dirty = True
+
+    def pop(
+        self,
+        key: str,
+        default: Any = None,
+    ) -> Any:
+        data = self._store._data.get(self._name, {})
+        if key not in data:
+            return default
+        self._store._dirty = True
+        return data.pop(key)
+
+    async def checkpoint(
+        self,
+    ) -> None:
+        await self._store.checkpoint()
+
+
+class StateStore:
+
+    def __init__(
+        self,
+        path: pathlib.Path | None = None,
+        *,
+        interval: float = 60.0,
+    ) -> None:
+        self._path = path
+        self._interval = interval
+        self._data: dict[str, dict[str, Any]] = {}
+        self._dirty = False
+        self._lock = asyncio.Lock()
+        self._task = None
+        if path is not None and path.is_file():
+            logger.info(f"{self} loading {repr(path)}")
+            with open(path, mode="r", encoding="utf-8") as f:
+                data = json.load(f)
+            self._data.update((k, v) for k, v in data.items() if isinstance(v, dict))
+
+    async def __aenter__(
+        self,
+    ) -> Self:
+        await self.start()
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: Type[BaseException] | None,
+        exc_value: BaseException | None,
+        exc_traceback: TracebackType | None,
+    ) -> None:
+        await self.stop()
+
+    async def _engine(
+        self,
+    ) -> None:
+        delay = self._interval
+        while True:
+            await asyncio.sleep(delay)
+            try:
+                await self.checkpoint()
+            except Exception as e:
+                logger.error(repr(e))
+
+    async def start(
+        self,
+    ) -> None:
+        logger.info(f"{self} starting")
+        if self.running:
+            logger.warning(f"{self} has started")
+            return
+        self._task = asyncio.create_task(self._engine())
+        logger.info(f"{self} started")
+
+    async def stop(
+        self,
+    ) -> None:
+        logger.info(f"{self} stopping")
+        if not self.running:
+            logger.warning(f"{self} has stopped")
+            return
+        self._task.cancel()
+        self._task = None
+        await self.checkpoint()
+        logger.info(f"{self} stopped")
+
+    @property
+    def running(
+        self,
+    ) -> bool:
+        return not (self._task is None or self._task.cancelled() or self._task.done())
+
+    @property
+    def dirty(
+        self,
+    ) -> bool:
+        return self._dirty
+
+    def namespace(
+        self,
+        *parts: str,
+    ) -> StateNamespace:
+        return StateNamespace(self, "/".join(parts))
+
+    async def checkpoint(
+        self,
+    ) -> None:
+        if self._path is None:
+            self._dirty = False
+            return
+        async with self._lock:
+            if not self._dirty:
+                return
+            s = json.dumps(self._data)
+            self._dirty = False
+            logger.info(f"checkpoint({repr(self._path)}, {s[:64]})")
+            try:
+                await asyncio.to_thread(write_atomic, self._path, s)
+            except Exception:
+                self._dirty = True
+                raise
@@ -0,0 +1,496 @@
+from __future__ import annotations
+
+import asyncio
+import collections
+import functools
+import pathlib
+import random
+import threading
+import time
+from types import TracebackType
+from typing import TYPE_CHECKING, Any, Callable, Self, Type
+from loguru import logger
+
+from .clock import *
+from .codec import *
+from .metrics import *
+from .recorder import *
+
+if TYPE_CHECKING:
+    from binance.websocket.binance_socket_manager import BinanceSocketManager
+    from binance.websocket.um_futures.websocket_client import UMFuturesWebsocketClient
+
+__all__ = [
+    "StreamHub",
+]
+
+FRAMES = Counter(
+    "monitor_frames_total",
+    "Websocket frames received per stream.",
+    ("stream",),
+)
+DECODE_SECONDS = Histogram(
+    "monitor_decode_seconds",
+    "Time spent decoding a websocket frame, once per frame for all subscribers.",
+    ("stream",),
+)
+DECODE_ERRORS = Counter(
+    "monitor_decode_errors_total",
+    "Websocket frames that failed to decode.",
+    ("stream",),
+)
+STREAM_RATE = Gauge(
+    "monitor_stream_messages_per_second",
+    "Websocket frames per second per stream label, over the last rate interval.",
+    ("stream",),
+)
+CONNECTIONS = Gauge(
+    "monitor_stream_connections",
+    "Open websocket connections per hub.",
+    ("hub",),
+)
+RECONNECTS = Counter(
+    "monitor_stream_reconnects_total",
+    "Websocket connections lost or failed to open, per hub.",
+    ("hub",),
+)
+
+
+class _Connection:
+
+    def __init__(
+        self,
+        index: int,
+    ) -> None:
+        self.index = index
+        self.client: UMFuturesWebsocketClient | None = None
+        self.streams = set()
+        self.subscribing = set()
+        self.unsubscribing = set()
+        self.sent = collections.deque()
+        self.attempt = 0
+        self.task = None
+        self.connecting = False
+        self.closing = False
+
+    def __repr__(
+        self,
+    ) -> str:
+        return f"{type(self).__name__}({self.index}, {len(self.streams)} streams)"
+
+
+class StreamHub:
+
+    def __init__(
+        self,
+        *,
+        proxies: dict[str, str] | None = None,
+        record: str | None = None,
+        clock: Clock | None = None,
+        name: str = "stream",
+        max_streams: int = 200,
+        max_messages: int = 10,
+        reconnect_delay: float = 1.0,
+        reconnect_delay_max: float = 60.0,
+        rate_interval: float = 10.0,
+    ) -> None:
+        self._proxies = proxies
+        self._clock = REAL_CLOCK if clock is None else clock
+        self._name = name
+        self._recorder = None if record is None else StreamRecorder(pathlib.Path(record), name)
+        self._max_streams = max_streams
+        self._max_messages = max_messages
+        self._reconnect_delay = reconnect_delay
+        self._reconnect_delay_max = reconnect_delay_max
+        self._rate_interval = rate_interval
+        self._subscriptions = {}
+        self._added = set()
+        self._removed = set()
+        self._owners = {}
+        self._connections = []
+        self._seq = 0
+        self._lock = threading.Lock()
+        self._counts = {}
+        self._rates = {}
+        self._changed = asyncio.Event()
+        self._loop = None
+        self._task = None
+
+    async def __aenter__(
+        self,
+    ) -> Self:
+        await self.start()
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: Type[BaseException] | None,
+        exc_value: BaseException | None,
+        exc_traceback: TracebackType | None,
+    ) -> None:
+        await self.stop()
+
+    async def start(
+        self,
+    ) -> None:
+        logger.info(f"{self} starting")
+        if self.running:
+            logger.warning(f"{self} has started")
+            return
+        if self._recorder is not None:
+            await self._recorder.start()
+        self._loop = asyncio.get_running_loop()
+        self._added.update(self._subscriptions)
+        self._task = asyncio.create_task(self._engine())
+        logger.info(f"{self} started")
+
+    async def stop(
+        self,
+    ) -> None:
+        logger.info(f"{self} stopping")
+        if not self.running:
+            logger.warning(f"{self} has stopped")
+            return
+        self._task.cancel()
+        self._task = None
+        connections, self._connections = self._connections, []
+        self._owners.clear()
+        self._added.clear()
+        self._removed.clear()
+        await asyncio.gather(*(self._close(conn) for conn in connections))
+        CONNECTIONS.set(0, hub=self._name)
+        if self._recorder is not None:
+            await self._recorder.stop()
+        logger.info(f"{self} stopped")
+
+    @property
+    def running(
+        self,
+    ) -> bool:
+        return not (self._task is None or self._task.cancelled() or self._task.done())
+
+    @property
+    def streams(
+        self,
+    ) -> list[str]:
+        return list(self._subscriptions)
+
+    @property
+    def connections(
+        self,
+    ) -> list[list[str]]:
+        return [sorted(conn.streams) for conn in self._connections]
+
+    @property
+    def rates(
+        self,
+    ) -> dict[str, float]:
+        return dict(self._rates)
+
+    def subscribe(
+        self,
+        stream: str,
+        decode: Callable[[Any], Any],
+        callback: Callable[[Any, int], None],
+        *,
+        label: str | None = None,
+    ) -> None:
+        sub = self._subscriptions.get(stream)
+        if sub is None:
+            self._subscriptions[stream] = sub = (stream if label is None else label, decode, [])
+            self._removed.discard(stream)
+            self._added.add(stream)
+            self._changed.set()
+        sub[2].append(callback)
+
+    def unsubscribe(
+        self,
+        stream: str,
+        callback: Callable[[Any, int], None],
+    ) -> None:
+        sub = self._subscriptions.get(stream)
+        if sub is None or callback not in sub[2]:
+            return
+        sub[2].remove(callback)
+        if 0 < len(sub[2]):
+            return
+        del self._subscriptions[stream]
+        self._added.discard(stream)
+        self._removed.add(stream)
+        self._changed.set()
+
+    async def _engine(
+        self,
+    ) -> None:
+        t0 = time.monotonic()
+        while True:
+            self._changed.clear()
+            try:
+                await self._sync()
+            except Exception as e:
+                logger.error(f"{self} {repr(e)}")
+            t1 = time.monotonic()
+            if self._rate_interval <= t1 - t0:
+                self._measure(t1 - t0)
+                t0 = t1
+            try:
+                await asyncio.wait_for(self._changed.wait(), 1.0)
+            except TimeoutError:
+                pass
+
+    def _measure(
+        self,
+        elapsed: float,
+    ) -> None:
+        with self._lock:
+            counts, self._counts = self._counts, {}
+        self._rates = {stream: count / elapsed for stream, count in counts.items()}
+        labels = dict.fromkeys((sub[0] for sub in self._subscriptions.values()), 0.0)
+        for stream, rate in self._rates.items():
+            sub = self._subscriptions.get(stream)
+            if sub is not None:
+                labels[sub[0]] += rate
+        for label, rate in labels.items():
+            STREAM_RATE.set(rate, stream=label)
+
+    def _assign(
+        self,
+        stream: str,
+    ) -> _Connection:
+        key = stream.partition("@")[0]
+        best = None
+        for conn in self._connections:
+            if conn.closing or self._max_streams <= len(conn.streams):
+                continue
+            if any(key == x.partition("@")[0] for x in conn.streams):
+                return conn
+            if best is None or len(conn.streams) < len(best.streams):
+                best = conn
+        if best is None:
+            self._seq += 1
+            best = _Connection(self._seq)
+            self._connections.append(best)
+            CONNECTIONS.set(len(self._connections), hub=self._name)
+        return best
+
+    async def _sync(
+        self,
+    ) -> None:
+        removed, self._removed = self._removed, set()
+        for stream in removed:
+            conn = self._owners.pop(stream, None)
+            if conn is None:
+                continue
+            conn.streams.discard(stream)
+            conn.subscribing.discard(stream)
+            conn.unsubscribing.add(stream)
+        added, self._added = self._added, set()
+        for stream in sorted(added):
+            if stream in self._owners:
+                continue
+            conn = self._assign(stream)
+            conn.streams.add(stream)
+            conn.unsubscribing.discard(stream)
+            conn.subscribing.add(stream)
+            self._owners[stream] = conn
+        for conn in list(self._connections):
+            if 0 == len(conn.streams):
+                self._connections.remove(conn)
+                CONNECTIONS.set(len(self._connections), hub=self._name)
+                await self._close(conn)
+            elif conn.client is None:
+                if conn.task is None:
+                    conn.task = asyncio.create_task(self._connect(conn))
+            else:
+                self._send(conn)
+
+    def _send(
+        self,
+        conn: _Connection,
+    ) -> None:
+        now = time.monotonic()
+        sent = conn.sent
+        while 0 < len(sent) and sent[0] <= now - 1.0:
+            sent.popleft()
+        for action, streams in ("unsubscribe", conn.unsubscribing), ("subscribe", conn.subscribing):
+            if 0 == len(streams):
+                continue
+            if self._max_messages <= len(sent):
+                return
+            batch = sorted(streams)
+            try:
+                getattr(conn.client, action)(batch)
+            except Exception as e:
+                logger.warning(f"{self} {conn} {action} {repr(e)}")
+                return
+            sent.append(now)
+            streams.clear()
+            logger.success(f"{action.upper()}: {batch}")
+
+    def _client(
+        self,
+        conn: _Connection,
+    ) -> UMFuturesWebsocketClient:
+        from binance.websocket.um_futures.websocket_client import UMFuturesWebsocketClient
+
+        return UMFuturesWebsocketClient(
+            on_message=functools.partial(self._on_frame, conn),
+            on_open=self.on_open,
+            on_close=functools.partial(self._on_lost, conn),
+            on_error=functools.partial(self._on_lost, conn),
+            on_ping=self.on_ping,
+            on_pong=self.on_pong,
+            is_combined=True,
+            proxies=self._proxies,
+        )
+
+    async def _connect(
+        self,
+        conn: _Connection,
+    ) -> None:
+        try:
+            while not conn.closing:
+                if 0 < conn.attempt:
+                    delay = min(self._reconnect_delay * 2 ** (conn.attempt - 1), self._reconnect_delay_max)
+                    delay *= random.uniform(0.5, 1.0)
+                    logger.warning(f"{self} {conn} reconnecting in {delay:.1f}s")
+                    await asyncio.sleep(delay)
+                conn.connecting = True
+                try:
+                    client = await asyncio.to_thread(self._client, conn)
+                except Exception as e:
+                    conn.attempt += 1
+                    RECONNECTS.inc(hub=self._name)
+                    logger.warning(f"{self} {conn} connect failed\n{repr(e)}")
+                    continue
+                finally:
+                    conn.connecting = False
+                if conn.closing:
+                    await asyncio.to_thread(client.stop)
+                    return
+                if not client.socket_manager.is_alive():
+                    conn.attempt += 1
+                    RECONNECTS.inc(hub=self._name)
+                    logger.warning(f"{self} {conn} connect lost")
+                    continue
+                conn.client = client
+                conn.sent.clear()
+                conn.unsubscribing.clear()
+                conn.subscribing = set(conn.streams)
+                self._send(conn)
+                return
+        finally:
+            conn.task = None
+
+    async def _close(
+        self,
+        conn: _Connection,
+    ) -> None:
+        conn.closing = True
+        task = conn.task
+        if task is not None:
+            if conn.connecting:
+                await asyncio.wait([task])
+            else:
+                task.cancel()
+        client, conn.client = conn.client, None
+        if client is None:
+            return
+        try:
+            await asyncio.to_thread(client.stop)
+        except Exception as e:
+            logger.warning(f"{self} {conn} close failed\n{repr(e)}")
+
+    def _lost(
+        self,
+        conn: _Connection,
+        socket_manager: BinanceSocketManager,
+    ) -> None:
+        client = conn.client
+        if conn.closing or client is None or client.socket_manager is not socket_manager:
+            return
+        conn.client = None
+        conn.attempt += 1
+        RECONNECTS.inc(hub=self._name)
+        try:
+            socket_manager.ws.close()
+        except Exception:
+            pass
+        self._changed.set()
+
+    def _on_lost(
+        self,
+        conn: _Connection,
+        socket_manager: BinanceSocketManager,
+        e: Exception | None = None,
+    ) -> None:
+        logger.warning(f"{self} {conn} lost\n{repr(e)}")
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._lost, conn, socket_manager)
+
+    def _on_frame(
+        self,
+        conn: _Connection,
+        socket_manager: BinanceSocketManager,
+        data: bytes | str,
+    ) -> None:
+        conn.attempt = 0
+        try:
+            self.on_message(socket_manager, data)
+        except Exception as e:
+            logger.error(f"{self} {conn} on_message\n{repr(e)}")
+
+    def on_message(
+        self,
+        socket_manager: BinanceSocketManager,
+        data: bytes | str,
+    ) -> None:
+        t = self._clock.time_ms()
+        if self._recorder is not None:
+            self._recorder.record(data, t)
+        try:
+            stream, payload = decode_envelope(data)
+        except DecodeError as e:
+            DECODE_ERRORS.inc(stream="")
+            logger.warning(f"on_message\n{repr(e)}\n{repr(data)}")
+            return
+        sub = self._subscriptions.get(stream)
+        if sub is None:
+            logger.info(f"on_message\n{repr(payload)}")
+            return
+        label, decode, callbacks = sub
+        with self._lock:
+            FRAMES.inc(stream=label)
+            counts = self._counts
+            counts[stream] = counts.get(stream, 0) + 1
+            try:
+                with DECODE_SECONDS.time(stream=label):
+                    records = decode(payload)
+            except DecodeError as e:
+                DECODE_ERRORS.inc(stream=label)
+                logger.warning(f"on_message\n{repr(e)}\n{repr(data)}")
+                return
+            for callback in tuple(callbacks):
+                try:
+                    callback(records, t)
+                except Exception as e:
+                    logger.error(f"on_message {label}\n{repr(e)}")
+
+    def on_open(
+        self,
+        socket_manager: BinanceSocketManager,
+    ) -> None:
+        logger.info(f"on_open")
+
+    def on_ping(
+        self,
+        socket_manager: BinanceSocketManager,
+        data: bytes | str,
+    ) -> None:
+        logger.debug(f"on_ping\n{repr(data)}")
+
+    def on_pong(
+        self,
+        socket_manager: BinanceSocketManager,
+    ) -> None:
+        logger.debug(f"on_pong")
@@ -0,0 +1,135 @@
+import asyncio
+import multiprocessing
+import time
+from types import TracebackType
+from typing import Any, Callable, Self, Type
+from loguru import logger
+
+from .metrics import *
+
+__all__ = [
+    "Supervisor",
+]
+
+SHARD_UP = Gauge(
+    "monitor_shard_up",
+    "Whether a supervised shard process is alive.",
+    ("shard",),
+)
+SHARD_RESTARTS = Counter(
+    "monitor_shard_restarts_total",
+    "Supervised shard processes restarted after exiting.",
+    ("shard",),
+)
+
+
+class Supervisor:
+
+    def __init__(
+        self,
+        target: Callable[[dict[str, Any]], None],
+        shards: dict[str, dict[str, Any]],
+        *,
+        restart_delay: float = 1.0,
+        restart_delay_max: float = 60.0,
+        healthy_after: float = 60.0,
+        stop_timeout: float = 30.0,
+        start_method: str = "spawn",
+    ) -> None:
+        self._target = target
+        self._shards = shards
+        self._restart_delay = restart_delay
+        self._restart_delay_max = restart_delay_max
+        self._healthy_after = healthy_after
+        self._stop_timeout = stop_timeout
+        self._ctx = multiprocessing.get_context(start_method)
+        self._processes = {}
+        self._tasks = []
+
+    async def __aenter__(
+        self,
+    ) -> Self:
+        await self.start()
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: Type[BaseException] | None,
+        exc_value: BaseException | None,
+        exc_traceback: TracebackType | None,
+    ) -> None:
+        await self.stop()
+
+    async def _watch(
+        self,
+        name: str,
+        config: dict[str, Any],
+    ) -> None:
+        delay = self._restart_delay
+        while True:
+            process = self._ctx.Process(target=self._target, args=(config,), name=f"shard-{name}")
+            process.start()
+            self._processes[name] = process
+            SHARD_UP.set(1, shard=name)
+            logger.info(f"{self} shard {name} started pid={process.pid}")
+            t0 = time.monotonic()
+            await asyncio.to_thread(process.join)
+            SHARD_UP.set(0, shard=name)
+            if self._healthy_after < time.monotonic() - t0:
+                delay = self._restart_delay
+            logger.error(f"{self} shard {name} exited {process.exitcode}, restarting in {delay:.1f}s")
+            SHARD_RESTARTS.inc(shard=name)
+            await asyncio.sleep(delay)
+            delay = min(2 * delay, self._restart_delay_max)
+
+    async def _terminate(
+        self,
+        name: str,
+        process: multiprocessing.Process,
+    ) -> None:
+        if not process.is_alive():
+            return
+        process.terminate()
+        await asyncio.to_thread(process.join, self._stop_timeout)
+        if process.is_alive():
+            logger.error(f"{self} shard {name} exceeded {self._stop_timeout}s, killing")
+            process.kill()
+            await asyncio.to_thread(process.join)
+        SHARD_UP.set(0, shard=name)
+        logger.info(f"{self} shard {name} stopped {process.exitcode}")
+
+    async def start(
+        self,
+    ) -> None:
+        logger.info(f"{self} starting")
+        if self.running:
+            logger.warning(f"{self} has started")
+            return
+        self._tasks = [asyncio.create_task(self._watch(name, config)) for name, config in self._shards.items()]
+        logger.info(f"{self} started {len(self._tasks)} shards")
+
+    async def stop(
+        self,
+    ) -> None:
+        logger.info(f"{self} stopping")
+        if not self.running:
+            logger.warning(f"{self} has stopped")
+            return
+        for task in self._tasks:
+            task.cancel()
+        self._tasks = []
+        await asyncio.gather(*(self._terminate(name, process) for name, process in self._processes.items()))
+        self._processes.clear()
+        logger.info(f"{self} stopped")
+
+    @property
+    def running(
+        self,
+    ) -> bool:
+        return any(not (task.cancelled() or task.done()) for task in self._tasks)
+
+    @property
+    def pids(
+        self,
+    ) -> dict[str, int | None]:
+        return {name: process.pid for name, process in self._processes.items()}
@@ -1,9 +1,12 @@
 import collections
 
+from .clock import *
+
 __all__ = [
     "TimewindowEmpty",
     "Timewindow",
     "SparseTimewindow",
+    "SumTimewindow",
 ]
 
 
@@ -16,8 +19,11 @@ class Timewindow[U]:
     def __init__(
         self,
         interval: int,
+        *,
+        clock: Clock | None = None,
     ) -> None:
         self._interval = interval
+        self._clock = REAL_CLOCK if clock is None else clock
         self._us = collections.deque()
         self._ts = collections.deque()
 
@@ -49,11 +55,24 @@ class Timewindow[U]:
     def push(
         self,
         u: U,
-        t: int,
+        t: int | None = None,
     ) -> None:
+        if t is None:
+            t = self._clock.time_ms()
         self._del(t)
         self._add(u, t)
 
+    def __len__(
+        self,
+    ) -> int:
+        return len(self._us)
+
+    def clear(
+        self,
+    ) -> None:
+        self._us.clear()
+        self._ts.clear()
+
     def empty(
         self,
     ) -> bool:
@@ -81,8 +100,9 @@ class SparseTimewindow[U](Timewindow):
         interval,
         *,
         unit: int = 0,
+        clock: Clock | None = None,
     ) -> None:
-        super().__init__(interval)
+        super().__init__(interval, clock=clock)
         self._unit = unit
 
     @property
@@ -94,8 +114,93 @@ class SparseTimewindow[U](Timewindow):
     def push(
         self,
         u: U,
-        t: int,
+        t: int | None = None,
     ) -> None:
+        if t is None:
+            t = self._clock.time_ms()
         if not self.empty() and t - self.tail()[1] < self._unit:
             return
         super().push(u, t)
+
+
+class SumTimewindow[K](Timewindow):
+
+    def __init__(
+        self,
+        interval,
+        *,
+        unit: int = 0,
+        clock: Clock | None = None,
+    ) -> None:
+        super().__init__(interval, clock=clock)
+        self._unit = unit
+        self._sums = {}
+        self._counts = {}
+
+    @property
+    def unit(
+        self,
+    ) -> int:
+        return self._unit
+
+    @property
+    def sums(
+        self,
+    ) -> dict[K, float]:
+        return self._sums
+
+    @property
+    def counts(
+        self,
+    ) -> dict[K, int]:
+        return self._counts
+
+    def _del(
+        self,
+        t: int,
+    ) -> None:
+        us = self._us
+        ts = self._ts
+        sums = self._sums
+        counts = self._counts
+        t -= self._interval
+        while 0 < len(ts) and ts[0] < t:
+            for key, (value, count) in us.popleft().items():
+                if count == counts[key]:
+                    del sums[key]
+                    del counts[key]
+                else:
+                    sums[key] -= value
+                    counts[key] -= count
+            ts.popleft()
+
+    def add(
+        self,
+        key: K,
+        value: float,
+        t: int | None = None,
+    ) -> None:
+        if t is None:
+            t = self._clock.time_ms()
+        self._del(t)
+        self._sums[key] = self._sums.get(key, 0.0) + value
+        self._counts[key] = self._counts.get(key, 0) + 1
+        if not self.empty() and t - self._ts[-1] < self._unit:
+            bucket = self._us[-1]
+            total, count = bucket.get(key, (0.0, 0))
+            bucket[key] = total + value, count + 1
+        else:
+            self._add({key: (value, 1)}, t)
+
+    def expire(
+        self,
+        t: int | None = None,
+    ) -> None:
+        self._del(self._clock.time_ms() if t is None else t)
+
+    def clear(
+        self,
+    ) -> None:
+        super().clear()
+        self._sums.clear()
+        self._counts.clear()
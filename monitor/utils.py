@@ -3,13 +3,17 @@ import asyncio
 import datetime
 import json
 import math
+import os
 import pathlib
-import requests
-import time
+import re
+import tempfile
 from typing import Any, Callable
 from binance.error import ClientError, ServerError
 from loguru import logger
 
+from .clock import REAL_CLOCK
+from .metrics import Counter, Histogram
+
 __all__ = [
     "format_symbol",
     "markdown_color",
@@ -22,6 +26,7 @@ __all__ = [
     "until_next_minute",
     "until_next_second",
     "restapi_wrapper",
+    "write_atomic",
     "json_load",
     "json_dump",
     "csv_append",
@@ -29,6 +34,23 @@ __all__ = [
 ]
 
 
+RESTAPI_SECONDS = Histogram(
+    "monitor_restapi_seconds",
+    "REST API call latency per endpoint, including failed tries.",
+    ("endpoint",),
+)
+RESTAPI_RETRIES = Counter(
+    "monitor_restapi_retries_total",
+    "Failed REST API tries per endpoint.",
+    ("endpoint",),
+)
+CSV_WRITE_SECONDS = Histogram(
+    "monitor_csv_write_seconds",
+    "CSV append latency per file.",
+    ("path",),
+)
+
+
 def format_symbol(
     symbol: str,
 ) -> str:
@@ -49,24 +71,68 @@ def markdown_color(
 
 
 def time_ms() -> int:
-    return int(1000 * time.time())
+    return REAL_CLOCK.time_ms()
+
+
+_INTERVAL_UNITS = {
+    "w": 1000 * 60 * 60 * 24 * 7,
+    "d": 1000 * 60 * 60 * 24,
+    "h": 1000 * 60 * 60,
+    "m": 1000 * 60,
+    "s": 1000,
+    "ms": 1,
+    "us": 0.001,
+}
+_INTERVAL_ALIASES = {
+    "week": "w",
+    "weeks": "w",
+    "day": "d",
+    "days": "d",
+    "hr": "h",
+    "hour": "h",
+    "hours": "h",
+    "min": "m",
+    "mins": "m",
+    "minute": "m",
+    "minutes": "m",
+    "sec": "s",
+    "secs": "s",
+    "second": "s",
+    "seconds": "s",
+    "milli": "ms",
+    "millis": "ms",
+    "millisecond": "ms",
+    "milliseconds": "ms",
+    "micro": "us",
+    "micros": "us",
+    "microsecond": "us",
+    "microseconds": "us",
+}
+_INTERVAL_PART = re.compile(r"\s*([+-]?\d+(?:\.\d*)?|\.\d+)\s*([a-z]+)", re.IGNORECASE)
+_INTERVAL_CLOCK = re.compile(r"\s*(?:(\d+)\s*days?,?\s*)?(\d+):(\d{2}):(\d{2}(?:\.\d+)?)\s*")
 
 
 def parse_interval(
     s: str,
 ) -> int:
+    m = _INTERVAL_CLOCK.fullmatch(s)
+    if m is not None:
+        days, hours, minutes, seconds = m.groups()
+        return round(1000 * (86400 * int(days or 0) + 3600 * int(hours) + 60 * int(minutes) + float(seconds)))
     milliseconds = 0
-    unit_map = {
-        "d": 1000 * 60 * 60 * 24,
-        "h": 1000 * 60 * 60,
-        "m": 1000 * 60,
-        "s": 1000,
-        "ms": 1,
-    }
-    for part in s.split():
-        leng = 2 if part.endswith("ms") else 1
-        milliseconds += int(part[:-leng]) * unit_map[part[-leng:]]
-    return milliseconds
+    pos = 0
+    for m in _INTERVAL_PART.finditer(s):
+        if m.start() != pos:
+            break
+        unit = m[2].lower()
+        unit = _INTERVAL_ALIASES.get(unit, unit)
+        if unit not in _INTERVAL_UNITS:
+            raise ValueError(f"invalid interval unit {repr(m[2])} in {repr(s)}")
+        milliseconds += float(m[1]) * _INTERVAL_UNITS[unit]
+        pos = m.end()
+    if 0 == pos or s[pos:].strip():
+        raise ValueError(f"invalid interval {repr(s)}")
+    return round(milliseconds)
 
 
 def format_milliseconds(
@@ -95,10 +161,13 @@ def format_milliseconds(
 
 def until_next(
     td: datetime.timedelta,
+    *,
+    now: datetime.datetime | None = None,
     **kwargs,
 ) -> datetime.timedelta:
     td = abs(td)
-    now = datetime.datetime.now()
+    if now is None:
+        now = datetime.datetime.now()
     nxt = now.replace(**kwargs)
     if nxt < now:
         nxt += math.ceil((now - nxt) / td) * td
@@ -111,9 +180,11 @@ def until_next_day(
     minute: int = 0,
     second: int = 0,
     microsecond: int = 0,
+    now: datetime.datetime | None = None,
 ) -> float:
     return until_next(
         datetime.timedelta(days=1),
+        now=now,
         hour=hour,
         minute=minute,
         second=second,
@@ -126,9 +197,11 @@ def until_next_hour(
     minute: int = 0,
     second: int = 0,
     microsecond: int = 0,
+    now: datetime.datetime | None = None,
 ) -> float:
     return until_next(
         datetime.timedelta(hours=1),
+        now=now,
         minute=minute,
         second=second,
         microsecond=microsecond,
@@ -139,9 +212,11 @@ def until_next_minute(
     *,
     second: int = 0,
     microsecond: int = 0,
+    now: datetime.datetime | None = None,
 ) -> float:
     return until_next(
         datetime.timedelta(minutes=1),
+        now=now,
         second=second,
         microsecond=microsecond,
     ).total_seconds()
@@ -150,9 +225,11 @@ def until_next_minute(
 def until_next_second(
     *,
     microsecond: int = 0,
+    now: datetime.datetime | None = None,
 ) -> float:
     return until_next(
         datetime.timedelta(seconds=1),
+        now=now,
         microsecond=microsecond,
     ).total_seconds()
 
@@ -166,23 +243,24 @@ async def restapi_wrapper[ReturnType](
     excs = []
     delay = 1.0
     max_tries = 3
+    endpoint = func.__qualname__
     for _ in range(max_tries):
         logger.info(
             f"{func.__module__}:{func.__qualname__}({", ".join(map(repr, args))}{"" if 0 == len(args) or 0 == len(kwargs) else ", "}{", ".join(f"{k}={repr(v)}" for k, v in kwargs.items())})"
         )
         try:
-            data = await asyncio.to_thread(func, *args, **kwargs)
+            with RESTAPI_SECONDS.time(endpoint=endpoint):
+                data = await asyncio.to_thread(func, *args, **kwargs)
         except ClientError as e:
             excs.append(e)
         except ServerError as e:
             excs.append(e)
-        except requests.ConnectionError as e:
-            excs.append(e)
         except Exception as e:
             excs.append(e)
         else:
             logger.success(repr(data)[:64])
             break
+        RESTAPI_RETRIES.inc(endpoint=endpoint)
         await asyncio.sleep(delay)
     else:
         raise ExceptionGroup(f"{max_tries=}", excs)
@@ -192,6 +270,23 @@ async def restapi_wrapper[ReturnType](
 _file_locks: dict[pathlib.Path, asyncio.Lock] = {}
 
 
+def write_atomic(
+    path: pathlib.Path,
+    s: str,
+) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, name = tempfile.mkstemp(prefix=f".{path.name}.", dir=path.parent)
+    try:
+        with os.fdopen(fd, mode="w", encoding="utf-8") as f:
+            f.write(s)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(name, path)
+    except BaseException:
+        os.unlink(name)
+        raise
+
+
 async def json_load(
     path: pathlib.Path,
 ) -> Any:
@@ -214,12 +309,8 @@ async def json_dump(
     if path not in _file_locks:
         _file_locks[path] = asyncio.Lock()
     async with _file_locks[path]:
-        if not path.is_file():
-            await asyncio.to_thread(path.parent.mkdir, parents=True, exist_ok=True)
         s = json.dumps(obj)
-        async with aiofiles.open(path, mode="w", encoding="utf-8") as f:
-            await f.write(s)
-            await f.flush()
+        await asyncio.to_thread(write_atomic, path, s)
 
 
 def _csv_field(
@@ -237,7 +328,7 @@ async def csv_append(
     logger.info(f"csv_append({repr(path)}, {repr(row)[:64]})")
     if path not in _file_locks:
         _file_locks[path] = asyncio.Lock()
-    async with _file_locks[path]:
+    async with _file_locks[path], CSV_WRITE_SECONDS.time(path=path.name):
         keys = list(row.keys())
         if not path.is_file():
             await asyncio.to_thread(path.parent.mkdir, parents=True, exist_ok=True)
@@ -256,7 +347,7 @@ async def csv_appendrows(
     logger.info(f"csv_appendrows({repr(path)}, {repr(rows)[:64]})")
     if path not in _file_locks:
         _file_locks[path] = asyncio.Lock()
-    async with _file_locks[path]:
+    async with _file_locks[path], CSV_WRITE_SECONDS.time(path=path.name):
         keys = list(rows[0].keys())
         if not path.is_file():
             await asyncio.to_thread(path.parent.mkdir, parents=True, exist_ok=True)
@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import math
+
+from .lazy import *
+
+np = lazy_import("numpy")
+
+__all__ = [
+    "ReturnStats",
+]
+
+
+class ReturnStats:
+
+    def __init__(
+        self,
+        capacity: int,
+        *,
+        halflife: int = 1000 * 60 * 60,
+        warmup: int = 60,
+    ) -> None:
+        self._tau = halflife / math.log(2)
+        self._warmup = warmup
+        self.clear(capacity)
+
+    @property
+    def capacity(
+        self,
+    ) -> int:
+        return len(self._prices)
+
+    def clear(
+        self,
+        capacity: int | None = None,
+    ) -> None:
+        n = self.capacity if capacity is None else capacity
+        self._prices = np.full(n, np.nan)
+        self._times = np.zeros(n, dtype=np.int64)
+        self._means = np.zeros(n)
+        self._variances = np.zeros(n)
+        self._weights = np.zeros(n)
+        self._counts = np.zeros(n, dtype=np.int64)
+
+    def push(
+        self,
+        ps: np.ndarray,
+        t: int,
+    ) -> None:
+        prices = self._prices
+        times = self._times
+        seen = (0 < ps) & np.isfinite(ps)
+        valid = seen & (0 < prices) & (times < t)
+        if valid.any():
+            dt = (t - times[valid]).astype(np.float64)
+            r = np.log(ps[valid] / prices[valid])
+            alpha = -np.expm1(-dt / self._tau)
+            weights = self._weights[valid]
+            weights += alpha * (1.0 - weights)
+            self._weights[valid] = weights
+            means = self._means[valid]
+            diff = r / dt - means
+            means += alpha * diff
+            self._means[valid] = means
+            alpha /= weights
+            self._variances[valid] = (1.0 - alpha) * (self._variances[valid] + alpha * dt * diff * diff)
+            self._counts[valid] += 1
+        prices[seen] = ps[seen]
+        times[seen] = t
+
+    def zscores(
+        self,
+        ps0: np.ndarray,
+        ps1: np.ndarray,
+        span: int,
+    ) -> np.ndarray:
+        n = len(ps0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            r = np.log(ps1 / ps0)
+            z = (r - self._means[:n] * span) / np.sqrt(self._variances[:n] * span)
+        z[self._counts[:n] < self._warmup] = np.nan
+        return z
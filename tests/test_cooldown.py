@@ -0,0 +1,77 @@
+import asyncio
+
+from monitor.clock import *
+from monitor.cooldown import *
+from monitor.state import *
+
+
+def test_hit_suppresses_until_expiry():
+    clock = VirtualClock(0)
+    cooldowns = Cooldowns("hit", cooldown="1m", rules={"fast": 5.0}, clock=clock)
+    assert cooldowns.hit("slow", "BTCUSDT")
+    assert not cooldowns.hit("slow", "BTCUSDT")
+    assert cooldowns.hit("slow", "ETHUSDT")
+    assert cooldowns.hit("fast", "BTCUSDT")
+    clock.set(5_000)
+    assert cooldowns.ready("fast", "BTCUSDT")
+    assert not cooldowns.ready("slow", "BTCUSDT")
+    assert 1 == cooldowns.expire()
+    assert 2 == len(cooldowns)
+    clock.set(60_000)
+    assert 2 == cooldowns.expire()
+    assert 0 == len(cooldowns)
+    assert cooldowns.hit("slow", "BTCUSDT")
+
+
+def test_hit_until_and_reset():
+    clock = VirtualClock(1_000)
+    cooldowns = Cooldowns("until", clock=clock)
+    assert cooldowns.hit("rule", "key")
+    assert 0 == len(cooldowns)
+    assert cooldowns.hit("rule", "key", until=10_000)
+    assert ("rule", "key") in cooldowns
+    cooldowns.reset("rule", "key")
+    assert ("rule", "key") not in cooldowns
+    assert cooldowns.hit("rule", "key")
+
+
+def test_rehit_after_expiry_keeps_new_entry():
+    clock = VirtualClock(0)
+    cooldowns = Cooldowns("rehit", cooldown=1.0, clock=clock)
+    cooldowns.hit("rule", "key")
+    clock.set(1_000)
+    cooldowns.hit("rule", "key")
+    assert 0 == cooldowns.expire()
+    assert ("rule", "key") in cooldowns
+
+
+def test_save_restore_roundtrip(tmp_path):
+    path = tmp_path / "state.json"
+    clock = VirtualClock(0)
+    store = StateStore(path)
+    cooldowns = Cooldowns("alerts", cooldown="1m", rules={"short": 10.0}, clock=clock, state=store.namespace("test"))
+    cooldowns.hit("long", ("BTCUSDT", "LONG"))
+    cooldowns.hit("short", "ETHUSDT")
+    cooldowns.save()
+    assert store.dirty
+    asyncio.run(store.checkpoint())
+    assert path.is_file()
+    clock.set(30_000)
+    restored = Cooldowns("alerts", cooldown="1m", clock=clock, state=StateStore(path).namespace("test"))
+    assert 1 == len(restored)
+    assert not restored.ready("long", ("BTCUSDT", "LONG"))
+    assert restored.ready("short", "ETHUSDT")
+    clock.set(60_000)
+    assert 1 == restored.expire()
+    assert restored.ready("long", ("BTCUSDT", "LONG"))
+
+
+def test_save_skips_clean_state():
+    clock = VirtualClock(0)
+    store = StateStore()
+    cooldowns = Cooldowns("clean", cooldown=1.0, clock=clock, state=store.namespace("test"))
+    cooldowns.save()
+    assert not store.dirty
+    cooldowns.hit("rule", "key")
+    cooldowns.save()
+    assert [["rule", "key", 1_000]] == store.namespace("test").get("clean")
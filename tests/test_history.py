@@ -0,0 +1,96 @@
+import math
+
+import pytest
+
+from monitor.history import *
+from monitor.records import Position
+
+MINUTE = 60_000
+
+
+def position(
+    symbol: str,
+    price: float,
+    notional: float,
+    pnl: float,
+    *,
+    amt: float = 1.0,
+) -> Position:
+    return Position(
+        symbol=symbol,
+        position_side="BOTH",
+        position_amt=amt,
+        entry_price=price,
+        mark_price=price,
+        unrealized_profit=pnl,
+        notional=notional,
+    )
+
+
+def test_series_delta_needs_full_window():
+    series = Series(("x",), capacity=16, windows={"2m": 2 * MINUTE}, tolerance=0)
+    series.push(0, (10.0,))
+    series.push(MINUTE, (11.0,))
+    assert math.isnan(series.delta("2m", "x"))
+    series.push(2 * MINUTE, (13.0,))
+    assert 3.0 == series.delta("2m", "x")
+    assert 30.0 == series.change_percent("2m", "x")
+    series.push(3 * MINUTE, (12.0,))
+    assert 1.0 == series.delta("2m", "x")
+
+
+def test_series_tolerance_accepts_early_origin():
+    series = Series(("x",), capacity=16, windows={"2m": 2 * MINUTE}, tolerance=MINUTE // 2)
+    series.push(0, (10.0,))
+    series.push(2 * MINUTE - MINUTE // 2, (12.0,))
+    assert 2.0 == series.delta("2m", "x")
+
+
+def test_series_ignores_stale_samples():
+    series = Series(("x",), capacity=4, windows={"1m": MINUTE})
+    series.push(MINUTE, (1.0,))
+    series.push(MINUTE, (2.0,))
+    series.push(0, (3.0,))
+    assert 1 == len(series)
+    assert 1.0 == series.last("x")
+
+
+def test_series_wraps_capacity():
+    series = Series(("x",), capacity=4, windows={"10m": 10 * MINUTE}, tolerance=0)
+    for i in range(12):
+        series.push(i * MINUTE, (float(i),))
+    assert 4 == len(series)
+    assert 11 * MINUTE == series.time
+    assert math.isnan(series.delta("10m", "x"))
+    times, values = series.window(2 * MINUTE, "x")
+    assert [9 * MINUTE, 10 * MINUTE, 11 * MINUTE] == times.tolist()
+    assert [9.0, 10.0, 11.0] == values.tolist()
+
+
+def test_position_history_pnls_and_movers():
+    history = PositionHistory(step=MINUTE, windows={"1h": 60 * MINUTE, "4h": 240 * MINUTE})
+    for i in range(61):
+        price = 100.0 + i / 6
+        history.sample(
+            i * MINUTE,
+            {"totalMarginBalance": str(1000.0 + i)},
+            [position("BTCUSDT", price, price, i), position("ETHUSDT", 50.0, -50.0, 0.0, amt=-1.0)],
+        )
+    pnls = history.pnls()
+    assert ["1h"] == list(pnls)
+    assert 60.0 == pnls["1h"]["totl"]
+    assert pytest.approx(10.0) == pnls["1h"]["long"]
+    assert 0.0 == pnls["1h"]["shrt"]
+    changes = history.changes()
+    assert pytest.approx(10.0) == changes["BTCUSDT", "BOTH"]["1h"]
+    assert "4h" not in changes["BTCUSDT", "BOTH"]
+    assert [("BTCUSDT", "BOTH")] == [key for key, _ in history.movers("1h", 5.0)]
+
+
+def test_position_history_drops_closed_positions():
+    history = PositionHistory(step=MINUTE, windows={"1h": 60 * MINUTE})
+    history.sample(0, {"totalMarginBalance": "1000"}, [position("BTCUSDT", 100.0, 100.0, 0.0)])
+    history.sample(MINUTE, {"totalMarginBalance": "1000"}, [position("BTCUSDT", 100.0, 0.0, 0.0, amt=0.0)])
+    assert ("BTCUSDT", "BOTH") in history.positions
+    history.sample(62 * MINUTE, {"totalMarginBalance": "1000"}, [])
+    assert {} == history.positions
@@ -0,0 +1,129 @@
+import asyncio
+import datetime
+import math
+
+from monitor.clock import *
+from monitor.monitor import *
+from monitor.records import MarkPrice
+from monitor.replay import CaptureBot
+from monitor.scheduler import *
+from monitor.shm import *
+from monitor.state import *
+
+
+def mark_prices(
+    prices: dict[str, float],
+) -> list[MarkPrice]:
+    return [
+        MarkPrice(
+            event_time=0,
+            symbol=symbol,
+            mark_price=price,
+            index_price=price,
+            funding_rate="0.0001",
+            next_funding_time=3_600_000,
+        )
+        for symbol, price in prices.items()
+    ]
+
+
+def test_market_monitor_survives_stale_ring(tmp_path):
+    async def main() -> None:
+        clock = VirtualClock(0)
+        ring = MarketRing.create(f"test-market-{id(clock)}", capacity=8, slots=16)
+        try:
+            monitor = MarketMonitor(CaptureBot(), client=object(), params={"1m": 1.0}, ring=ring.name, stale=5.0, clock=clock)
+            await monitor.monitor_ring()
+            for k in range(8):
+                clock.set(10_000 * k)
+                ring.publish(clock.time_ms(), mark_prices({"BTCUSDT": 100.0 + k, "ETHUSDT": 10.0}))
+                await monitor.monitor_ring()
+            clock.set(100_000)
+            await monitor.monitor_ring()
+            assert monitor._ring_attached is None
+            await monitor.monitor_market()
+        finally:
+            ring.close()
+
+    asyncio.run(main())
+
+
+def test_funding_monitor_survives_stale_ring():
+    async def main() -> None:
+        clock = VirtualClock(0)
+        ring = MarketRing.create(f"test-funding-{id(clock)}", capacity=8, slots=16)
+        try:
+            monitor = FundingMonitor(CaptureBot(), client=object(), ring=ring.name, stale=5.0, clock=clock)
+            await monitor.monitor_ring()
+            ring.publish(0, mark_prices({"BTCUSDT": 100.0}))
+            await monitor.monitor_ring()
+            clock.set(10_000)
+            await monitor.monitor_ring()
+            assert monitor._ring_attached is None
+            ring.publish(10_000, mark_prices({"ETHUSDT": 10.0}))
+            assert (0.0001, 3_600_000) == monitor.history.rate("BTCUSDT")
+            assert math.isnan(monitor.history.rate("ETHUSDT")[0])
+            await monitor.monitor_funding()
+        finally:
+            ring.close()
+
+    asyncio.run(main())
+
+
+class PositionClient:
+
+    def account(
+        self,
+    ) -> dict:
+        return {
+            "totalMarginBalance": "100",
+            "totalWalletBalance": "100",
+            "totalUnrealizedProfit": "0",
+            "availableBalance": "100",
+            "positions": [],
+        }
+
+    def get_position_risk(
+        self,
+    ) -> list:
+        return []
+
+
+def hourly_report_times(
+    offset: int,
+) -> list[int]:
+    async def main() -> list[int]:
+        t0 = int(1000 * datetime.datetime(2026, 1, 1, 10, 58).timestamp())
+        base = VirtualClock(t0)
+        bot = CaptureBot()
+        sent = []
+        send = bot.send_interactive
+
+        async def send_interactive(card: dict) -> None:
+            sent.append(base.time_ms() - t0)
+            await send(card)
+
+        bot.send_interactive = send_interactive
+        scheduler = Scheduler(clock=base)
+        monitor = PositionMonitor(
+            bot,
+            client=PositionClient(),
+            clock=ExchangeClock(base, offset=offset),
+            scheduler=scheduler,
+            state=StateStore().namespace("test"),
+        )
+        async with scheduler, monitor:
+            await base.settle()
+            for k in range(1, 5):
+                await base.advance(t0 + 60_000 * k)
+                while monitor._position_job.busy:
+                    await asyncio.sleep(0.01)
+        return sent
+
+    return asyncio.run(main())
+
+
+def test_hourly_report_follows_scheduler_tick(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    assert [120_000] == hourly_report_times(-5)
+    assert [120_000] == hourly_report_times(5)
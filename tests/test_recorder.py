@@ -0,0 +1,58 @@
+import asyncio
+import time
+
+from monitor.recorder import *
+
+
+def test_stop_waits_for_inflight_flush(tmp_path):
+    async def main() -> None:
+        recorder = StreamRecorder(tmp_path, "test", interval=0.01)
+        write = recorder._write
+        calls = []
+
+        def slow_write(batch: list) -> None:
+            calls.append(batch)
+            if 1 == len(calls):
+                time.sleep(0.2)
+            write(batch)
+
+        recorder._write = slow_write
+        await recorder.start()
+        recorder.record('{"k":1}', 1)
+        await asyncio.sleep(0.05)
+        recorder.record('{"k":2}', 2)
+        await recorder.stop()
+
+    asyncio.run(main())
+    assert [(1, '{"k":1}'), (2, '{"k":2}')] == list(read_segments(tmp_path.glob("*.gz")))
+
+
+def test_segment_bytes_counts_bytes_on_disk(tmp_path):
+    async def main() -> None:
+        recorder = StreamRecorder(tmp_path, "test", segment_bytes=2000)
+        for k in range(5):
+            recorder.record("a" * 1000, k)
+            await recorder.flush()
+        await recorder.start()
+        await recorder.stop()
+
+    asyncio.run(main())
+    paths = list(tmp_path.glob("*.gz"))
+    assert 1 == len(paths)
+    assert paths[0].stat().st_size < 2000
+    assert list(range(5)) == [t for t, _ in read_segments(paths)]
+
+
+def test_segment_rolls_past_segment_bytes(tmp_path):
+    async def main() -> None:
+        recorder = StreamRecorder(tmp_path, "test", segment_bytes=64)
+        for k in range(3):
+            recorder.record(f'{{"k":{k}}}', k)
+            await recorder.flush()
+        await recorder.start()
+        await recorder.stop()
+
+    asyncio.run(main())
+    paths = list(tmp_path.glob("*.gz"))
+    assert 1 < len(paths)
+    assert [0, 1, 2] == [t for t, _ in read_segments(paths)]
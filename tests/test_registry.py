@@ -0,0 +1,20 @@
+from monitor.monitor import *
+from monitor.registry import *
+from monitor.replay import CaptureBot
+
+
+def test_market_stream_monitors_run_per_account():
+    for cls in "FundingMonitor", "LiquidationMonitor", "SpreadMonitor":
+        assert "account" == MONITORS[cls].scope
+        assert MONITORS[cls].market
+
+
+def test_accounts_share_market_hub():
+    first = Account("first", sync=False)
+    second = Account("second", sync=False, market=first)
+    funding = second.build("FundingMonitor", CaptureBot())
+    orders = second.build("OrderMonitor", CaptureBot())
+    assert funding._hub is first.hub
+    assert orders._hub is second.hub
+    assert first.hub is not second.hub
+    assert first.build("FundingMonitor", CaptureBot())._hub is first.hub
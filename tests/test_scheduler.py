@@ -0,0 +1,164 @@
+import asyncio
+import random
+
+import pytest
+
+from monitor.clock import *
+from monitor.scheduler import *
+from monitor.scheduler import JOB_MISSED
+
+
+def run(
+    misfire: str,
+    late: int,
+    **kwargs,
+) -> tuple[int, Job]:
+    async def main() -> tuple[int, Job]:
+        calls = []
+
+        async def callback() -> None:
+            calls.append(clock.time_ms())
+
+        clock = VirtualClock(0)
+        scheduler = Scheduler(clock=clock, **kwargs)
+        job = scheduler.add(Job(f"{misfire}-{late}", callback, 1.0, misfire=misfire))
+        async with scheduler:
+            await clock.settle()
+            clock.set(late)
+            await clock.advance(late)
+            await clock.settle()
+        return len(calls), job
+
+    return asyncio.run(main())
+
+
+def missed(
+    job: Job,
+    reason: str,
+) -> float:
+    return JOB_MISSED._values.get((job.name, reason), 0.0)
+
+
+def test_every_aligns_to_interval():
+    schedule = Every(1000, offset=250)
+    assert 250 == schedule.next(0)
+    assert 1250 == schedule.next(250)
+    assert 2250 == schedule.next(1250)
+
+
+def test_parse_schedule():
+    assert 60_000 == parse_schedule("1m").interval
+    assert 5_000 == parse_schedule("@every 5s").interval
+    assert 1_500 == parse_schedule(1.5).interval
+    assert isinstance(parse_schedule("@hourly"), Cron)
+    with pytest.raises(ValueError):
+        parse_schedule("61 * * * *")
+
+
+def test_job_rejects_unknown_misfire():
+    with pytest.raises(ValueError):
+        Job("x", None, 1.0, misfire="later")
+
+
+def test_on_time_runs_once():
+    calls, job = run("skip", 1000)
+    assert 1 == calls
+    assert 2000 == job.tick
+    assert 0 == missed(job, "late")
+
+
+def test_coalesce_runs_once_for_missed_ticks():
+    calls, job = run("coalesce", 5500)
+    assert 1 == calls
+    assert 6000 == job.tick
+    assert 4 == missed(job, "late")
+
+
+def test_skip_drops_late_ticks():
+    calls, job = run("skip", 5500)
+    assert 0 == calls
+    assert 6000 == job.tick
+    assert 5 == missed(job, "late")
+
+
+def test_skip_within_grace_runs():
+    calls, job = run("skip", 1800, grace=1.0)
+    assert 1 == calls
+
+
+def test_catch_up_runs_every_missed_tick():
+    calls, job = run("catch_up", 5500)
+    assert 5 == calls
+    assert 0 == missed(job, "late")
+
+
+def test_overlap_skips_busy_job():
+    async def main() -> tuple[int, Job]:
+        calls = []
+        gate = asyncio.Event()
+
+        async def callback() -> None:
+            calls.append(clock.time_ms())
+            await gate.wait()
+
+        clock = VirtualClock(0)
+        scheduler = Scheduler(clock=clock)
+        job = scheduler.add(Job("overlap", callback, 1.0))
+        async with scheduler:
+            await clock.settle()
+            await clock.advance(1000)
+            await clock.advance(2000)
+            gate.set()
+            await clock.settle()
+            await clock.advance(3000)
+            await clock.settle()
+        return len(calls), job
+
+    calls, job = asyncio.run(main())
+    assert 2 == calls
+    assert 1 == missed(job, "overlap")
+
+
+def test_jitter_delays_within_bound():
+    random.seed(0)
+    clock = VirtualClock(0)
+    scheduler = Scheduler(clock=clock, jitter=0.5)
+    jobs = [scheduler.add(Job(f"jitter-{i}", None, 1.0)) for i in range(32)]
+    delays = {job.due - job.tick for job in jobs}
+    assert all(1000 == job.tick for job in jobs)
+    assert all(0 <= x <= 500 for x in delays)
+    assert 1 < len(delays)
+
+
+def test_job_jitter_overrides_scheduler():
+    clock = VirtualClock(0)
+    scheduler = Scheduler(clock=clock, jitter=0.5)
+    job = scheduler.add(Job("jitter-off", None, 1.0, jitter=0.0))
+    assert 1000 == job.due
+
+
+def test_stagger_spreads_jobs_on_same_schedule():
+    clock = VirtualClock(0)
+    scheduler = Scheduler(clock=clock, stagger=10.0)
+    jobs = [scheduler.add(Job(f"stagger-{i}", None, "1m")) for i in range(8)]
+    offsets = [job.offset for job in jobs]
+    assert 0 == offsets[0]
+    assert len(offsets) == len(set(offsets))
+    assert all(0 <= x < 10_000 for x in offsets)
+    assert all(job.tick + job.offset == job.due for job in jobs)
+    other = scheduler.add(Job("stagger-other", None, "5m"))
+    assert 0 == other.offset
+
+
+def test_stagger_capped_by_interval():
+    clock = VirtualClock(0)
+    scheduler = Scheduler(clock=clock, stagger=10.0)
+    jobs = [scheduler.add(Job(f"stagger-short-{i}", None, 1.0)) for i in range(8)]
+    assert all(0 <= job.offset < 1000 for job in jobs)
+
+
+def test_immediate_job_due_now():
+    clock = VirtualClock(5000)
+    scheduler = Scheduler(clock=clock, jitter=0.5)
+    job = scheduler.add(Job("immediate", None, 1.0, immediate=True))
+    assert 5000 == job.due
@@ -0,0 +1,125 @@
+import math
+import os
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+import pytest
+
+from monitor.records import MarkPrice
+from monitor.shm import *
+
+
+def mark_price(
+    symbol: str,
+    price: float,
+    *,
+    rate: str = "",
+    next_funding_time: int = 0,
+) -> MarkPrice:
+    return MarkPrice(
+        event_time=0,
+        symbol=symbol,
+        mark_price=price,
+        index_price=price,
+        funding_rate=rate,
+        next_funding_time=next_funding_time,
+    )
+
+
+@pytest.fixture
+def ring():
+    ring = MarketRing.create(f"test-ring-{os.getpid()}", capacity=4, slots=4)
+    yield ring
+    ring.close()
+
+
+def test_symbol_table_get_does_not_insert():
+    table = SymbolTable(2)
+    assert table.get("BTCUSDT") is None
+    assert 0 == len(table)
+    assert 0 == table.index("BTCUSDT")
+    assert 1 == table.index("ETHUSDT")
+    assert 0 == table.index("BTCUSDT")
+    assert 1 == table.get("ETHUSDT")
+    with pytest.raises(IndexError):
+        table.index("SOLUSDT")
+    assert "ETHUSDT" == table.symbol(1)
+
+
+def test_ring_publish_read(ring):
+    out = np.empty(ring.capacity)
+    assert ring.read(1, out) is None
+    seq = ring.publish(1000, [mark_price("BTCUSDT", 100.0, rate="0.0001", next_funding_time=8000), mark_price("ETHUSDT", 10.0)])
+    assert 1 == seq == ring.seq
+    rates = np.empty(ring.capacity)
+    nexts = np.empty(ring.capacity, dtype=np.int64)
+    assert 1000 == ring.read(seq, out, rates=rates, nexts=nexts)
+    i, j = ring.symbols.get("BTCUSDT"), ring.symbols.get("ETHUSDT")
+    assert [100.0, 10.0] == [out[i], out[j]]
+    assert 0.0001 == rates[i]
+    assert 8000 == nexts[i]
+    assert math.isnan(rates[j])
+    assert 0 == nexts[j]
+    assert math.isnan(out[2])
+    assert ring.read(seq + 1, out) is None
+
+
+def test_ring_read_detects_overwrite(ring):
+    out = np.empty(ring.capacity)
+    for k in range(1, ring.slots):
+        ring.publish(1000 * k, [mark_price("BTCUSDT", float(k))])
+    assert 1000 == ring.read(1, out)
+    assert 1.0 == out[0]
+    ring.publish(1000 * ring.slots, [mark_price("BTCUSDT", 9.0)])
+    assert ring.read(1, out) is None
+    assert 2000 == ring.read(2, out)
+    assert 2.0 == out[0]
+
+
+def test_ring_drops_symbols_beyond_capacity(ring):
+    out = np.empty(ring.capacity)
+    seq = ring.publish(1000, [mark_price(f"S{k}USDT", float(k)) for k in range(6)])
+    assert 1000 == ring.read(seq, out)
+    assert ring.capacity == len(ring.symbols)
+    assert ring.symbols.get("S5USDT") is None
+    assert [0.0, 1.0, 2.0, 3.0] == out.tolist()
+
+
+def test_attached_ring_sees_publisher_symbols(ring):
+    reader = MarketRing.attach(ring.name)
+    try:
+        out = np.empty(reader.capacity)
+        seq = ring.publish(1000, [mark_price("BTCUSDT", 100.0)])
+        assert 0 == reader.symbols.get("BTCUSDT")
+        ring.publish(2000, [mark_price("ETHUSDT", 10.0)])
+        assert 1 == reader.symbols.get("ETHUSDT")
+        assert "ETHUSDT" == reader.symbols.symbol(1)
+        assert 2000 == reader.read(seq + 1, out)
+        assert 10.0 == out[1]
+        assert math.isnan(out[0])
+    finally:
+        reader.close()
+
+
+def test_attach_rejects_foreign_segment():
+    shm = SharedMemory(f"test-foreign-{os.getpid()}", create=True, size=4096)
+    try:
+        with pytest.raises(ValueError):
+            MarketRing.attach(shm.name)
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+def test_closed_ring_leaves_symbols_usable(ring):
+    reader = MarketRing.attach(ring.name)
+    symbols = reader.symbols
+    ring.publish(1000, [mark_price("BTCUSDT", 100.0), mark_price("ETHUSDT", 10.0)])
+    assert 0 == symbols.get("BTCUSDT")
+    reader.close()
+    reader.close()
+    ring.publish(2000, [mark_price("SOLUSDT", 1.0)])
+    assert 2 == len(symbols)
+    assert "ETHUSDT" == symbols.symbol(1)
+    assert 1 == symbols.get("ETHUSDT")
+    assert symbols.get("SOLUSDT") is None
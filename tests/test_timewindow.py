@@ -0,0 +1,73 @@
+import pytest
+
+from monitor.clock import *
+from monitor.timewindow import *
+
+
+def test_timewindow_drops_old_entries():
+    window = Timewindow(1000)
+    window.push("a", 0)
+    window.push("b", 500)
+    window.push("c", 1000)
+    assert 3 == len(window)
+    window.push("d", 1600)
+    assert [("c", 1000), ("d", 1600)] == [window.head(), window.tail()]
+    window.clear()
+    with pytest.raises(TimewindowEmpty):
+        window.head()
+
+
+def test_sparse_timewindow_keeps_one_per_unit():
+    window = SparseTimewindow(10_000, unit=1000)
+    for t in range(0, 3000, 250):
+        window.push(t, t)
+    assert 3 == len(window)
+    assert (2000, 2000) == window.tail()
+
+
+def test_sum_timewindow_expires_sums():
+    window = SumTimewindow(1000)
+    window.add("BTCUSDT", 1.0, 0)
+    window.add("BTCUSDT", 2.0, 400)
+    window.add("ETHUSDT", 5.0, 800)
+    assert {"BTCUSDT": 3.0, "ETHUSDT": 5.0} == window.sums
+    assert {"BTCUSDT": 2, "ETHUSDT": 1} == window.counts
+    window.expire(1200)
+    assert {"BTCUSDT": 2.0, "ETHUSDT": 5.0} == window.sums
+    assert {"BTCUSDT": 1, "ETHUSDT": 1} == window.counts
+    window.expire(1401)
+    assert {"ETHUSDT": 5.0} == window.sums
+    assert {"ETHUSDT": 1} == window.counts
+    window.expire(5000)
+    assert {} == window.sums
+    assert {} == window.counts
+    assert window.empty()
+
+
+def test_sum_timewindow_buckets_by_unit():
+    window = SumTimewindow(1000, unit=100)
+    window.add("BTCUSDT", 1.0, 0)
+    window.add("BTCUSDT", 2.0, 50)
+    window.add("ETHUSDT", 4.0, 99)
+    window.add("BTCUSDT", 8.0, 100)
+    assert 2 == len(window)
+    assert {"BTCUSDT": 11.0, "ETHUSDT": 4.0} == window.sums
+    window.expire(1050)
+    assert {"BTCUSDT": 8.0} == window.sums
+    assert {"BTCUSDT": 1} == window.counts
+
+
+def test_sum_timewindow_expires_on_add_and_clock():
+    clock = VirtualClock(0)
+    window = SumTimewindow(1000, clock=clock)
+    window.add("BTCUSDT", 1.0)
+    clock.set(1500)
+    window.add("ETHUSDT", 2.0)
+    assert {"ETHUSDT": 2.0} == window.sums
+    clock.set(2501)
+    window.expire()
+    assert {} == window.sums
+    window.add("BTCUSDT", 3.0)
+    window.clear()
+    assert {} == window.sums
+    assert {} == window.counts
@@ -0,0 +1,29 @@
+import pytest
+
+from monitor.utils import *
+
+
+@pytest.mark.parametrize(
+    "s, milliseconds",
+    [
+        ("5m", 5 * 60_000),
+        ("15min", 15 * 60_000),
+        ("4h", 4 * 3600_000),
+        ("1h30m", 90 * 60_000),
+        ("1m30s", 90_000),
+        ("1.5s", 1_500),
+        ("250ms", 250),
+        ("2 days", 2 * 86_400_000),
+        ("1 hour 30 minutes", 90 * 60_000),
+        ("01:02:03", 3_723_000),
+        ("1 days 01:00:00", 25 * 3600_000),
+    ],
+)
+def test_parse_interval(s, milliseconds):
+    assert milliseconds == parse_interval(s)
+
+
+@pytest.mark.parametrize("s", ["", "5", "5 parsecs", "1h junk", "m5"])
+def test_parse_interval_rejects(s):
+    with pytest.raises(ValueError):
+        parse_interval(s)
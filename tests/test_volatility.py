@@ -0,0 +1,50 @@
+import numpy as np
+
+from monitor.volatility import *
+
+
+def random_walk(
+    stats: ReturnStats,
+    rng: np.random.Generator,
+    seconds: int,
+    *,
+    t0: int = 0,
+    sigma: float = 1e-3,
+) -> list[np.ndarray]:
+    ps = np.full(stats.capacity, 100.0)
+    frames = []
+    for k in range(seconds + 1):
+        if 0 < k:
+            ps = ps * np.exp(rng.normal(0.0, sigma, stats.capacity))
+        stats.push(ps, t0 + 1000 * k)
+        frames.append(ps)
+    return frames
+
+
+def test_zscores_calibrated_on_noise_after_start():
+    rng = np.random.default_rng(0)
+    stats = ReturnStats(1000, halflife=60 * 60 * 1000)
+    frames = random_walk(stats, rng, 10 * 60)
+    z = stats.zscores(frames[-301], frames[-1], 300_000)
+    assert np.isfinite(z).all()
+    assert 0.85 < z.std() < 1.15
+    assert (4 <= np.abs(z)).mean() < 0.01
+
+
+def test_zscores_calibrated_after_clear():
+    rng = np.random.default_rng(1)
+    stats = ReturnStats(1000, halflife=60 * 60 * 1000)
+    random_walk(stats, rng, 10 * 60, sigma=1e-2)
+    stats.clear()
+    frames = random_walk(stats, rng, 6 * 60, t0=1_000_000)
+    z = stats.zscores(frames[-301], frames[-1], 300_000)
+    assert 0.85 < z.std() < 1.15
+
+
+def test_zscores_wait_for_warmup():
+    rng = np.random.default_rng(2)
+    stats = ReturnStats(4, warmup=60)
+    frames = random_walk(stats, rng, 30)
+    assert np.isnan(stats.zscores(frames[0], frames[-1], 30_000)).all()
+    frames = random_walk(stats, rng, 60, t0=31_000)
+    assert np.isfinite(stats.zscores(frames[0], frames[-1], 60_000)).all()